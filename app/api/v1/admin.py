@@ -1,5 +1,15 @@
 # 모델/프로바이더 관리
 from fastapi import APIRouter
 
+from app.services.ingestion.embedding_cache import get_embedding_cache
+
 router = APIRouter(prefix="/admin", tags=["admin"])
 
+
+@router.get("/embedding-cache")
+def embedding_cache_stats():
+    """임베딩 캐시 적중/미스 카운터(현재 워커 프로세스 기준)."""
+    cache = get_embedding_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.db import crud
+from app.services.retrieval import keyword_index
 from app.schemas.db import (
     DocumentCreate,
     DocumentRead,
@@ -40,7 +41,20 @@ def add_chunk(doc_id: int, chunk: ChunkCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=400, detail="문서 ID 불일치")
     if not crud.get_document(db, doc_id):
         raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다")
-    return crud.create_chunk(db, chunk)
+    (chunk_id,) = crud.bulk_create_chunks(db, [chunk])
+    keyword_index.update_index(added=[(chunk_id, chunk.content)])
+    return ChunkRead(id=chunk_id, **chunk.model_dump())
+
+
+@router.post("/{doc_id}/chunks/bulk", response_model=list[int])
+def add_chunks(doc_id: int, chunks: list[ChunkCreate], db: Session = Depends(get_db)):
+    if any(c.document_id != doc_id for c in chunks):
+        raise HTTPException(status_code=400, detail="문서 ID 불일치")
+    if not crud.get_document(db, doc_id):
+        raise HTTPException(status_code=404, detail="문서를 찾을 수 없습니다")
+    ids = crud.bulk_create_chunks(db, chunks)
+    keyword_index.update_index(added=zip(ids, (c.content for c in chunks)))
+    return ids
 
 
 @router.get("/{doc_id}/chunks", response_model=list[ChunkRead])
@@ -1,37 +1,32 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
 from fastapi.responses import FileResponse
-from shutil import copyfileobj
 from starlette.concurrency import run_in_threadpool
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import BinaryIO, Dict
+import hashlib
 import os
+import tempfile
 from dotenv import load_dotenv
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.db.session import get_db
 from app.db import crud
-from app.schemas.db import (
-    FileCreate,
-    DocumentCreate,
-    ChunkCreate,
-    EmbeddingCreate,
-)
+from app.schemas.db import FileCreate, IngestionJobRead
 
 from app.schemas.ingestion import (
     UploadResponse, SplitRequest, SplitResponse,
     AnalyzeRequest, AnalyzeResponse,
     ExtractRequest, ExtractResponse,
-    RunRequest, RunResponse)
+    RunRequest, RunJobResponse,
+    ReingestRequest, ReingestResponse)
 
 # 모듈들은 사용자 분리 구조에 맞춰 import
 from app.services.ingestion.preprocess.split_pdf import split_pdf
 from app.services.ingestion.preprocess.analyzer_upstage import LayoutAnalyzer
 from app.services.ingestion.preprocess.extract_assets import PDFImageProcessor
-from app.services.chunk import (
-    extract_text_from_pdf,
-    chunk_text,
-    get_embedding,
-)
+from app.services.ingestion.reingest import reingest_file
+from app.services.pipeline import file_sha256
 # render_html_md 가 별도면, PDFImageProcessor 내부에서 호출되도록 구성했거나 필요 시 아래 import 후 사용
 # from app.services.ingestion.preprocess.render_html_md import render_html_and_md
 
@@ -44,6 +39,37 @@ UPLOAD_DIR = STORAGE_ROOT / "uploads"
 ARTIFACT_DIR = STORAGE_ROOT / "artifacts"
 for p in (UPLOAD_DIR, ARTIFACT_DIR):
     p.mkdir(parents=True, exist_ok=True)
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024)))
+
+def _store_upload(src: BinaryIO, directory: Path) -> tuple[Path, str, int]:
+    """업로드 본문을 큰 청크로 임시 파일에 쓰면서 같은 패스에서 sha256·크기를 계산한다."""
+    h = hashlib.sha256()
+    size = 0
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out_file:
+            while chunk := src.read(UPLOAD_CHUNK_SIZE):
+                h.update(chunk)
+                size += len(chunk)
+                out_file.write(chunk)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+    return Path(tmp), h.hexdigest(), size
+
+
+def _duplicate_response(db_file) -> UploadResponse:
+    path = Path(db_file.storage_path)
+    return UploadResponse(
+        filename=path.name,
+        path=str(path),
+        size=path.stat().st_size if path.exists() else 0,
+        file_id=db_file.id,
+        sha256=db_file.sha256,
+        duplicate=True,
+        document_ids=[d.id for d in db_file.documents],
+    )
+
 
 # --- 파일 업로드 ---
 @router.post("/upload", response_model=UploadResponse)
@@ -56,6 +82,12 @@ async def upload_file(
     dest = (UPLOAD_DIR / file.filename).resolve()
     if not dest.is_relative_to(UPLOAD_DIR):
         raise HTTPException(status_code=400, detail="업로드 경로 밖의 파일은 허용되지 않습니다")
+    tmp, sha256, size = await run_in_threadpool(_store_upload, file.file, UPLOAD_DIR)
+    # 같은 내용이 이미 있으면 새 파일/행 없이 기존 file_id 와 문서를 그대로 반환
+    existing = crud.get_file_by_sha256(db, sha256)
+    if existing is not None:
+        tmp.unlink(missing_ok=True)
+        return _duplicate_response(existing)
     # 중복 방지
     i = 1
     while dest.exists():
@@ -63,23 +95,33 @@ async def upload_file(
         suffix = dest.suffix
         dest = (UPLOAD_DIR / f"{stem}_{i}{suffix}").resolve()
         if not dest.is_relative_to(UPLOAD_DIR):
+            tmp.unlink(missing_ok=True)
             raise HTTPException(status_code=400, detail="업로드 경로 밖의 파일은 허용되지 않습니다")
         i += 1
-    with dest.open("wb") as out_file:
-        await run_in_threadpool(copyfileobj, file.file, out_file)
-    db_file = crud.create_file(
-        db,
-        FileCreate(
-            original_name=file.filename,
-            mime_type=file.content_type,
-            storage_path=str(dest),
-        ),
-    )
+    os.replace(tmp, dest)
+    try:
+        db_file = crud.create_file(
+            db,
+            FileCreate(
+                original_name=file.filename,
+                mime_type=file.content_type,
+                storage_path=str(dest),
+                sha256=sha256,
+            ),
+        )
+    except IntegrityError:
+        # 같은 내용이 동시에 올라온 경우: 먼저 저장된 쪽을 사용
+        dest.unlink(missing_ok=True)
+        existing = crud.get_file_by_sha256(db, sha256)
+        if existing is None:
+            raise
+        return _duplicate_response(existing)
     return UploadResponse(
         filename=dest.name,
         path=str(dest),
-        size=dest.stat().st_size,
+        size=size,
         file_id=db_file.id,
+        sha256=sha256,
     )
 
 # --- PDF 분할 ---
@@ -98,16 +140,19 @@ def analyze_endpoint(req: AnalyzeRequest):
     if not api_key:
         raise HTTPException(status_code=400, detail="UPSTAGE_API_KEY 필요")
     analyzer = LayoutAnalyzer(api_key)
-    out: Dict[str, str] = {}
-    for pdf_path in req.pdf_paths:
-        p = Path(pdf_path)
+    paths = [Path(pdf_path) for pdf_path in req.pdf_paths]
+    for p in paths:
         if not p.exists():
-            raise HTTPException(status_code=404, detail=f"없음: {pdf_path}")
-        try:
-            json_path = analyzer.execute(str(p))
-        except ValueError as e:
-            raise HTTPException(status_code=502, detail=str(e))
-        out[str(p.resolve())] = str(Path(json_path).resolve())
+            raise HTTPException(status_code=404, detail=f"없음: {p}")
+    try:
+        results = analyzer.analyze_many(
+            [str(p) for p in paths], concurrency=req.concurrency, use_cache=req.use_cache
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    out: Dict[str, str] = {
+        str(p.resolve()): str(Path(json_path).resolve()) for p, json_path in zip(paths, results)
+    }
     return AnalyzeResponse(json_paths=out)
 
 # --- 자산 추출 + HTML/MD 렌더 ---
@@ -130,100 +175,53 @@ def extract_endpoint(req: ExtractRequest):
         md_path=str(md_path.resolve()),
     )
 
-# --- 전체 파이프라인 실행 ---
-@router.post("/run", response_model=RunResponse)
+# --- 전체 파이프라인 실행(백그라운드 작업 등록) ---
+@router.post("/run", response_model=RunJobResponse, status_code=202)
 def run_endpoint(req: RunRequest, db: Session = Depends(get_db)):
+    """작업만 등록하고 바로 반환한다. 실행은 app.services.ingestion.worker 가 맡는다."""
     pdf = Path(req.pdf_path)
     if not pdf.exists():
         raise HTTPException(status_code=404, detail="pdf_path가 존재하지 않음")
-
-    db_file = crud.create_file(
-        db,
-        FileCreate(
-            original_name=pdf.name,
-            mime_type="application/pdf",
-            storage_path=str(pdf.resolve()),
-        ),
-    )
-    parts = split_pdf(str(pdf), batch_size=req.batch_size)
-
-
-    api_key = req.upstage_api_key or os.getenv("UPSTAGE_API_KEY")
-    if not api_key:
+    # API 키는 DB 에 저장하지 않고 워커가 자신의 UPSTAGE_API_KEY 를 쓰므로, 요청 키는 받지 않는다
+    if "upstage_api_key" in req.model_fields_set:
+        raise HTTPException(
+            status_code=400,
+            detail="upstage_api_key 는 /run 에서 받지 않습니다(워커의 UPSTAGE_API_KEY 환경 변수를 사용)",
+        )
+    payload = req.model_dump(mode="json", exclude={"upstage_api_key"})
+    payload["pdf_path"] = str(pdf.resolve())
+    job = crud.create_job(db, payload)
+    return RunJobResponse(job_id=job.id, status=job.status)
+
+# --- 작업 진행 상황 ---
+@router.get("/jobs/{job_id}", response_model=IngestionJobRead)
+def get_job_endpoint(job_id: int, db: Session = Depends(get_db)):
+    job = crud.get_job(db, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="작업 없음")
+    return job
+
+# --- 개정 PDF 증분 재인제스트 ---
+@router.post("/files/{file_id}/reingest", response_model=ReingestResponse)
+def reingest_endpoint(file_id: int, req: ReingestRequest, db: Session = Depends(get_db)):
+    """바뀐 페이지의 청크만 다시 만들고, 새 내용의 청크만 임베딩한다."""
+    db_file = crud.get_file(db, file_id)
+    if db_file is None:
+        raise HTTPException(status_code=404, detail="파일을 찾을 수 없습니다")
+    pdf = Path(req.pdf_path)
+    other = crud.get_file_by_sha256(db, file_sha256(pdf))
+    if other is not None and other.id != file_id:
+        raise HTTPException(status_code=409, detail=f"같은 내용의 파일이 이미 있습니다: {other.id}")
+    if not req.upstage_api_key:
         raise HTTPException(status_code=400, detail="UPSTAGE_API_KEY 필요")
-    analyzer = LayoutAnalyzer(api_key)
-    json_paths: Dict[str, str] = {}
-    documents: list[tuple[str, int]] = []
-    for part in parts:
-        try:
-            json_path = analyzer.execute(part)
-        except ValueError as e:
-            raise HTTPException(status_code=502, detail=str(e))
-        json_paths[str(Path(part).resolve())] = str(Path(json_path).resolve())
-
-        doc = crud.create_document(
-            db,
-            DocumentCreate(
-                file_id=db_file.id,
-                title=Path(part).name,
-                doc_meta={"pdf_path": str(Path(part).resolve()), "json_path": str(Path(json_path).resolve())},
-            ),
+    try:
+        stats = reingest_file(
+            db, db_file, pdf, batch_size=req.batch_size, api_key=req.upstage_api_key, concurrency=req.concurrency,
+            dedup_threshold=req.dedup_threshold,
         )
-        documents.append((part, doc.id))
-
-    for part, doc_id in documents:
-        text = extract_text_from_pdf(part)
-        pieces = chunk_text(text)
-        for order, piece in enumerate(pieces, start=1):
-            chunk_db = crud.create_chunk(
-                db,
-                ChunkCreate(
-                    document_id=doc_id,
-                    content=piece,
-                    chunk_order=order,
-                ),
-            )
-            vec, model_name = get_embedding(piece)
-            crud.create_embedding(
-                db,
-                EmbeddingCreate(
-                    chunk_id=chunk_db.id,
-                    vector=vec,
-                    model=model_name,
-                    dim=len(vec),
-                ),
-            )
-
-    base = ARTIFACT_DIR / pdf.stem
-    proc = PDFImageProcessor(str(pdf), output_folder=str(base))
-    proc.extract_images()
-    images = sorted([str(p.resolve()) for p in base.glob("page_*_figure_*.png")])
-    html_path = base / f"{base.name}.html"
-    md_path = base / f"{base.name}.md"
-    # 4) chunking & embedding
-    with md_path.open("r", encoding="utf-8") as f:
-        md_text = f.read()
-    chunks = chunk_text(md_text)
-    chunk_texts = [c["text"] for c in chunks]
-    embeddings: List[List[float]] = []
-    model_name: Optional[str] = None
-    dim: Optional[int] = None
-    for c in chunk_texts:
-        vec, model_name, dim = embed_text(c)
-        embeddings.append(vec)
-
-    return RunResponse(
-        parts=[str(Path(p).resolve()) for p in parts],
-        json_paths=json_paths,
-        output_folder=str(base.resolve()),
-        html_path=str(html_path.resolve()),
-        md_path=str(md_path.resolve()),
-        images=images,
-        chunks=chunk_texts,
-        embeddings=embeddings,
-        embedding_model=model_name,
-        embedding_dim=dim,
-    )
+    except ValueError as e:
+        raise HTTPException(status_code=502, detail=str(e))
+    return ReingestResponse(file_id=file_id, **stats)
 
 # --- 산출물 바로 내려받기(추후 필요하면) ---
 @router.get("/artifact")
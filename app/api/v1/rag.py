@@ -1,5 +1,37 @@
 # 질의 → 검색 → 생성 엔드포인트
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app.db.session import get_db
+from app.schemas.rag import SearchHit, SearchRequest, SearchResponse
+from app.services import search
 
 router = APIRouter(prefix="/rag", tags=["rag"])
 
+
+@router.post("/search", response_model=SearchResponse)
+def search_endpoint(req: SearchRequest, db: Session = Depends(get_db)):
+    """키워드(BM25)·벡터 검색을 동시에 돌려 RRF 로 합친 청크 top-k(``mode`` 로 한쪽만 쓸 수 있음)."""
+    result = search.search_chunks(
+        db, req.query, k=req.k, mode=req.mode,
+        weights=req.weights.model_dump(exclude_none=True) if req.weights else None,
+        rrf_k=req.rrf_k, ef_search=req.ef_search, probes=req.probes, keyword_backend=req.keyword_backend,
+    )
+    return SearchResponse(
+        model=result.model,
+        keyword_backend=result.keyword_backend,
+        results=[
+            SearchHit(
+                chunk_id=hit.chunk.id,
+                document_id=hit.chunk.document_id,
+                chunk_order=hit.chunk.chunk_order,
+                content=hit.chunk.content,
+                chunk_meta=hit.chunk.chunk_meta,
+                score=hit.score,
+                scores=hit.scores,
+                ranks=hit.ranks,
+            )
+            for hit in result.hits
+        ],
+        latency_ms=result.latency_ms,
+    )
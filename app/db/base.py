@@ -1,6 +1,7 @@
 from __future__ import annotations
 from sqlalchemy.orm import declarative_base
 import os
+import re
 # from dotenv import load_dotenv
 
 Base = declarative_base()
@@ -23,4 +24,19 @@ NAME = os.getenv("POSTGRES_DB")
 # DATABASE_URL이 있으면 우선 사용, 없으면 조합
 DATABASE_URL = os.getenv("DATABASE_URL",
     f"{DB}://{USER}:{PASSWORD}@{HOST}:{PORT}/{NAME}",
-)
\ No newline at end of file
+)
+
+def _ann_models(spec: str) -> tuple[tuple[str, int], ...]:
+    """``"모델:차원,..."`` → ``((모델, 차원), ...)``. 모델 이름은 인덱스 이름·SQL 에 그대로 들어간다."""
+    models = []
+    for item in filter(None, (x.strip() for x in spec.split(","))):
+        name, _, dim = item.partition(":")
+        if not re.fullmatch(r"[A-Za-z0-9_]+", name) or not dim.isdigit():
+            raise ValueError(f"RAG_ANN_MODELS 항목은 '모델:차원' 형식이어야 합니다: {item!r}")
+        models.append((name, int(dim)))
+    return tuple(models)
+
+
+# HNSW 인덱스를 만들 (embeddings.model, 차원): 마이그레이션 0005/0007 이 적용될 때 읽는다.
+# 모델 이름은 app.services.chunk.get_embeddings 가 기록하는 값(예: "openai")이다.
+ANN_MODELS = _ann_models(os.getenv("RAG_ANN_MODELS", "openai:1536"))
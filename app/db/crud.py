@@ -1,6 +1,14 @@
+from datetime import datetime, timedelta, timezone
+from typing import Any, Iterator, Sequence
+
+import numpy as np
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import Select, Text, and_, bindparam, cast, delete, func, insert, literal, or_, select, update
 from sqlalchemy.orm import Session
 from . import models
 from app.schemas.db import (FileCreate, DocumentCreate, ChunkCreate, EmbeddingCreate, ChatHistoryCreate)
+from app.services.retrieval.quantization import PG_TYPES
+from app.services.retrieval.tokenizer import tokenize
 
 
 def _commit(db: Session) -> None:
@@ -23,10 +31,27 @@ def get_file(db: Session, file_id: int) -> models.File | None:
     return db.query(models.File).filter(models.File.id == file_id).first()
 
 
+def get_file_by_sha256(db: Session, sha256: str) -> models.File | None:
+    return db.query(models.File).filter(models.File.sha256 == sha256).first()
+
+
+def update_file_source(db: Session, db_file: models.File, storage_path: str, sha256: str) -> None:
+    db_file.storage_path = storage_path
+    db_file.sha256 = sha256
+    _commit(db)
+
+
 def list_files(db: Session) -> list[models.File]:
     return db.query(models.File).all()
 
 
+def delete_file(db: Session, file_id: int) -> None:
+    """파일 행을 지운다(문서/청크/임베딩은 FK ON DELETE CASCADE 로 함께 삭제)."""
+    db.rollback()
+    db.execute(delete(models.File).where(models.File.id == file_id))
+    _commit(db)
+
+
 def create_document(db: Session, doc_in: DocumentCreate) -> models.Document:
     db_obj = models.Document(**doc_in.model_dump())
     db.add(db_obj)
@@ -39,18 +64,47 @@ def get_document(db: Session, doc_id: int) -> models.Document | None:
     return db.query(models.Document).filter(models.Document.id == doc_id).first()
 
 
+def delete_documents(db: Session, doc_ids: Sequence[int]) -> None:
+    """문서 행들을 지운다(청크/임베딩은 FK ON DELETE CASCADE 로 함께 삭제)."""
+    db.rollback()
+    if doc_ids:
+        db.execute(delete(models.Document).where(models.Document.id.in_(doc_ids)))
+    _commit(db)
+
+
+def update_document_meta(db: Session, doc: models.Document, doc_meta: dict[str, Any]) -> None:
+    doc.doc_meta = dict(doc_meta)  # JSONB 변경 감지를 위해 새 dict 로 교체
+    _commit(db)
+
+
 def list_documents(db: Session) -> list[models.Document]:
     return db.query(models.Document).all()
 
 
 def create_chunk(db: Session, chunk_in: ChunkCreate) -> models.Chunk:
-    db_obj = models.Chunk(**chunk_in.model_dump())
+    db_obj = models.Chunk(**_chunk_row(db, chunk_in))
     db.add(db_obj)
     _commit(db)
     db.refresh(db_obj)
     return db_obj
 
 
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def search_text(content: str) -> str:
+    """``chunks.search_text``: 키워드 토크나이저(한국어는 형태소) 색인어를 공백으로 이은 것."""
+    return " ".join(tokenize(content))
+
+
+def _chunk_row(db: Session, chunk_in: ChunkCreate) -> dict[str, Any]:
+    row = chunk_in.model_dump()
+    if _is_postgres(db):  # search_tsv 생성 열은 PostgreSQL 에만 있다(0006_chunks_keyword_search)
+        row["search_text"] = search_text(chunk_in.content)
+    return row
+
+
 def list_chunks_by_document(db: Session, document_id: int) -> list[models.Chunk]:
     return (
         db.query(models.Chunk)
@@ -60,6 +114,292 @@ def list_chunks_by_document(db: Session, document_id: int) -> list[models.Chunk]
     )
 
 
+def list_chunks_by_documents(db: Session, doc_ids: Sequence[int]) -> list[models.Chunk]:
+    if not doc_ids:
+        return []
+    return (
+        db.query(models.Chunk)
+        .filter(models.Chunk.document_id.in_(doc_ids))
+        .order_by(models.Chunk.document_id, models.Chunk.chunk_order)
+        .all()
+    )
+
+
+def get_chunks(db: Session, chunk_ids: Sequence[int]) -> dict[int, models.Chunk]:
+    if not chunk_ids:
+        return {}
+    return {c.id: c for c in db.scalars(select(models.Chunk).where(models.Chunk.id.in_(chunk_ids)))}
+
+
+def iter_chunk_contents(
+    db: Session, batch_size: int = 1000, document_ids: Sequence[int] | None = None
+) -> Iterator[tuple[int, str]]:
+    """청크(``document_ids`` 를 주면 그 문서들의 청크)의 ``(id, content)`` 를 id 순으로
+    ``batch_size`` 씩 읽어 내보낸다(키워드 색인용)."""
+    if document_ids is not None and not document_ids:
+        return
+    last = None
+    while True:
+        stmt = select(models.Chunk.id, models.Chunk.content).order_by(models.Chunk.id).limit(batch_size)
+        if document_ids is not None:
+            stmt = stmt.where(models.Chunk.document_id.in_(document_ids))
+        if last is not None:
+            stmt = stmt.where(models.Chunk.id > last)
+        rows = db.execute(stmt).all()
+        if not rows:
+            return
+        for chunk_id, content in rows:
+            yield chunk_id, content
+        last = rows[-1][0]
+
+
+def iter_embeddings(
+    db: Session, model: str, dim: int, batch_size: int = 1000
+) -> Iterator[tuple[list[int], np.ndarray]]:
+    """``model``/``dim`` 임베딩을 chunk_id 순으로 ``batch_size`` 씩 ``(chunk_id 목록, float32 행렬)`` 로
+    내보낸다(벡터 색인용)."""
+    last = None
+    while True:
+        stmt = (
+            select(models.Embedding.chunk_id, models.Embedding.vector)
+            # SQLite 는 PRAGMA foreign_keys 없이는 CASCADE 가 안 돌아 남은 임베딩이 있을 수 있다
+            .join(models.Chunk, models.Chunk.id == models.Embedding.chunk_id)
+            .where(models.Embedding.model == model, models.Embedding.dim == dim)
+            .order_by(models.Embedding.chunk_id)
+            .limit(batch_size)
+        )
+        if last is not None:
+            stmt = stmt.where(models.Embedding.chunk_id > last)
+        rows = db.execute(stmt).all()
+        if not rows:
+            return
+        yield [cid for cid, _ in rows], np.asarray([np.asarray(v, dtype=np.float32) for _, v in rows])
+        last = rows[-1][0]
+
+
+def embedded_chunk_ids(db: Session, chunk_ids: Sequence[int]) -> set[int]:
+    if not chunk_ids:
+        return set()
+    stmt = select(models.Embedding.chunk_id).where(models.Embedding.chunk_id.in_(chunk_ids))
+    return set(db.scalars(stmt))
+
+
+def move_chunks(db: Session, positions: Sequence[dict]) -> None:
+    """``{"id", "document_id", "chunk_order"[, "chunk_meta"]}`` 목록으로 기존 청크의 위치(와 메타)만 바꾼다(임베딩 유지)."""
+    if not positions:
+        return
+    try:
+        db.execute(update(models.Chunk), list(positions))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def delete_chunks(db: Session, chunk_ids: Sequence[int]) -> None:
+    """청크를 지운다(임베딩은 FK ON DELETE CASCADE 로 함께 삭제)."""
+    if not chunk_ids:
+        return
+    db.execute(delete(models.Chunk).where(models.Chunk.id.in_(chunk_ids)))
+    _commit(db)
+
+
+def update_chunk_meta(db: Session, chunk: models.Chunk, chunk_meta: dict[str, Any]) -> None:
+    chunk.chunk_meta = dict(chunk_meta)  # JSONB 변경 감지를 위해 새 dict 로 교체
+    _commit(db)
+
+
+def create_lsh_bands(db: Session, rows: Sequence[dict]) -> None:
+    """``{"chunk_id", "band", "bucket"}`` 목록을 저장한다."""
+    if not rows:
+        return
+    try:
+        db.execute(insert(models.ChunkLSHBand), list(rows))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def find_lsh_candidates(
+    db: Session, buckets: Sequence[int], exclude_file_sha256: str | None = None
+) -> list[models.Chunk]:
+    """버킷이 하나라도 겹치는 청크(``exclude_file_sha256`` 파일의 청크는 제외)."""
+    if not buckets:
+        return []
+    stmt = select(models.Chunk).where(
+        models.Chunk.id.in_(
+            select(models.ChunkLSHBand.chunk_id).where(models.ChunkLSHBand.bucket.in_(set(buckets)))
+        )
+    )
+    if exclude_file_sha256 is not None:
+        stmt = (
+            stmt.join(models.Document, models.Document.id == models.Chunk.document_id)
+            .join(models.File, models.File.id == models.Document.file_id)
+            .where((models.File.sha256.is_(None)) | (models.File.sha256 != exclude_file_sha256))
+        )
+    return list(db.scalars(stmt))
+
+
+def _set_local(db: Session, name: str, value: int | None) -> None:
+    if value is not None:
+        db.execute(select(func.set_config(name, str(int(value)), True)))
+
+
+def vector_search_stmt(
+    vector: Sequence[float], model: str, k: int = 5, precision: str = "float32", candidates: int | None = None
+) -> Select:
+    """``search_chunks`` 의 PostgreSQL 쿼리(``precision`` 은 ``quantization.PRECISIONS``).
+
+    ``float32`` 는 ``vector::vector(dim)`` 인덱스로 바로 top-``k`` 를, 그 외 단계는 ``halfvec``/``bit``
+    식 인덱스(0007_embeddings_quantized_ann)로 ``candidates`` 개를 뽑은 뒤 원래 벡터로 다시 정렬한다.
+    """
+    dim = len(vector)
+    exact = cast(models.Embedding.vector, Vector(dim))
+    # 부분 인덱스 조건과 맞춰 보려면 플래너가 값을 알아야 하므로(준비된 문장의 generic plan 대비) 리터럴로
+    same_model = (
+        models.Embedding.model == bindparam("ann_model", model, literal_execute=True),
+        models.Embedding.dim == bindparam("ann_dim", dim, literal_execute=True),
+    )
+    pg_type = PG_TYPES[precision]
+    if pg_type == "vector":
+        distance = exact.cosine_distance(list(vector)).label("distance")
+        return (
+            select(models.Chunk, distance)
+            .join(models.Embedding, models.Embedding.chunk_id == models.Chunk.id)
+            .where(*same_model)
+            .order_by(distance)
+            .limit(k)
+        )
+    if pg_type == "halfvec":
+        approx = cast(models.Embedding.vector, HALFVEC(dim)).cosine_distance(list(vector))
+    else:
+        bits = "".join("1" if x > 0 else "0" for x in vector)  # pgvector binary_quantize 와 같은 규칙
+        approx = cast(func.binary_quantize(exact), BIT(dim)).hamming_distance(cast(literal(bits, Text()), BIT(dim)))
+    shortlist = (
+        select(models.Embedding.chunk_id, models.Embedding.vector)
+        .where(*same_model)
+        .order_by(approx)
+        .limit(max(candidates or k, k))
+        .subquery("ann")
+    )
+    distance = cast(shortlist.c.vector, Vector(dim)).cosine_distance(list(vector)).label("distance")
+    return (
+        select(models.Chunk, distance)
+        .join(shortlist, shortlist.c.chunk_id == models.Chunk.id)
+        .order_by(distance)
+        .limit(k)
+    )
+
+
+def search_chunks(
+    db: Session,
+    vector: Sequence[float],
+    model: str,
+    k: int = 5,
+    ef_search: int | None = None,
+    probes: int | None = None,
+    precision: str = "float32",
+    candidates: int | None = None,
+) -> list[tuple[models.Chunk, float]]:
+    """``model`` 임베딩 중 ``vector`` 와 코사인 거리가 가장 가까운 청크 ``k`` 개를 (청크, 거리)로 반환.
+
+    PostgreSQL 에서는 모델별 부분 식 HNSW/IVFFlat 인덱스를 타도록 같은 식과 ``model``/``dim`` 조건으로
+    정렬하고(``vector_search_stmt``), ``ef_search``/``probes`` 는 현재 트랜잭션에만 적용한다.
+    그 외 DB(SQLite 등)에서는 전체 벡터를 읽어 정확 검색한다(``/rag/search`` 는 대신
+    ``app.services.retrieval.vector_index`` 의 memmap 색인을 쓴다).
+    """
+    if db.get_bind().dialect.name != "postgresql":
+        return _search_chunks_exact(db, vector, model, k)
+    _set_local(db, "hnsw.ef_search", ef_search)
+    _set_local(db, "ivfflat.probes", probes)
+    stmt = vector_search_stmt(vector, model, k, precision, candidates)
+    return [(chunk, float(dist)) for chunk, dist in db.execute(stmt).all()]
+
+
+def get_embedding_vectors(db: Session, chunk_ids: Sequence[int], model: str) -> dict[int, np.ndarray]:
+    """``model`` 임베딩의 원래(float32) 벡터(양자화 후보 재채점용)."""
+    if not chunk_ids:
+        return {}
+    rows = db.execute(
+        select(models.Embedding.chunk_id, models.Embedding.vector)
+        .where(models.Embedding.chunk_id.in_(chunk_ids), models.Embedding.model == model)
+    ).all()
+    return {cid: np.asarray(v, dtype=np.float32) for cid, v in rows}
+
+
+def _search_chunks_exact(
+    db: Session, vector: Sequence[float], model: str, k: int
+) -> list[tuple[models.Chunk, float]]:
+    rows = db.execute(
+        select(models.Embedding.chunk_id, models.Embedding.vector)
+        .where(models.Embedding.model == model, models.Embedding.dim == len(vector))
+    ).all()
+    if not rows:
+        return []
+    matrix = np.asarray([np.asarray(v, dtype=np.float32) for _, v in rows])
+    q = np.asarray(vector, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1) * np.linalg.norm(q)
+    distances = 1.0 - (matrix @ q) / np.where(norms == 0, 1.0, norms)
+    top = np.argsort(distances, kind="stable")[:k]
+    chunks = get_chunks(db, [rows[i][0] for i in top])
+    return [(chunks[rows[i][0]], float(distances[i])) for i in top]
+
+
+def keyword_search_stmt(query: str, k: int = 10, trigram_weight: float = 0.0) -> Select | None:
+    """:func:`keyword_search_chunks` 의 SELECT(질의에 색인어가 없으면 ``None``)."""
+    terms = list(dict.fromkeys(tokenize(query)))
+    if not terms:
+        return None
+    tsquery = func.plainto_tsquery("simple", terms[0])
+    for term in terms[1:]:
+        tsquery = tsquery.op("||")(func.plainto_tsquery("simple", term))
+    score = func.ts_rank_cd(models.Chunk.search_tsv, tsquery, 1)
+    match = models.Chunk.search_tsv.op("@@")(tsquery)
+    if trigram_weight > 0:
+        # query <% content: word_similarity(query, content) >= pg_trgm.word_similarity_threshold (GIN 사용)
+        score = score + trigram_weight * func.word_similarity(query, models.Chunk.content)
+        match = or_(match, literal(query).op("<%")(models.Chunk.content))
+    score = score.label("score")
+    return select(models.Chunk.id, score).where(match).order_by(score.desc(), models.Chunk.id).limit(k)
+
+
+def keyword_search_chunks(
+    db: Session, query: str, k: int = 10, trigram_weight: float = 0.0
+) -> list[tuple[int, float]]:
+    """PostgreSQL 인덱스만으로 키워드 검색한 ``(chunk_id, score)`` 를 점수 내림차순으로.
+
+    질의도 인제스트와 같은 토크나이저로 나눠 색인어 OR 로 ``search_tsv`` GIN 인덱스를 찾고
+    ``ts_rank_cd``(길이 정규화 1: 1 + log(문서 길이)로 나눔)로 정렬한다. ``trigram_weight`` 가 0 보다
+    크면 ``content`` pg_trgm 인덱스로 ``word_similarity`` 가 문턱 이상인 청크(오타, 복합어 일부)도
+    후보에 넣고 그 유사도에 가중치를 곱해 더한다.
+    """
+    stmt = keyword_search_stmt(query, k, trigram_weight)
+    if stmt is None:
+        return []
+    return [(chunk_id, float(score)) for chunk_id, score in db.execute(stmt).all()]
+
+
+def backfill_search_text(db: Session, batch_size: int = 1000) -> int:
+    """``search_text`` 가 비어 있는 청크를 채운다(0006 마이그레이션 이전 행). 채운 행 수를 반환."""
+    total = 0
+    while True:
+        rows = db.execute(
+            select(models.Chunk.id, models.Chunk.content)
+            .where(models.Chunk.search_text.is_(None))
+            .order_by(models.Chunk.id)
+            .limit(batch_size)
+        ).all()
+        if not rows:
+            return total
+        db.execute(
+            update(models.Chunk),
+            [{"id": chunk_id, "search_text": search_text(content)} for chunk_id, content in rows],
+        )
+        _commit(db)
+        total += len(rows)
+
+
 def create_embedding(db: Session, emb_in: EmbeddingCreate) -> models.Embedding:
     db_obj = models.Embedding(**emb_in.model_dump())
     db.add(db_obj)
@@ -68,6 +408,233 @@ def create_embedding(db: Session, emb_in: EmbeddingCreate) -> models.Embedding:
     return db_obj
 
 
+def _vector_literal(vector: Sequence[float]) -> str:
+    return "[" + ",".join(repr(float(v)) for v in vector) + "]"
+
+
+def _use_copy(db: Session) -> bool:
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver == "psycopg"
+
+
+def _insert_embedding_rows(db: Session, rows: list[dict]) -> None:
+    """현재 트랜잭션 안에서 임베딩 행을 한꺼번에 넣는다.
+
+    PostgreSQL(psycopg3)에서는 COPY, 그 외(SQLite 등)에서는 executemany INSERT.
+    """
+    if not rows:
+        return
+    if _use_copy(db):
+        raw = db.connection().connection.driver_connection
+        with raw.cursor() as cur:
+            with cur.copy("COPY embeddings (chunk_id, vector, model, dim) FROM STDIN") as copy:
+                for r in rows:
+                    copy.write_row((r["chunk_id"], _vector_literal(r["vector"]), r["model"], r["dim"]))
+    else:
+        db.execute(insert(models.Embedding), rows)
+
+
+def bulk_create_chunks(db: Session, chunks_in: Sequence[ChunkCreate]) -> list[int]:
+    """청크 여러 개를 한 트랜잭션의 multi-row INSERT … RETURNING 으로 저장하고 id 목록을 입력 순서로 반환."""
+    return bulk_create_chunks_with_embeddings(db, chunks_in)
+
+
+def bulk_create_embeddings(db: Session, embs_in: Sequence[EmbeddingCreate]) -> None:
+    try:
+        _insert_embedding_rows(db, [e.model_dump() for e in embs_in])
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def bulk_create_chunks_with_embeddings(
+    db: Session,
+    chunks_in: Sequence[ChunkCreate],
+    vectors: Sequence[Sequence[float]] | None = None,
+    model: str | None = None,
+) -> list[int]:
+    """문서 하나의 청크와 (있으면) 벡터를 단일 트랜잭션으로 저장한다.
+
+    ``vectors`` 는 ``chunks_in`` 과 같은 순서/길이여야 한다. 생성된 청크 id 를 입력 순서로 반환.
+    """
+    if not chunks_in:
+        return []
+    if vectors is not None and len(vectors) != len(chunks_in):
+        raise ValueError("청크와 벡터 개수가 일치하지 않습니다")
+    try:
+        ids = list(
+            db.scalars(
+                insert(models.Chunk).returning(models.Chunk.id, sort_by_parameter_order=True),
+                [_chunk_row(db, c) for c in chunks_in],
+            )
+        )
+        if vectors is not None:
+            _insert_embedding_rows(
+                db,
+                [
+                    {"chunk_id": cid, "vector": list(vec), "model": model, "dim": len(vec)}
+                    for cid, vec in zip(ids, vectors)
+                ],
+            )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return ids
+
+
+def bump_corpus_version(db: Session, file_id: int | None, stats: dict[str, Any] | None = None) -> int:
+    db_obj = models.CorpusVersion(file_id=file_id, stats=stats)
+    db.add(db_obj)
+    _commit(db)
+    return db_obj.id
+
+
+def get_corpus_version(db: Session) -> int:
+    return db.scalar(select(func.max(models.CorpusVersion.id))) or 0
+
+
+def create_job(db: Session, payload: dict[str, Any]) -> models.IngestionJob:
+    db_obj = models.IngestionJob(status="queued", payload=payload, stages={})
+    db.add(db_obj)
+    _commit(db)
+    db.refresh(db_obj)
+    return db_obj
+
+
+def get_job(db: Session, job_id: int) -> models.IngestionJob | None:
+    return db.get(models.IngestionJob, job_id)
+
+
+def claim_job(
+    db: Session, worker_id: str, lease_seconds: float = 300, max_attempts: int = 3
+) -> models.IngestionJob | None:
+    """가장 오래된 queued 작업(또는 임대가 끝난 running 작업) 하나를 running 으로 바꿔 가져온다.
+
+    ``FOR UPDATE SKIP LOCKED`` 라 여러 워커가 동시에 호출해도 같은 작업을 두 번 가져가지 않는다.
+    ``lease_seconds`` 동안 heartbeat 가 없던 running 작업은 워커가 죽은 것으로 보고 다시 가져가되,
+    이미 ``max_attempts`` 번 가져간 작업은 failed 로 끝낸다.
+    """
+    job_cls = models.IngestionJob
+    expired = and_(
+        job_cls.status == "running",
+        func.coalesce(job_cls.heartbeat_at, job_cls.started_at) < _lease_cutoff(db, lease_seconds),
+    )
+    try:
+        db.execute(
+            update(job_cls)
+            .where(expired, job_cls.attempts >= max_attempts)
+            .values(status="failed", finished_at=func.now(),
+                    error=f"임대 만료: 워커가 {max_attempts}번 응답 없이 중단됨")
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    stmt = (
+        select(job_cls)
+        .where(or_(job_cls.status == "queued", expired))
+        .order_by(job_cls.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+    )
+    job = db.scalars(stmt).first()
+    if job is None:
+        db.rollback()
+        return None
+    job.status = "running"
+    job.worker_id = worker_id
+    job.started_at = job.heartbeat_at = func.now()
+    job.attempts = (job.attempts or 0) + 1
+    _commit(db)
+    db.refresh(job)
+    return job
+
+
+def _lease_cutoff(db: Session, lease_seconds: float):
+    """임대 만료 기준 시각. 워커마다 시계가 다를 수 있어 DB 시계로 계산한다."""
+    if _is_postgres(db):
+        return func.now() - timedelta(seconds=lease_seconds)
+    # SQLite(테스트): CURRENT_TIMESTAMP 와 같은 UTC 'YYYY-MM-DD HH:MM:SS' 문자열
+    return func.datetime("now", f"-{lease_seconds:g} seconds")
+
+
+def _update_owned_job(db: Session, job: models.IngestionJob, worker_id: str, **values: Any) -> bool:
+    """``worker_id`` 가 아직 임대를 가진 running 작업일 때만 갱신한다(fencing).
+
+    임대가 만료돼 다른 워커가 다시 가져간 작업이면 아무것도 쓰지 않고 ``False`` 를 돌려준다.
+    ``job.worker_id`` 는 커밋 후 다시 읽으면 새 주인의 값일 수 있어 claim 때의 값을 따로 받는다.
+    """
+    job_cls = models.IngestionJob
+    try:
+        result = db.execute(
+            update(job_cls)
+            .where(job_cls.id == job.id, job_cls.worker_id == worker_id, job_cls.status == "running")
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result.rowcount > 0
+
+
+def heartbeat_job(db: Session, job_id: int, worker_id: str) -> bool:
+    """``worker_id`` 가 아직 가진 running 작업의 임대를 연장한다. 다른 워커가 가져갔으면 ``False``."""
+    try:
+        result = db.execute(
+            update(models.IngestionJob)
+            .where(
+                models.IngestionJob.id == job_id,
+                models.IngestionJob.worker_id == worker_id,
+                models.IngestionJob.status == "running",
+            )
+            .values(heartbeat_at=func.now())
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    return result.rowcount > 0
+
+
+def update_job_stage(
+    db: Session, job: models.IngestionJob, worker_id: str, stage: str, status: str,
+    seconds: float | None = None,
+) -> bool:
+    """단계 상태를 기록한다. 임대를 잃었으면 ``False`` (기록하지 않음)."""
+    now = datetime.now(timezone.utc).isoformat()
+    stages = dict(job.stages or {})
+    entry = dict(stages.get(stage) or {})
+    entry["status"] = status
+    if status == "running":
+        entry["started_at"] = now
+    else:
+        entry["finished_at"] = now
+        entry["seconds"] = round(seconds or 0.0, 3)
+    stages[stage] = entry
+    return _update_owned_job(db, job, worker_id, stages=stages)
+
+
+def finish_job(db: Session, job: models.IngestionJob, worker_id: str, result: dict[str, Any]) -> bool:
+    return _update_owned_job(db, job, worker_id, status="succeeded", result=result, finished_at=func.now())
+
+
+def fail_job(db: Session, job: models.IngestionJob, worker_id: str, error: str) -> bool:
+    db.rollback()
+    stages = {name: dict(entry) for name, entry in (job.stages or {}).items()}
+    for entry in stages.values():
+        if entry.get("status") == "running":
+            entry["status"] = "failed"
+    return _update_owned_job(
+        db, job, worker_id, stages=stages, status="failed", error=error, finished_at=func.now()
+    )
+
+
 def create_chathistory(db: Session, log_in: ChatHistoryCreate) -> models.ChatHistory:
     db_obj = models.ChatHistory(**log_in.model_dump())
     db.add(db_obj)
@@ -5,9 +5,9 @@ from sqlalchemy import pool
 from alembic import context
 import os, sys
 from pathlib import Path
-sys.path.append(str(Path(__file__).resolve().parents[1]))
-from app.db.base import Base
-# from app.db import models
+sys.path.append(str(Path(__file__).resolve().parents[3]))
+from app.db.base import Base, DATABASE_URL
+from app.db import models  # noqa: F401  (메타데이터 등록)
 
 config = context.config
 
@@ -16,12 +16,21 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# alembic.ini 대신 앱과 같은 DATABASE_URL 사용
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("%", "%%"))
+
 # add your model's MetaData object here
 # for 'autogenerate' support
 # from myapp import mymodel
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_object(object, name, type_, reflected, compare_to):
+    # 모델별 ANN 식 인덱스(0005_embeddings_hnsw)는 메타데이터에 없으므로 autogenerate 가 지우지 않게 제외
+    return not (type_ == "index" and name and name.startswith("ix_embeddings_ann_"))
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -43,6 +52,7 @@ def run_migrations_offline() -> None:
     context.configure(
         url=url,
         target_metadata=target_metadata,
+        include_object=include_object,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
     )
@@ -66,7 +76,7 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection, target_metadata=target_metadata, include_object=include_object
         )
 
         with context.begin_transaction():
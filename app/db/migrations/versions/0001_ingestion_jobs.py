@@ -0,0 +1,52 @@
+"""ingestion_jobs 작업 큐 테이블
+
+Revision ID: 0001_ingestion_jobs
+Revises:
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0001_ingestion_jobs"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "ingestion_jobs",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("status", sa.String(), server_default="queued", nullable=False),
+        sa.Column("payload", postgresql.JSONB(), nullable=False),
+        sa.Column("stages", postgresql.JSONB(), nullable=True),
+        sa.Column("result", postgresql.JSONB(), nullable=True),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("worker_id", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+    )
+    op.create_index("ix_ingestion_jobs_id", "ingestion_jobs", ["id"])
+    op.create_index("ix_ingestion_jobs_status", "ingestion_jobs", ["status"])
+    # claim_job 의 "status = 'queued' ORDER BY id" 조회용 부분 인덱스
+    op.create_index(
+        "ix_ingestion_jobs_queued",
+        "ingestion_jobs",
+        ["id"],
+        postgresql_where=sa.text("status = 'queued'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ingestion_jobs_queued", table_name="ingestion_jobs")
+    op.drop_index("ix_ingestion_jobs_status", table_name="ingestion_jobs")
+    op.drop_index("ix_ingestion_jobs_id", table_name="ingestion_jobs")
+    op.drop_table("ingestion_jobs")
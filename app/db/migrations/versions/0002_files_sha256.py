@@ -0,0 +1,29 @@
+"""files.sha256 콘텐츠 해시(업로드 중복 제거)
+
+Revision ID: 0002_files_sha256
+Revises: 0001_ingestion_jobs
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002_files_sha256"
+down_revision: Union[str, Sequence[str], None] = "0001_ingestion_jobs"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("files", sa.Column("sha256", sa.String(length=64), nullable=True))
+    op.create_index("ix_files_sha256", "files", ["sha256"], unique=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_files_sha256", table_name="files")
+    op.drop_column("files", "sha256")
@@ -0,0 +1,36 @@
+"""corpus_versions 코퍼스 버전 기록(증분 재인제스트)
+
+Revision ID: 0003_corpus_versions
+Revises: 0002_files_sha256
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = "0003_corpus_versions"
+down_revision: Union[str, Sequence[str], None] = "0002_files_sha256"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "corpus_versions",
+        sa.Column("id", sa.BigInteger(), primary_key=True),
+        sa.Column("file_id", sa.BigInteger(), sa.ForeignKey("files.id", ondelete="SET NULL"), nullable=True),
+        sa.Column("stats", postgresql.JSONB(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_corpus_versions_id", "corpus_versions", ["id"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_corpus_versions_id", table_name="corpus_versions")
+    op.drop_table("corpus_versions")
@@ -0,0 +1,34 @@
+"""chunk_lsh_bands 청크 MinHash LSH 버킷(near-duplicate 제거)
+
+Revision ID: 0004_chunk_lsh_bands
+Revises: 0003_corpus_versions
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0004_chunk_lsh_bands"
+down_revision: Union[str, Sequence[str], None] = "0003_corpus_versions"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        "chunk_lsh_bands",
+        sa.Column("chunk_id", sa.BigInteger(), sa.ForeignKey("chunks.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("band", sa.SmallInteger(), primary_key=True),
+        sa.Column("bucket", sa.BigInteger(), nullable=False),
+    )
+    op.create_index("ix_chunk_lsh_bands_bucket", "chunk_lsh_bands", ["bucket"])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_chunk_lsh_bands_bucket", table_name="chunk_lsh_bands")
+    op.drop_table("chunk_lsh_bands")
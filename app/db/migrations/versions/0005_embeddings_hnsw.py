@@ -0,0 +1,49 @@
+"""embeddings 모델별 고정 차원 HNSW 인덱스(/rag/search)
+
+``embeddings.vector`` 는 차원이 없는 ``vector`` 라 그대로는 인덱싱할 수 없으므로, 모델마다
+``vector::vector(dim)`` 식 인덱스를 ``model``/``dim`` 부분 인덱스로 만든다. 검색 쿼리는 같은 식과
+조건(``crud.search_chunks``)을 써야 인덱스를 탄다. 대상 모델은 ``RAG_ANN_MODELS``
+(기본 ``openai:1536``, :data:`app.db.base.ANN_MODELS`)로 정한다. 이미 적용된 뒤 새 임베딩 모델을 쓰면
+``RAG_ANN_MODELS`` 에 추가하고, 그 모델만 만드는 같은 모양의 마이그레이션을 추가한다
+(이 리비전을 다시 적용해도 ``IF NOT EXISTS`` 라 기존 인덱스는 그대로다).
+
+Revision ID: 0005_embeddings_hnsw
+Revises: 0004_chunk_lsh_bands
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.base import ANN_MODELS
+
+# revision identifiers, used by Alembic.
+revision: str = "0005_embeddings_hnsw"
+down_revision: Union[str, Sequence[str], None] = "0004_chunk_lsh_bands"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (embeddings.model, 차원): app.services.chunk.get_embeddings 가 기록하는 모델 이름
+INDEXED_MODELS = ANN_MODELS
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    # 큰 테이블에서도 쓰기를 막지 않도록 CONCURRENTLY(트랜잭션 밖에서 실행)
+    with op.get_context().autocommit_block():
+        for model, dim in INDEXED_MODELS:
+            op.execute(
+                f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_embeddings_ann_{model}_{dim} "
+                f"ON embeddings USING hnsw ((vector::vector({dim})) vector_cosine_ops) "
+                f"WITH (m = 16, ef_construction = 64) "
+                f"WHERE model = '{model}' AND dim = {dim}"
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for model, dim in INDEXED_MODELS:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_embeddings_ann_{model}_{dim}")
@@ -0,0 +1,49 @@
+"""chunks 키워드 검색: 형태소 분리 텍스트의 생성 tsvector + pg_trgm GIN 인덱스
+
+``search_text`` 는 인제스트 시 벌크 삽입 경로(``crud``)에서 키워드 토크나이저로 한 번만 계산한
+색인어 나열이고, ``search_tsv`` 는 그것을 ``simple`` 설정으로 바꾼 STORED 생성 열이다.
+기존 행의 ``search_text`` 는 비어 있으므로 ``python scripts/rebuild_index.py --pg-backfill`` 로 채운다.
+
+Revision ID: 0006_chunks_keyword_search
+Revises: 0005_embeddings_hnsw
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0006_chunks_keyword_search"
+down_revision: Union[str, Sequence[str], None] = "0005_embeddings_hnsw"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column("chunks", sa.Column("search_text", sa.Text(), nullable=True))
+    op.execute(
+        "ALTER TABLE chunks ADD COLUMN search_tsv tsvector "
+        "GENERATED ALWAYS AS (to_tsvector('simple', coalesce(search_text, ''))) STORED"
+    )
+    # 큰 테이블에서도 쓰기를 막지 않도록 CONCURRENTLY(트랜잭션 밖에서 실행)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_search_tsv ON chunks USING gin (search_tsv)"
+        )
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_chunks_content_trgm "
+            "ON chunks USING gin (content gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_content_trgm")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_chunks_search_tsv")
+    op.drop_column("chunks", "search_tsv")
+    op.drop_column("chunks", "search_text")
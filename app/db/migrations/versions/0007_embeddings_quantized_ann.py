@@ -0,0 +1,54 @@
+"""embeddings 모델별 양자화 HNSW 인덱스(halfvec, binary)
+
+``RAG_VECTOR_PRECISION`` 으로 모델의 검색 정밀도를 ``float16``/``int8`` 또는 ``binary`` 로 두면
+``crud.vector_search_stmt`` 가 아래 식으로 후보를 뽑고 ``embeddings.vector``(float32 그대로)로 다시
+정렬한다. 인덱스 크기는 ``vector`` 대비 halfvec 약 1/2, bit 약 1/32 이다. 쓰는 단계를 정한 뒤에는
+안 쓰는 ``ix_embeddings_ann_*`` 인덱스를 지워야 메모리가 실제로 줄어든다
+(``python scripts/bench_ingestion.py quantization`` 이 인덱스 크기와 재현율을 보여 준다).
+
+Revision ID: 0007_embeddings_quantized_ann
+Revises: 0006_chunks_keyword_search
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+from app.db.base import ANN_MODELS
+
+# revision identifiers, used by Alembic.
+revision: str = "0007_embeddings_quantized_ann"
+down_revision: Union[str, Sequence[str], None] = "0006_chunks_keyword_search"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (embeddings.model, 차원): 0005_embeddings_hnsw 와 같은 모델(RAG_ANN_MODELS)
+INDEXED_MODELS = ANN_MODELS
+# 접미사 → (인덱스 식, 연산자 클래스). 식은 crud.vector_search_stmt 와 같아야 한다
+QUANTIZED = {
+    "half": ("(vector::halfvec({dim}))", "halfvec_cosine_ops"),
+    "bit": ("(binary_quantize(vector::vector({dim}))::bit({dim}))", "bit_hamming_ops"),
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # halfvec/bit HNSW 는 pgvector 0.7 이상
+    with op.get_context().autocommit_block():
+        for model, dim in INDEXED_MODELS:
+            for suffix, (expr, ops) in QUANTIZED.items():
+                op.execute(
+                    f"CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_embeddings_ann_{model}_{dim}_{suffix} "
+                    f"ON embeddings USING hnsw ({expr.format(dim=dim)} {ops}) "
+                    f"WITH (m = 16, ef_construction = 64) "
+                    f"WHERE model = '{model}' AND dim = {dim}"
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for model, dim in INDEXED_MODELS:
+            for suffix in QUANTIZED:
+                op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS ix_embeddings_ann_{model}_{dim}_{suffix}")
@@ -0,0 +1,42 @@
+"""ingestion_jobs 임대(lease): heartbeat_at, attempts
+
+워커는 running 작업의 ``heartbeat_at`` 을 주기적으로 갱신하고, ``crud.claim_job`` 은 임대가 끝난
+(워커가 죽은) running 작업을 ``attempts`` 상한까지 다시 가져간다.
+
+Revision ID: 0008_ingestion_jobs_lease
+Revises: 0007_embeddings_quantized_ann
+Create Date: 2026-10-18 00:00:00
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0008_ingestion_jobs_lease"
+down_revision: Union[str, Sequence[str], None] = "0007_embeddings_quantized_ann"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column("ingestion_jobs", sa.Column("heartbeat_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("ingestion_jobs", sa.Column("attempts", sa.Integer(), server_default="0", nullable=False))
+    # 이미 running 인 작업은 attempts 1 로(한 번 가져간 것)
+    op.execute("UPDATE ingestion_jobs SET attempts = 1 WHERE status <> 'queued'")
+    # claim_job 의 임대 만료 조회용 부분 인덱스
+    op.create_index(
+        "ix_ingestion_jobs_running",
+        "ingestion_jobs",
+        ["heartbeat_at"],
+        postgresql_where=sa.text("status = 'running'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index("ix_ingestion_jobs_running", table_name="ingestion_jobs")
+    op.drop_column("ingestion_jobs", "attempts")
+    op.drop_column("ingestion_jobs", "heartbeat_at")
@@ -1,7 +1,7 @@
-from sqlalchemy import BigInteger, Column, DateTime, ForeignKey, Integer, String, Text
-from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy import BigInteger, Column, Computed, DateTime, ForeignKey, Index, Integer, SmallInteger, String, Text
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.sql import func
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import deferred, relationship
 from pgvector.sqlalchemy import Vector
 
 from .base import Base
@@ -14,6 +14,7 @@ class File(Base):
     original_name = Column(String, nullable=False)
     mime_type = Column(String, nullable=False)
     storage_path = Column(String, nullable=False)
+    sha256 = Column(String(64), nullable=True, unique=True, index=True)
     uploaded_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
 
     documents = relationship("Document", back_populates="file")
@@ -33,19 +34,34 @@ class Document(Base):
 
 
 class Chunk(Base):
+    """``search_text`` 는 인제스트 때 계산한 키워드 색인어 나열, ``search_tsv`` 는 그 생성 tsvector
+    (둘 다 조회 시 기본으로 읽지 않음, 마이그레이션 0006_chunks_keyword_search)."""
     __tablename__ = "chunks"
+    __table_args__ = (
+        Index("ix_chunks_search_tsv", "search_tsv", postgresql_using="gin"),
+        Index("ix_chunks_content_trgm", "content", postgresql_using="gin",
+              postgresql_ops={"content": "gin_trgm_ops"}),
+    )
 
     id = Column(BigInteger, primary_key=True, index=True)
     document_id = Column(BigInteger, ForeignKey("documents.id", ondelete="CASCADE"), nullable=False)
     content = Column(Text, nullable=False)
     chunk_order = Column(Integer, nullable=False)
     chunk_meta = Column(JSONB, nullable=True)
+    search_text = deferred(Column(Text, nullable=True))
+    search_tsv = deferred(Column(
+        TSVECTOR, Computed("to_tsvector('simple', coalesce(search_text, ''))", persisted=True),
+    ))
 
     document = relationship("Document", back_populates="chunks")
     embedding = relationship("Embedding", uselist=False, back_populates="chunk")
 
 
 class Embedding(Base):
+    """``vector`` 는 모델마다 차원이 달라 차원 없이 두고, ANN 인덱스는 모델별
+    ``vector::vector(dim)`` 부분 식 인덱스로 만든다(마이그레이션 0005_embeddings_hnsw).
+    양자화 검색용 ``halfvec``/``bit`` 식 인덱스는 0007_embeddings_quantized_ann 이고, 재채점에 쓰므로
+    ``vector`` 자체는 항상 float32 로 저장한다."""
     __tablename__ = "embeddings"
 
     chunk_id = Column(BigInteger, ForeignKey("chunks.id", ondelete="CASCADE"), primary_key=True)
@@ -56,6 +72,15 @@ class Embedding(Base):
     chunk = relationship("Chunk", back_populates="embedding")
 
 
+class ChunkLSHBand(Base):
+    """청크 MinHash 서명의 LSH 밴드 버킷(코퍼스 전체 near-duplicate 후보 조회용)."""
+    __tablename__ = "chunk_lsh_bands"
+
+    chunk_id = Column(BigInteger, ForeignKey("chunks.id", ondelete="CASCADE"), primary_key=True)
+    band = Column(SmallInteger, primary_key=True)
+    bucket = Column(BigInteger, nullable=False, index=True)
+
+
 class ChatHistory(Base):
     __tablename__ = "chat_history"
 
@@ -63,3 +88,30 @@ class ChatHistory(Base):
     user_input = Column(Text, nullable=False)
     llm_output = Column(Text, nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+class IngestionJob(Base):
+    __tablename__ = "ingestion_jobs"
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    status = Column(String, nullable=False, server_default="queued", index=True)  # queued | running | succeeded | failed
+    payload = Column(JSONB, nullable=False)   # RunRequest(API 키 제외)
+    stages = Column(JSONB, nullable=True)     # {stage: {status, started_at, finished_at, seconds}}
+    result = Column(JSONB, nullable=True)
+    error = Column(Text, nullable=True)
+    worker_id = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+    heartbeat_at = Column(DateTime(timezone=True), nullable=True)  # 워커가 주기적으로 갱신(임대)
+    attempts = Column(Integer, nullable=False, server_default="0")  # claim 횟수(임대 만료 재시도 포함)
+
+
+class CorpusVersion(Base):
+    """코퍼스가 바뀔 때마다(재인제스트 등) 한 행씩 쌓이는 버전 기록. 최신 id 가 현재 버전."""
+    __tablename__ = "corpus_versions"
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    file_id = Column(BigInteger, ForeignKey("files.id", ondelete="SET NULL"), nullable=True)
+    stats = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
@@ -7,6 +7,7 @@ class FileBase(BaseModel):
     original_name: str
     mime_type: str
     storage_path: str
+    sha256: Optional[str] = None
 
 
 class FileCreate(FileBase):
@@ -79,3 +80,19 @@ class ChatHistoryRead(ChatHistoryBase):
     id: int
     created_at: datetime
     model_config = ConfigDict(from_attributes=True)
+
+
+class IngestionJobRead(BaseModel):
+    id: int
+    status: str
+    payload: dict[str, Any]
+    stages: Optional[dict[str, Any]] = None
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    worker_id: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+    attempts: int = 0
+    model_config = ConfigDict(from_attributes=True)
@@ -4,11 +4,14 @@ from pydantic import BaseModel, Field, FilePath
 
 # 업로드 완료 시 파일 메타 반환
 class UploadResponse(BaseModel):
-    """업로드 결과: 파일명, 저장 경로, 바이트 크기"""
+    """업로드 결과: 파일명, 저장 경로, 바이트 크기(같은 내용이 이미 있으면 기존 파일과 문서 id)"""
     filename: str
     path: str
     size: int
     file_id: int
+    sha256: Optional[str] = None
+    duplicate: bool = False
+    document_ids: List[int] = []
 
 # PDF 분할 요청 파라미터
 class SplitRequest(BaseModel):
@@ -28,6 +31,8 @@ class AnalyzeRequest(BaseModel):
     upstage_api_key: Optional[str] = Field(
         default_factory=lambda: os.getenv("UPSTAGE_API_KEY")
     )
+    concurrency: Optional[int] = Field(default=None, ge=1)  # 동시 분석 파트 수(미지정 시 UPSTAGE_MAX_CONCURRENCY)
+    use_cache: bool = True  # False 면 레이아웃 캐시를 건너뛰고 다시 분석
 
 # Upstage 레이아웃 분석 결과
 class AnalyzeResponse(BaseModel):
@@ -55,6 +60,12 @@ class RunRequest(BaseModel):
     upstage_api_key: Optional[str] = Field(
         default_factory=lambda: os.getenv("UPSTAGE_API_KEY")
     )
+    concurrency: Optional[int] = Field(default=None, ge=1)  # 동시 분석 파트 수(미지정 시 UPSTAGE_MAX_CONCURRENCY)
+    use_cache: bool = True  # False 면 레이아웃 캐시를 건너뛰고 다시 분석
+    write_parts: bool = False  # 디버그용: 분할 파트 PDF 를 산출물 폴더에 파일로 저장
+    native_fast_path: bool = True  # 텍스트 레이어로 충분한 페이지는 Upstage 대신 로컬에서 추출
+    resume: bool = True  # 이전 실행의 단계 체크포인트가 있으면 첫 미완료 단계부터 재개
+    dedup_threshold: Optional[float] = Field(default=None, gt=0, le=1)  # 중복 청크 MinHash 유사도(미지정 시 DEDUP_THRESHOLD)
 
 # end-to-end 파이프라인 실행 결과
 class RunResponse(BaseModel):
@@ -67,5 +78,38 @@ class RunResponse(BaseModel):
     images: List[str]
     chunks: Optional[List[str]] = None
     embeddings: Optional[List[List[float]]] = None
+    chunk_count: Optional[int] = None
+    dedup: Optional[Dict[str, float]] = None  # 중복 제거 통계(embeddings_saved 등)
     embedding_model: Optional[str] = None
-    embedding_dim: Optional[int] = None
\ No newline at end of file
+    embedding_dim: Optional[int] = None
+# /run 작업 등록 결과
+class RunJobResponse(BaseModel):
+    """등록된 인제스트 작업 id 와 상태(진행 상황은 /ingestion/jobs/{id})"""
+    job_id: int
+    status: str
+
+# 개정 PDF 증분 재인제스트 요청
+class ReingestRequest(BaseModel):
+    """개정된 PDF 경로와 문서(페이지 구간) 크기(최초 인제스트와 같은 값이어야 구간이 맞음), 바뀐 구간 분석용 API 키"""
+    pdf_path: FilePath
+    batch_size: int = 10
+    upstage_api_key: Optional[str] = Field(
+        default_factory=lambda: os.getenv("UPSTAGE_API_KEY")
+    )
+    concurrency: Optional[int] = Field(default=None, ge=1)  # 동시 분석 파트 수(미지정 시 UPSTAGE_MAX_CONCURRENCY)
+    dedup_threshold: Optional[float] = Field(default=None, gt=0, le=1)  # 중복 청크 MinHash 유사도(미지정 시 DEDUP_THRESHOLD)
+
+# 증분 재인제스트 결과
+class ReingestResponse(BaseModel):
+    """문서/청크 변경 건수와 새 코퍼스 버전(변경 없으면 None)"""
+    file_id: int
+    documents_unchanged: int
+    documents_added: int
+    documents_changed: int
+    documents_removed: int
+    chunks_kept: int
+    chunks_inserted: int
+    chunks_merged: int
+    embeddings_reused: int
+    chunks_deleted: int
+    corpus_version: Optional[int] = None
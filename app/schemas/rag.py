@@ -0,0 +1,40 @@
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel, Field
+
+# 검색기별 융합 가중치(0 이면 그 검색기를 돌리지 않음)
+class SearchWeights(BaseModel):
+    """미지정 시 RAG_KEYWORD_WEIGHT / RAG_VECTOR_WEIGHT"""
+    keyword: Optional[float] = Field(default=None, ge=0)
+    vector: Optional[float] = Field(default=None, ge=0)
+
+# 검색 요청
+class SearchRequest(BaseModel):
+    """질의 문장과 top-k, 검색 방식, 융합/ANN 런타임 설정(미지정 시 RAG_* 환경 변수)"""
+    query: str = Field(min_length=1)
+    k: Optional[int] = Field(default=None, ge=1, le=100)
+    mode: Literal["hybrid", "keyword", "vector"] = "hybrid"
+    keyword_backend: Optional[Literal["bm25", "postgres"]] = None  # 미지정 시 RAG_KEYWORD_BACKEND
+    weights: Optional[SearchWeights] = None
+    rrf_k: Optional[int] = Field(default=None, ge=0)                 # RRF 순위 상수
+    ef_search: Optional[int] = Field(default=None, ge=1, le=1000)  # HNSW hnsw.ef_search
+    probes: Optional[int] = Field(default=None, ge=1)              # IVFFlat ivfflat.probes
+
+# 검색된 청크 하나
+class SearchHit(BaseModel):
+    """청크와 점수(hybrid: RRF 점수, keyword: BM25 또는 ts_rank_cd, vector: 코사인 유사도), 검색기별 점수·순위"""
+    chunk_id: int
+    document_id: int
+    chunk_order: int
+    content: str
+    chunk_meta: Optional[dict[str, Any]] = None
+    score: float
+    scores: Dict[str, float] = {}
+    ranks: Dict[str, int] = {}
+
+# 검색 결과
+class SearchResponse(BaseModel):
+    """질의 임베딩 모델, 실제 키워드 백엔드, 점수 내림차순 결과, 검색기별/융합/전체 지연(ms)"""
+    model: Optional[str] = None
+    keyword_backend: Optional[str] = None
+    results: List[SearchHit]
+    latency_ms: Dict[str, float] = {}
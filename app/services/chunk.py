@@ -1,13 +1,18 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterable, List, Sequence, Tuple
 import os, requests
 import hashlib
 import numpy as np
-# import fitz  # type: ignore
+import pymupdf as fitz
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+from app.services.ingestion.embedding import get_embedding_service
+
+# langchain OpenAIEmbeddings 기본 모델과 동일(1536차원)
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-ada-002")
+
 
 def extract_text_from_pdf_upstage(pdf_path: str | Path, api_key: str | None = None) -> str:
     api_key = api_key or os.getenv("UPSTAGE_API_KEY")
@@ -22,6 +27,27 @@ def extract_text_from_pdf_upstage(pdf_path: str | Path, api_key: str | None = No
     return resp.json()["text"]
 
 
+def extract_text_from_pdf(pdf_path: str | Path, pages: Iterable[int] | None = None) -> str:
+    """PDF의 텍스트 레이어를 페이지 순서대로 이어 붙여 반환한다.
+
+    ``pages`` (0-based) 를 주면 해당 페이지만 읽는다.
+    """
+    with fitz.open(pdf_path) as doc:
+        selected = doc if pages is None else (doc[i] for i in pages)
+        return "\n".join(page.get_text() for page in selected)
+
+
+def content_hash(text: str) -> str:
+    """청크/페이지 텍스트의 sha256(재인제스트 시 변경 여부 비교용)."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def page_hashes(pdf_path: str | Path, pages: Iterable[int]) -> List[str]:
+    """``pages`` (0-based) 각 페이지 텍스트 레이어의 해시를 같은 순서로 반환한다."""
+    with fitz.open(pdf_path) as doc:
+        return [content_hash(doc[i].get_text()) for i in pages]
+
+
 def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> List[str]:
     """Split text into chunks using LangChain's RecursiveCharacterTextSplitter."""
     splitter = RecursiveCharacterTextSplitter(
@@ -30,26 +56,39 @@ def chunk_text(text: str, chunk_size: int = 1000, chunk_overlap: int = 200) -> L
     return splitter.split_text(text)
 
 
+def _dummy_embedding(text: str, dim: int) -> List[float]:
+    # fallback deterministic vector based on text hash
+    h = hashlib.sha256(text.encode("utf-8")).digest()
+    rng = np.random.default_rng(int.from_bytes(h[:8], "little"))
+    return rng.random(dim).tolist()
+
+
+def get_embeddings(texts: Sequence[str], dim: int = 1536) -> Tuple[List[List[float]], str]:
+    """Generate embedding vectors for many texts in as few API calls as possible.
+
+    With an OPENAI_API_KEY the texts go through the shared, batched
+    :class:`EmbeddingService`; otherwise deterministic pseudo-random vectors
+    are returned. Vectors keep the input order.
+    Returns a tuple of (vectors, model_name).
+    """
+    texts = list(texts)
+    api_key = os.getenv("OPENAI_API_KEY")
+    if api_key and texts:
+        try:
+            service = get_embedding_service(OPENAI_EMBEDDING_MODEL, api_key)
+            return service.embed(texts), "openai"
+        except Exception:
+            pass
+    return [_dummy_embedding(t, dim) for t in texts], "dummy"
+
+
 def get_embedding(text: str, dim: int = 1536) -> Tuple[List[float], str]:
     """Generate an embedding vector for the given text.
 
-    If an OPENAI_API_KEY is present, use OpenAIEmbeddings via langchain.
+    If an OPENAI_API_KEY is present, use the shared OpenAI embedding service.
     Otherwise, fall back to a deterministic pseudo-random vector so that
     tests can run without external services.
     Returns a tuple of (vector, model_name).
     """
-    api_key = os.getenv("OPENAI_API_KEY")
-    if api_key:
-        try:
-            from langchain_openai import OpenAIEmbeddings
-
-            embeddings = OpenAIEmbeddings(api_key=api_key)
-            vec = embeddings.embed_query(text)
-            return vec, "openai"
-        except Exception:
-            pass
-    # fallback deterministic vector based on text hash
-    h = hashlib.sha256(text.encode("utf-8")).digest()
-    rng = np.random.default_rng(int.from_bytes(h[:8], "little"))
-    vec = rng.random(dim).tolist()
-    return vec, "dummy"
\ No newline at end of file
+    vectors, model_name = get_embeddings([text], dim=dim)
+    return vectors[0], model_name
@@ -1,6 +1,34 @@
-"""텍스트를 일정 길이로 청크 단위로 나누는 모듈."""
+"""텍스트를 일정 길이로 청크 단위로 나누는 모듈.
+
+:func:`chunk_text` 는 고정 길이 창으로, :func:`chunk_blocks` 는 레이아웃 ``Block`` 단위로
+토큰 예산까지 블록을 통째로 묶는다(겹침 없음). 제목 블록에서 새 청크를 시작하고 제목은 뒤따르는
+본문과 같은 청크에 두며, 예산보다 큰 블록만 문장/행 단위로 나눈다(표는 조각마다 헤더 행 반복).
+"""
 from __future__ import annotations
-from typing import List, Dict
+
+import os
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple, TypedDict
+
+from markdownify import markdownify
+
+from .preprocess.extract_assets import Block
+
+try:  # pragma: no cover - optional dependency
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover
+    tiktoken = None
+
+# OpenAI 임베딩 모델(ada-002, text-embedding-3-*) 토크나이저
+TOKENIZER_ENCODING = os.getenv("CHUNK_TOKENIZER", "cl100k_base")
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "512"))
+
+# tiktoken 이 없을 때의 근사: 한글 음절·숫자 3자리·영문 4자·기호를 각각 1토큰으로 센다
+_APPROX_TOKEN = re.compile(r"[가-힣]|[A-Za-z]{1,4}|\d{1,3}|[^\sA-Za-z\d가-힣]")
+_IMAGE = re.compile(r"!\[([^\]]*)\]\([^)]*\)")
+_SENTENCE = re.compile(r"(?<=[.!?。])\s+|\n+")
+
 
 def chunk_text(text: str, size: int = 500) -> List[Dict[str, str]]:
     """주어진 텍스트를 ``size`` 길이의 조각으로 나눈다.
@@ -19,3 +47,145 @@ def chunk_text(text: str, size: int = 500) -> List[Dict[str, str]]:
         chunk = text[start : start + size]
         chunks.append({"order": idx, "text": chunk})
     return chunks
+
+
+@lru_cache(maxsize=None)
+def get_tokenizer() -> Callable[[str], int]:
+    """토큰 수를 세는 함수(프로세스당 한 번 로드). tiktoken 이 없으면 정규식 근사."""
+    if tiktoken is not None:
+        try:
+            encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+            return lambda text: len(encoding.encode(text, disallowed_special=()))
+        except Exception:
+            pass
+    return lambda text: len(_APPROX_TOKEN.findall(text))
+
+
+def count_tokens(text: str) -> int:
+    return get_tokenizer()(text)
+
+
+class BlockChunk(TypedDict):
+    text: str
+    tokens: int
+    pages: List[int]       # 청크가 걸친 페이지(1-based, 오름차순)
+    block_ids: List[int]   # 입력 블록 순번(``first_block_id`` 부터)
+
+
+def block_text(block: Block) -> str:
+    """블록을 임베딩할 마크다운으로 바꾼다(figure 는 이미지 경로 대신 alt/캡션만)."""
+    html = block.get("html")
+    text = markdownify(html, heading_style="ATX").strip() if html else (block.get("text") or "").strip()
+    if block.get("block_type") == "figure":
+        text = _IMAGE.sub(lambda m: m.group(1), text).strip()
+        caption = block.get("caption")
+        if caption and caption not in text:
+            text = f"{text}\n\n{caption}".strip()
+    return text
+
+
+def _is_heading(text: str) -> bool:
+    return text.startswith("#")
+
+
+def _pack(units: Iterable[str], max_tokens: int, prefix: str = "") -> List[str]:
+    """``units`` 를 순서대로 ``max_tokens`` 이하 조각으로 묶는다(조각마다 ``prefix`` 를 앞에 붙임)."""
+    pieces: List[str] = []
+    budget = max(max_tokens - count_tokens(prefix), 1)
+    current: List[str] = []
+    used = 0
+    for unit in units:
+        n = count_tokens(unit)
+        if n > budget:
+            # 한 단위가 예산보다 크면 글자 수 비율로 자른다
+            step = max(len(unit) * budget // n, 1)
+            subs = [unit[i:i + step] for i in range(0, len(unit), step)]
+        else:
+            subs = [unit]
+        for sub in subs:
+            n = count_tokens(sub)
+            if current and used + n > budget:
+                pieces.append(prefix + "\n".join(current))
+                current, used = [], 0
+            current.append(sub)
+            used += n
+    if current:
+        pieces.append(prefix + "\n".join(current))
+    return pieces
+
+
+def _split_oversized(text: str, block_type: str, max_tokens: int) -> List[str]:
+    if block_type == "table":
+        lines = text.splitlines()
+        if len(lines) > 2 and set(lines[1]) <= set("|-: "):
+            # 마크다운 표: 헤더+구분선을 조각마다 반복하고 행 단위로 나눈다
+            return _pack(lines[2:], max_tokens, prefix="\n".join(lines[:2]) + "\n")
+        return _pack(lines, max_tokens)
+    return _pack((s for s in _SENTENCE.split(text) if s.strip()), max_tokens)
+
+
+def iter_chunk_blocks(
+    blocks: Iterable[Block],
+    max_tokens: Optional[int] = None,
+    first_block_id: int = 0,
+) -> Iterator[BlockChunk]:
+    """블록을 읽기 순서대로 토큰 예산(``max_tokens``)까지 통째로 묶어 청크가 완성되는 대로 돌려준다.
+
+    한 번에 들고 있는 것은 만드는 중인 청크 하나뿐이라 ``blocks`` 가 이터레이터면
+    메모리가 문서 크기와 무관하다.
+    """
+    max_tokens = max_tokens or CHUNK_MAX_TOKENS
+    chunks: List[BlockChunk] = []  # 완성됐지만 아직 돌려주지 않은 청크
+    parts: List[Tuple[int, int, str, int, bool]] = []  # (block_id, page, text, tokens, heading)
+
+    def flush(keep_headings: bool = False) -> None:
+        # 끝에 남은 제목은 다음 청크로 넘겨 본문과 붙인다
+        carry: List[Tuple[int, int, str, int, bool]] = []
+        while keep_headings and parts[-1][4] and not all(p[4] for p in parts):
+            carry.insert(0, parts.pop())
+        if parts:
+            chunks.append({
+                "text": "\n\n".join(p[2] for p in parts),
+                "tokens": sum(p[3] for p in parts),
+                "pages": sorted({p[1] for p in parts}),
+                "block_ids": list(dict.fromkeys(p[0] for p in parts)),
+            })
+        parts[:] = carry
+
+    for block_id, block in enumerate(blocks, start=first_block_id):
+        text = block_text(block)
+        if not text:
+            continue
+        page = block.get("page_num", 0)
+        heading = _is_heading(text)
+        if heading and any(not p[4] for p in parts):
+            flush()
+        n = count_tokens(text)
+        if n <= max_tokens:
+            pieces = [text]
+        else:
+            # 앞에 대기 중인 제목만 있으면 첫 조각이 제목과 한 청크에 들어가도록 그만큼 줄여 나눈다
+            reserve = sum(p[3] for p in parts) if all(p[4] for p in parts) else 0
+            budget = max_tokens - reserve if reserve < max_tokens // 2 else max_tokens
+            pieces = _split_oversized(text, block.get("block_type", "text"), budget)
+        for piece in pieces:
+            if len(pieces) > 1:
+                n = count_tokens(piece)
+            if parts and sum(p[3] for p in parts) + n > max_tokens:
+                flush(keep_headings=True)
+                if parts and sum(p[3] for p in parts) + n > max_tokens:
+                    flush()
+            parts.append((block_id, page, piece, n, heading))
+        yield from chunks
+        chunks.clear()
+    flush()
+    yield from chunks
+
+
+def chunk_blocks(
+    blocks: Iterable[Block],
+    max_tokens: Optional[int] = None,
+    first_block_id: int = 0,
+) -> List[BlockChunk]:
+    """:func:`iter_chunk_blocks` 의 리스트 버전."""
+    return list(iter_chunk_blocks(blocks, max_tokens, first_block_id))
@@ -0,0 +1,104 @@
+"""MinHash/LSH 로 거의 같은 청크(반복되는 머리말·꼬리말·면책 문구·표)를 찾는다.
+
+정규화한 청크 텍스트의 문자 n-gram 집합으로 MinHash 서명(``NUM_PERM`` 개 uint32)을 만들고,
+서명을 ``BANDS × ROWS`` 로 나눈 밴드 해시(버킷)가 하나라도 같은 청크만 후보로 삼아
+서명으로 추정한 Jaccard 유사도가 ``threshold`` 이상이면 중복으로 본다.
+
+버킷 값에는 밴드 번호가 섞여 있어 버킷 하나로 조회할 수 있고(``chunk_lsh_bands`` 테이블),
+서명은 ``chunk_meta["minhash"]`` 에 base64 로 저장해 코퍼스의 다른 파일과도 비교한다.
+"""
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import re
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, List, Optional
+
+import numpy as np
+
+NUM_PERM = 64
+# 후보 문턱 (1/16)^(1/4) ≈ 0.5. DB 에 저장되는 버킷이 같아야 하므로 threshold 와 무관하게 고정하고
+# threshold 는 후보의 서명 유사도 검증에만 쓴다(0.5 미만 threshold 는 일부 중복을 놓칠 수 있음)
+BANDS, ROWS = 16, 4
+SHINGLE_SIZE = 5
+DEDUP_THRESHOLD = float(os.getenv("DEDUP_THRESHOLD", "0.8"))
+
+_SEEDS = np.random.default_rng(20240611).integers(1, 2 ** 63, NUM_PERM, dtype=np.uint64)
+_MIX = np.uint64(0x9E3779B97F4A7C15)
+_DIGITS = re.compile(r"\d+")
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize(text: str) -> str:
+    """대소문자·숫자(쪽 번호, 날짜)·기호·공백 차이를 없앤다."""
+    text = _DIGITS.sub("0", text.lower())
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def signature(text: str) -> np.ndarray:
+    """정규화 텍스트의 문자 ``SHINGLE_SIZE``-gram 집합에 대한 MinHash 서명(uint32 ``NUM_PERM`` 개)."""
+    norm = normalize(text)
+    grams = {norm[i:i + SHINGLE_SIZE] for i in range(max(len(norm) - SHINGLE_SIZE + 1, 1))}
+    hashes = np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+    # 순열 대신 시드별 곱셈-xorshift 혼합(uint64 오버플로는 의도된 것)
+    with np.errstate(over="ignore"):
+        mixed = (hashes[None, :] ^ _SEEDS[:, None]) * _MIX
+    mixed ^= mixed >> np.uint64(29)
+    return (mixed.min(axis=1) >> np.uint64(32)).astype(np.uint32)
+
+
+def encode_signature(sig: np.ndarray) -> str:
+    return base64.b64encode(sig.astype("<u4").tobytes()).decode("ascii")
+
+
+def decode_signature(value: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(value), dtype="<u4")
+
+
+def similarity(a: np.ndarray, b: np.ndarray) -> float:
+    """두 서명으로 추정한 Jaccard 유사도."""
+    return float(np.count_nonzero(a == b)) / len(a)
+
+
+def band_buckets(sig: np.ndarray) -> List[int]:
+    """밴드별 버킷 값(부호 있는 64비트, 밴드 번호 포함)."""
+    raw = sig.astype("<u4").tobytes()
+    size = ROWS * 4
+    return [
+        int.from_bytes(
+            hashlib.blake2b(bytes([band]) + raw[band * size:(band + 1) * size], digest_size=8).digest(),
+            "little", signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+class MinHashIndex:
+    """메모리 내 LSH 인덱스(한 번의 인제스트 동안 파일 안의 중복 판별용)."""
+
+    def __init__(self, threshold: Optional[float] = None):
+        self.threshold = DEDUP_THRESHOLD if threshold is None else threshold
+        self._buckets: Dict[int, List[Hashable]] = defaultdict(list)
+        self._signatures: Dict[Hashable, np.ndarray] = {}
+
+    def query(self, sig: np.ndarray) -> Optional[Hashable]:
+        """유사도가 ``threshold`` 이상인 가장 비슷한 키(없으면 ``None``)."""
+        best, best_sim = None, self.threshold
+        seen = set()
+        for bucket in band_buckets(sig):
+            for key in self._buckets.get(bucket, ()):
+                if key in seen:
+                    continue
+                seen.add(key)
+                sim = similarity(sig, self._signatures[key])
+                if sim >= best_sim:
+                    best, best_sim = key, sim
+        return best
+
+    def add(self, key: Hashable, sig: np.ndarray) -> None:
+        self._signatures[key] = sig
+        for bucket in band_buckets(sig):
+            self._buckets[bucket].append(key)
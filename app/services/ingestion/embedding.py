@@ -2,28 +2,193 @@
 from __future__ import annotations
 
 import os
-from typing import List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Any, List, Sequence, Tuple
 
 from openai import OpenAI
 
+from .embedding_cache import EmbeddingCache, get_embedding_cache
 
-def embed_text(text: str, model: str = "text-embedding-3-small") -> Tuple[List[float], str, int]:
-    """주어진 텍스트에 대한 임베딩 벡터를 생성한다.
+try:  # pragma: no cover - 토크나이저가 없으면 문자 수로 근사
+    import tiktoken  # type: ignore
+except Exception:  # pragma: no cover
+    tiktoken = None
 
-    환경 변수 ``OPENAI_API_KEY`` 에 저장된 키를 사용해 OpenAI Embedding API를 호출한다.
+DEFAULT_MODEL = "text-embedding-3-small"
+
+# OpenAI Embedding API 한도: 요청당 입력 2048개, 요청당 합계 300k 토큰
+MAX_BATCH_SIZE = int(os.getenv("EMBEDDING_MAX_BATCH_SIZE", "2048"))
+MAX_BATCH_TOKENS = int(os.getenv("EMBEDDING_MAX_BATCH_TOKENS", "300000"))
+MAX_CONCURRENCY = int(os.getenv("EMBEDDING_MAX_CONCURRENCY", "4"))
+
+
+@lru_cache(maxsize=None)
+def _encoding(model: str) -> Any:
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+
+
+def count_tokens(text: str, model: str = DEFAULT_MODEL) -> int:
+    """``text`` 의 토큰 수를 센다.
+
+    tiktoken 이 없으면 문자 수를 상한 근사치로 사용한다(한글은 대략 1자 1토큰 이상).
+    """
+    enc = _encoding(model)
+    if enc is None:
+        return len(text)
+    return len(enc.encode(text, disallowed_special=()))
+
+
+class EmbeddingService:
+    """하나의 OpenAI 클라이언트를 재사용하며 텍스트 목록을 배치로 임베딩한다.
+
+    입력은 개수(``max_batch_size``)와 토큰 합(``max_batch_tokens``) 기준으로
+    배치에 묶이고, 최대 ``max_concurrency`` 개의 배치가 동시에 요청된다.
+    결과 벡터는 항상 입력 순서대로 반환된다.
+
+    ``cache`` 가 주어지면 (모델, 차원, 텍스트 해시)로 먼저 조회하고
+    미스난 고유 텍스트만 API 로 보낸다.
+    """
+
+    def __init__(
+        self,
+        model: str = DEFAULT_MODEL,
+        api_key: str | None = None,
+        max_batch_size: int = MAX_BATCH_SIZE,
+        max_batch_tokens: int = MAX_BATCH_TOKENS,
+        max_concurrency: int = MAX_CONCURRENCY,
+        dimensions: int | None = None,
+        cache: EmbeddingCache | None = None,
+    ):
+        self.model = model
+        self.api_key = api_key
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.max_concurrency = max(1, max_concurrency)
+        self.dimensions = dimensions
+        self.cache = cache
+        self._client: OpenAI | None = None
+
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            api_key = self.api_key or os.getenv("OPENAI_API_KEY")
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY 환경 변수가 설정되어 있지 않습니다")
+            self._client = OpenAI(api_key=api_key)
+        return self._client
+
+    def batches(self, texts: Sequence[str]) -> List[List[int]]:
+        """입력 인덱스를 제공자 한도에 맞는 배치들로 나눈다."""
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+        for idx, text in enumerate(texts):
+            tokens = count_tokens(text, self.model)
+            if current and (
+                len(current) >= self.max_batch_size
+                or current_tokens + tokens > self.max_batch_tokens
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(idx)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        kwargs: dict[str, Any] = {"model": self.model, "input": texts}
+        if self.dimensions:
+            kwargs["dimensions"] = self.dimensions
+        response = self.client.embeddings.create(**kwargs)
+        data = sorted(response.data, key=lambda d: getattr(d, "index", 0))
+        return [d.embedding for d in data]
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """``texts`` 전체를 임베딩해 입력 순서대로 벡터 리스트를 반환한다."""
+        texts = list(texts)
+        if self.cache is None:
+            return self._embed_uncached(texts)
+
+        dim = self.dimensions or 0
+        vectors = self.cache.get_many(self.model, dim, texts)
+        missing: dict[str, List[int]] = {}
+        for idx, vec in enumerate(vectors):
+            if vec is None:
+                missing.setdefault(texts[idx], []).append(idx)
+        if missing:
+            unique = list(missing)
+            fresh = self.cache.put_many(self.model, dim, unique, self._embed_uncached(unique))
+            for text, vec in zip(unique, fresh):
+                for idx in missing[text]:
+                    vectors[idx] = vec
+        return vectors  # type: ignore[return-value]
+
+    def _embed_uncached(self, texts: List[str]) -> List[List[float]]:
+        if not texts:
+            return []
+        batches = self.batches(texts)
+        payloads = [[texts[i] for i in b] for b in batches]
+        if len(payloads) == 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(p) for p in payloads]
+        else:
+            workers = min(self.max_concurrency, len(payloads))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._embed_batch, payloads))
+
+        vectors: List[List[float]] = [[] for _ in texts]
+        for batch, batch_vectors in zip(batches, results):
+            if len(batch_vectors) != len(batch):
+                raise ValueError(
+                    f"임베딩 응답 개수 불일치: 요청 {len(batch)}개, 응답 {len(batch_vectors)}개"
+                )
+            for idx, vec in zip(batch, batch_vectors):
+                vectors[idx] = vec
+        return vectors
+
+
+@lru_cache(maxsize=None)
+def get_embedding_service(model: str = DEFAULT_MODEL, api_key: str | None = None) -> EmbeddingService:
+    """모델·키 조합별로 하나의 :class:`EmbeddingService` 를 공유한다."""
+    return EmbeddingService(model=model, api_key=api_key, cache=get_embedding_cache())
+
+
+def embed_texts(texts: Sequence[str], model: str = DEFAULT_MODEL) -> Tuple[List[List[float]], str, int]:
+    """여러 텍스트를 배치로 임베딩한다.
 
     Args:
-        text: 임베딩을 생성할 문자열.
+        texts: 임베딩할 문자열 목록.
         model: 사용할 임베딩 모델명.
 
     Returns:
-        (생성된 벡터, 모델명, 벡터 차원)의 튜플.
+        (입력 순서의 벡터 목록, 모델명, 벡터 차원)의 튜플.
     """
     api_key = os.getenv("OPENAI_API_KEY")
     if not api_key:
         raise ValueError("OPENAI_API_KEY 환경 변수가 설정되어 있지 않습니다")
 
-    client = OpenAI(api_key=api_key)
-    response = client.embeddings.create(model=model, input=text)
-    vector = response.data[0].embedding
-    return vector, model, len(vector)
\ No newline at end of file
+    vectors = get_embedding_service(model, api_key).embed(texts)
+    dim = len(vectors[0]) if vectors else 0
+    return vectors, model, dim
+
+
+def embed_text(text: str, model: str = DEFAULT_MODEL) -> Tuple[List[float], str, int]:
+    """주어진 텍스트에 대한 임베딩 벡터를 생성한다.
+
+    환경 변수 ``OPENAI_API_KEY`` 에 저장된 키를 사용해 OpenAI Embedding API를 호출한다.
+
+    Args:
+        text: 임베딩을 생성할 문자열.
+        model: 사용할 임베딩 모델명.
+
+    Returns:
+        (생성된 벡터, 모델명, 벡터 차원)의 튜플.
+    """
+    vectors, model, dim = embed_texts([text], model=model)
+    return vectors[0], model, dim
@@ -0,0 +1,184 @@
+"""(모델, 차원, 텍스트 해시) 기준의 임베딩 캐시.
+
+디스크 계층은 WAL 모드 SQLite 파일이라 여러 uvicorn 워커가 같은 파일을
+동시에 읽고 쓸 수 있고, 그 위에 프로세스별 LRU 메모리 계층을 둔다.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+STORAGE_ROOT = Path(os.getenv("INGESTION_STORAGE", "file/ingestion")).resolve()
+
+_CacheKey = Tuple[str, int, bytes]
+
+# 한 번에 IN (...) 으로 조회할 해시 개수(SQLite 변수 한도 999 이하)
+_LOOKUP_BATCH = 500
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+def _pack(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vec = array("f")
+    vec.frombytes(blob)
+    return vec.tolist()
+
+
+class EmbeddingCache:
+    """SQLite 디스크 계층 + LRU 메모리 계층 임베딩 캐시.
+
+    벡터는 float32 로 저장된다. ``dim`` 은 요청한 차원이며 모델 기본 차원이면 0 이다.
+    """
+
+    def __init__(self, path: str | Path, memory_items: int = 10000):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.memory_items = memory_items
+        self._memory: "OrderedDict[_CacheKey, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._counters: Dict[str, int] = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0}
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embedding_cache (
+                    model TEXT NOT NULL,
+                    dim INTEGER NOT NULL,
+                    text_hash BLOB NOT NULL,
+                    vector BLOB NOT NULL,
+                    PRIMARY KEY (model, dim, text_hash)
+                ) WITHOUT ROWID
+                """
+            )
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _count(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self._counters[name] += n
+
+    def _remember(self, key: _CacheKey, vector: List[float]) -> None:
+        if self.memory_items <= 0:
+            return
+        with self._lock:
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_items:
+                self._memory.popitem(last=False)
+
+    def get_many(self, model: str, dim: int, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """``texts`` 순서대로 캐시된 벡터(없으면 ``None``)를 반환한다."""
+        keys = [(model, dim, text_hash(t)) for t in texts]
+        found: List[Optional[List[float]]] = [None] * len(keys)
+        pending: Dict[bytes, List[int]] = {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                vec = self._memory.get(key)
+                if vec is not None:
+                    self._memory.move_to_end(key)
+                    found[i] = vec
+                else:
+                    pending.setdefault(key[2], []).append(i)
+        self._count("memory_hits", len(keys) - sum(len(v) for v in pending.values()))
+
+        hashes = list(pending)
+        conn = self._connect()
+        for start in range(0, len(hashes), _LOOKUP_BATCH):
+            batch = hashes[start : start + _LOOKUP_BATCH]
+            marks = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT text_hash, vector FROM embedding_cache "
+                f"WHERE model = ? AND dim = ? AND text_hash IN ({marks})",
+                (model, dim, *batch),
+            ).fetchall()
+            for h, blob in rows:
+                vec = _unpack(blob)
+                self._remember((model, dim, h), vec)
+                for i in pending.pop(h):
+                    found[i] = vec
+                    self._count("disk_hits")
+        self._count("misses", sum(len(v) for v in pending.values()))
+        return found
+
+    def put_many(
+        self, model: str, dim: int, texts: Sequence[str], vectors: Sequence[Sequence[float]]
+    ) -> List[List[float]]:
+        """벡터를 저장하고, 저장된(float32 로 반올림한) 값을 반환한다.
+
+        호출자는 반환값을 써야 캐시 미스와 적중이 같은 값을 돌려준다.
+        """
+        rows, stored = [], []
+        for text, vector in zip(texts, vectors):
+            h = text_hash(text)
+            blob = _pack(vector)
+            vec = _unpack(blob)
+            self._remember((model, dim, h), vec)
+            rows.append((model, dim, h, blob))
+            stored.append(vec)
+        if not rows:
+            return stored
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embedding_cache (model, dim, text_hash, vector) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+        self._count("writes", len(rows))
+        return stored
+
+    def stats(self) -> Dict[str, float]:
+        """이 프로세스의 적중/미스 카운터와 디스크 항목 수."""
+        with self._lock:
+            counters = dict(self._counters)
+            memory_size = len(self._memory)
+        hits = counters["memory_hits"] + counters["disk_hits"]
+        lookups = hits + counters["misses"]
+        (disk_size,) = self._connect().execute("SELECT COUNT(*) FROM embedding_cache").fetchone()
+        return {
+            **counters,
+            "hits": hits,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "memory_size": memory_size,
+            "disk_size": disk_size,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            for k in self._counters:
+                self._counters[k] = 0
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM embedding_cache")
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache() -> EmbeddingCache | None:
+    """환경 변수 설정에 따른 프로세스 공용 캐시. ``EMBEDDING_CACHE=off`` 면 ``None``."""
+    if os.getenv("EMBEDDING_CACHE", "on").lower() in ("0", "off", "false", "no"):
+        return None
+    cache_dir = Path(os.getenv("EMBEDDING_CACHE_DIR", STORAGE_ROOT / "cache"))
+    return EmbeddingCache(
+        cache_dir / "embeddings.sqlite3",
+        memory_items=int(os.getenv("EMBEDDING_CACHE_MEMORY_ITEMS", "10000")),
+    )
@@ -1,56 +1,233 @@
 from __future__ import annotations
+import asyncio
 import json
+import os
+import random
 from pathlib import Path
-from typing import Union
+from typing import Any, Dict, Iterable, List, Tuple, Union
+import httpx
 import requests
 from dotenv import load_dotenv
+from .layout_cache import LayoutCache, get_layout_cache, layout_cache_key
+from .split_pdf import PdfPart
 load_dotenv(override=True)
 
+UPSTAGE_LAYOUT_URL = "https://api.upstage.ai/v1/document-ai/layout-analysis"
+# 재시도 대상 상태 코드(요청 과다·서버 오류)
+RETRY_STATUS = {429, 500, 502, 503, 504}
+MAX_CONCURRENCY = int(os.getenv("UPSTAGE_MAX_CONCURRENCY", "4"))
+
+
+# 파일 경로 또는 메모리상의 분할 PDF(iter_pdf_parts)
+AnalyzerInput = Union[str, Path, PdfPart]
+
+
+def _load_input(input_file: AnalyzerInput, out_dir: str | Path | None) -> Tuple[str, bytes, Path]:
+    """(업로드 파일명, PDF 바이트, 결과 JSON 경로)를 돌려준다.
+
+    경로 입력은 기본적으로 PDF 옆에, 바이트 입력은 ``out_dir`` 에 ``<part.name>.json`` 으로 쓴다.
+    """
+    if isinstance(input_file, PdfPart):
+        if out_dir is None:
+            raise ValueError("메모리 파트를 분석하려면 out_dir 가 필요합니다")
+        return f"{input_file.name}.pdf", input_file.data, Path(out_dir) / f"{input_file.name}.json"
+    input_path = Path(input_file)
+    output_path = (Path(out_dir) / input_path.stem if out_dir else input_path).with_suffix(".json")
+    return input_path.name, input_path.read_bytes(), output_path
+
+
+def _write_result(output_path: Path, payload: Dict[str, Any]) -> str:
+    """결과 JSON 을 공백 없이 쓰고, metadata 를 elements 앞에 둬 layout_json.read_layout 이 한 번에 읽게 한다."""
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if "metadata" in payload:
+        payload = {"metadata": payload["metadata"], **{k: v for k, v in payload.items() if k != "metadata"}}
+    with output_path.open("w", encoding="utf-8") as out:
+        json.dump(payload, out, ensure_ascii=False, separators=(",", ":"))
+    return str(output_path)
+
+
 class LayoutAnalyzer:
-    def __init__(self, api_key: str):
+    def __init__(self, api_key: str, ocr: bool = False):
         self.api_key = api_key
+        self.ocr = ocr
+        self.cache: LayoutCache | None = get_layout_cache()
 
-    def _upstage_layout_analysis(self, input_file: Union[str, Path]) -> str:
+    def _upstage_layout_analysis(
+        self, input_file: AnalyzerInput, use_cache: bool = True, out_dir: str | Path | None = None
+    ) -> str:
         """
         레이아웃 분석 API 호출
-        input_file: 분석할 PDF 파일 경로
+        input_file: 분석할 PDF 파일 경로 또는 메모리 파트(PdfPart)
+        use_cache: False 면 캐시 조회를 건너뛰고 새로 분석(결과는 캐시에 갱신)
+        out_dir: 결과 JSON 디렉터리(없으면 PDF 옆)
         생성된 JSON 파일 경로 문자열
         """
-        input_path = Path(input_file)
+        name, content, output_path = _load_input(input_file, out_dir)
+        data = {"ocr": "true" if self.ocr else "false"}
+        key = layout_cache_key(content, data)
+        if use_cache and self.cache is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return _write_result(output_path, cached)
 
-        url = "https://api.upstage.ai/v1/document-ai/layout-analysis"
+        url = UPSTAGE_LAYOUT_URL
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Accept": "application/json",
         }
-        data = {"ocr": "false"}  # 필요 시 "true" 로 변경
 
-        with input_path.open("rb") as f:
-            try:
-                response = requests.post(
-                    url,
-                    headers=headers,
-                    data=data,
-                    files={"document": f},
-                    timeout=120,
-                )
-            except requests.RequestException as e:
-                raise ValueError(f"Upstage layout API 요청 실패: {e}") from e
+        try:
+            response = requests.post(
+                url,
+                headers=headers,
+                data=data,
+                files={"document": (name, content)},
+                timeout=120,
+            )
+        except requests.RequestException as e:
+            raise ValueError(f"Upstage layout API 요청 실패: {e}") from e
 
         if response.status_code != 200:
             snippet = (response.text or "")[:200]
             raise ValueError(f"예상치 못한 상태 코드: {response.status_code} | {snippet}")
 
-        output_path = input_path.with_suffix(".json")
-        with output_path.open("w", encoding="utf-8") as out:
-            json.dump(response.json(), out, ensure_ascii=False, indent=2)
-
-        return str(output_path)
+        payload = response.json()
+        if self.cache is not None:
+            self.cache.put(key, payload)
+        return _write_result(output_path, payload)
 
-    def analyze(self, input_file: Union[str, Path]) -> str:
+    def analyze(
+        self, input_file: AnalyzerInput, use_cache: bool = True, out_dir: str | Path | None = None
+    ) -> str:
         """Run Upstage layout analysis and return resulting JSON path."""
-        return self._upstage_layout_analysis(input_file)
+        return self._upstage_layout_analysis(input_file, use_cache=use_cache, out_dir=out_dir)
 
     def execute(self, input_file: Union[str, Path]) -> str:
         """Backward compatible wrapper around :meth:`analyze`."""
         return self.analyze(input_file)
+
+    def analyze_many(
+        self,
+        input_files: Iterable[AnalyzerInput],
+        concurrency: int | None = None,
+        use_cache: bool = True,
+        out_dir: str | Path | None = None,
+    ) -> List[str]:
+        """여러 분할 PDF(경로 또는 iter_pdf_parts 파트)를 동시에 분석하고 JSON 경로를 입력 순서대로 반환한다."""
+        analyzer = AsyncLayoutAnalyzer(
+            self.api_key, concurrency=concurrency or MAX_CONCURRENCY, ocr=self.ocr, cache=self.cache
+        )
+        return asyncio.run(analyzer.analyze_many(input_files, use_cache=use_cache, out_dir=out_dir))
+
+
+class AsyncLayoutAnalyzer:
+    """
+    httpx.AsyncClient 커넥션 풀 하나를 공유하며 최대 ``concurrency`` 개 파트를 동시에 분석한다.
+    429/5xx 및 네트워크 오류는 지수 백오프(+지터, Retry-After 우선)로 ``max_retries`` 회까지 재시도.
+    네트워크 호출 전에 (파트 바이트 해시, 요청 옵션) 기준 레이아웃 캐시를 먼저 조회한다.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        concurrency: int = MAX_CONCURRENCY,
+        max_retries: int = 5,
+        backoff_base: float = 1.0,
+        backoff_max: float = 30.0,
+        timeout: float = 120.0,
+        url: str = UPSTAGE_LAYOUT_URL,
+        ocr: bool = False,
+        cache: LayoutCache | None = None,
+    ):
+        self.api_key = api_key
+        self.concurrency = max(1, concurrency)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.url = url
+        self.ocr = ocr
+        self.cache = cache if cache is not None else get_layout_cache()
+
+    def _delay(self, attempt: int, response: httpx.Response | None) -> float:
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        delay = min(self.backoff_base * (2 ** attempt), self.backoff_max)
+        return delay * (0.5 + random.random() / 2)
+
+    async def _post(self, client: httpx.AsyncClient, name: str, content: bytes) -> Dict[str, Any]:
+        for attempt in range(self.max_retries + 1):
+            response: httpx.Response | None = None
+            try:
+                response = await client.post(
+                    self.url,
+                    data=self._data(),
+                    files={"document": (name, content, "application/pdf")},
+                )
+            except httpx.HTTPError as e:
+                if attempt >= self.max_retries:
+                    raise ValueError(f"Upstage layout API 요청 실패: {e}") from e
+            else:
+                if response.status_code == 200:
+                    return response.json()
+                if response.status_code not in RETRY_STATUS or attempt >= self.max_retries:
+                    snippet = (response.text or "")[:200]
+                    raise ValueError(f"예상치 못한 상태 코드: {response.status_code} | {snippet}")
+            await asyncio.sleep(self._delay(attempt, response))
+        raise ValueError("Upstage layout API 재시도 한도 초과")  # pragma: no cover
+
+    def _data(self) -> Dict[str, str]:
+        return {"ocr": "true" if self.ocr else "false"}
+
+    async def analyze(
+        self,
+        client: httpx.AsyncClient,
+        input_file: AnalyzerInput,
+        use_cache: bool = True,
+        out_dir: str | Path | None = None,
+    ) -> str:
+        name, content, output_path = await asyncio.to_thread(_load_input, input_file, out_dir)
+        key = layout_cache_key(content, self._data())
+        if use_cache and self.cache is not None:
+            cached = await asyncio.to_thread(self.cache.get, key)
+            if cached is not None:
+                return await asyncio.to_thread(_write_result, output_path, cached)
+        payload = await self._post(client, name, content)
+        if self.cache is not None:
+            await asyncio.to_thread(self.cache.put, key, payload)
+        return await asyncio.to_thread(_write_result, output_path, payload)
+
+    async def analyze_many(
+        self,
+        input_files: Iterable[AnalyzerInput],
+        use_cache: bool = True,
+        out_dir: str | Path | None = None,
+    ) -> List[str]:
+        """모든 파트를 분석해 입력(파트) 순서대로 JSON 경로를 반환한다.
+
+        입력은 슬롯이 빌 때마다 하나씩 꺼내므로, 제너레이터(iter_pdf_parts)를 넘기면
+        동시에 메모리에 올라가는 파트는 최대 ``concurrency`` 개다.
+        """
+        semaphore = asyncio.Semaphore(self.concurrency)
+        limits = httpx.Limits(max_connections=self.concurrency, max_keepalive_connections=self.concurrency)
+        headers = {"Authorization": f"Bearer {self.api_key}", "Accept": "application/json"}
+
+        async with httpx.AsyncClient(headers=headers, limits=limits, timeout=self.timeout) as client:
+            async def run(p: AnalyzerInput) -> str:
+                try:
+                    return await self.analyze(client, p, use_cache=use_cache, out_dir=out_dir)
+                finally:
+                    semaphore.release()
+
+            tasks: List[asyncio.Task] = []
+            try:
+                for p in input_files:
+                    await semaphore.acquire()
+                    tasks.append(asyncio.create_task(run(p)))
+                return list(await asyncio.gather(*tasks))
+            except BaseException:
+                for t in tasks:
+                    t.cancel()
+                raise
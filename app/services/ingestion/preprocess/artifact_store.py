@@ -0,0 +1,298 @@
+"""스키마 버전이 붙은 바이너리 중간 산출물 포맷.
+
+레이아웃 결과, ``Block`` 리스트, 청크/임베딩 등 단계 사이에서 반복해서 다시 읽는 산출물을
+한 파일 포맷으로 저장한다.
+
+    헤더 8바이트: b"RAGA" + 스키마 버전(uint16 LE) + 코덱(uint8) + 종류(uint8)
+    본문: 코덱으로 직렬화한 페이로드
+         records 는 (길이 uint32 LE + 레코드) 의 반복, matrix 는 열 수 uint32 + float32 행들
+
+records/matrix 는 한 번에 올리지 않고 스트리밍으로 쓰고 읽는다(:func:`write_records`,
+:func:`iter_records`, :class:`MatrixWriter`, :func:`load_matrix` — 행렬은 ``np.memmap``).
+
+코덱은 msgpack(requirements.txt 에 고정된 ``ormsgpack`` 으로 직렬화, 기본), 없으면 공백 없는 JSON 이다. ``Block`` 리스트는
+열 단위(page_num, block_type 코드, text, html, caption, coords)로, 벡터는 float64 바이트 배열로
+저장해 다시 읽을 때 문자열 키 파싱·float 문자열 변환을 피한다.
+:func:`export_json` 으로 언제든 일반 JSON 으로 내보낼 수 있다.
+"""
+from __future__ import annotations
+
+import base64
+import json
+import os
+import struct
+import tempfile
+from array import array
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
+
+import numpy as np
+
+try:  # pragma: no cover - optional dependency
+    import ormsgpack  # type: ignore
+except Exception:  # pragma: no cover
+    ormsgpack = None
+
+from .extract_assets import Block
+
+MAGIC = b"RAGA"
+# 파이프라인 체크포인트는 버전이 같아야 재사용(2: dedup 의 corpus_duplicate 레코드에 청크 본문·메타 추가)
+SCHEMA_VERSION = 2
+_HEADER = struct.Struct("<4sHBB")
+
+Codec = Literal["msgpack", "json"]
+_CODECS: Dict[str, int] = {"msgpack": 1, "json": 2}
+ArtifactKind = Literal["blocks", "layout", "embeddings", "object", "records", "matrix"]
+_KINDS: Dict[str, int] = {"blocks": 1, "layout": 2, "embeddings": 3, "object": 4, "records": 5, "matrix": 6}
+_RECORD_LEN = struct.Struct("<I")
+_MATRIX_DIM = struct.Struct("<I")
+_BLOCK_TYPES = ("text", "table", "figure")
+
+DEFAULT_CODEC: Codec = "msgpack" if ormsgpack is not None else "json"
+SUFFIX = ".art"
+
+
+def _pack(obj: Any, codec: Codec) -> bytes:
+    if codec == "msgpack":
+        if ormsgpack is None:
+            raise ValueError("ormsgpack 이 설치되어 있지 않습니다")
+        return ormsgpack.packb(obj)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _unpack(data: bytes, codec: Codec) -> Any:
+    if codec == "msgpack":
+        if ormsgpack is None:
+            raise ValueError("ormsgpack 이 설치되어 있지 않습니다")
+        return ormsgpack.unpackb(data)
+    return json.loads(data)
+
+
+def _bin(data: bytes, codec: Codec) -> Any:
+    return data if codec == "msgpack" else base64.b64encode(data).decode("ascii")
+
+
+def _unbin(value: Any) -> bytes:
+    return value if isinstance(value, bytes) else base64.b64decode(value)
+
+
+def _encode_blocks(blocks: Sequence[Block], codec: Codec) -> Dict[str, Any]:
+    pages = array("i", (b.get("page_num", 0) for b in blocks))
+    types = bytes(_BLOCK_TYPES.index(b.get("block_type", "text")) for b in blocks)
+    return {
+        "n": len(blocks),
+        "page_num": _bin(pages.tobytes(), codec),
+        "block_type": _bin(types, codec),
+        # text/html 은 키가 없던 행을 None 으로 두고, 읽을 때 다시 키를 빼 원본 모양을 유지
+        "text": [b.get("text") for b in blocks],
+        "html": [b.get("html") for b in blocks],
+        # 드물게 채워지는 열은 값이 있는 행만 {행: 값} 으로
+        "caption": {str(i): b["caption"] for i, b in enumerate(blocks) if b.get("caption") is not None},
+        "coords": {str(i): b["coords"] for i, b in enumerate(blocks) if b.get("coords") is not None},
+    }
+
+
+def _decode_blocks(data: Dict[str, Any]) -> List[Block]:
+    pages = array("i")
+    pages.frombytes(_unbin(data["page_num"]))
+    types = _unbin(data["block_type"])
+    blocks: List[Block] = []
+    for page, kind, text, html in zip(pages, types, data["text"], data["html"]):
+        b: Block = {"block_type": _BLOCK_TYPES[kind], "page_num": page}
+        if text is not None:
+            b["text"] = text
+        if html is not None:
+            b["html"] = html
+        blocks.append(b)
+    for i, caption in data["caption"].items():
+        blocks[int(i)]["caption"] = caption
+    for i, coords in data["coords"].items():
+        blocks[int(i)]["coords"] = coords
+    return blocks
+
+
+def _encode_vectors(vectors: Sequence[Sequence[float]], codec: Codec) -> Dict[str, Any]:
+    """같은 차원의 벡터 리스트를 float64 행렬 바이트 하나로."""
+    dim = len(vectors[0]) if vectors else 0
+    flat = array("d")
+    for v in vectors:
+        if len(v) != dim:
+            raise ValueError("벡터 차원이 일정하지 않습니다")
+        flat.extend(v)
+    return {"n": len(vectors), "dim": dim, "data": _bin(flat.tobytes(), codec)}
+
+
+def _decode_vectors(data: Dict[str, Any]) -> List[List[float]]:
+    flat = array("d")
+    flat.frombytes(_unbin(data["data"]))
+    dim = data["dim"]
+    return [flat[i * dim:(i + 1) * dim].tolist() for i in range(data["n"])]
+
+
+def dump(path: str | Path, obj: Any, kind: ArtifactKind = "object", codec: Optional[Codec] = None) -> str:
+    """``obj`` 를 원자적으로 저장한다(임시 파일 → 교체)."""
+    codec = codec or DEFAULT_CODEC
+    if kind == "blocks":
+        payload = _encode_blocks(obj, codec)
+    elif kind == "embeddings":
+        payload = {name: [_encode_vectors(v, codec) for v in groups] for name, groups in obj.items()}
+    else:
+        payload = obj
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, SCHEMA_VERSION, _CODECS[codec], _KINDS[kind]))
+        f.write(_pack(payload, codec))
+    os.replace(tmp, path)
+    return str(path)
+
+
+def _read_header(f: BinaryIO, path: str | Path, kind: Optional[ArtifactKind]) -> Tuple[Codec, ArtifactKind]:
+    head = f.read(_HEADER.size)
+    if len(head) < _HEADER.size:
+        raise ValueError(f"산출물 파일이 아닙니다: {path}")
+    magic, version, codec_id, kind_id = _HEADER.unpack(head)
+    if magic != MAGIC:
+        raise ValueError(f"산출물 파일이 아닙니다: {path}")
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"지원하지 않는 산출물 스키마 버전: {version}")
+    codec = next((c for c, i in _CODECS.items() if i == codec_id), None)
+    stored = next((k for k, i in _KINDS.items() if i == kind_id), None)
+    if codec is None or stored is None:
+        raise ValueError(f"알 수 없는 산출물 코덱/종류: {codec_id}/{kind_id}")
+    if kind is not None and stored != kind:
+        raise ValueError(f"산출물 종류 불일치: {stored} (기대: {kind})")
+    return codec, stored
+
+
+def load(path: str | Path, kind: Optional[ArtifactKind] = None) -> Any:
+    """:func:`dump` 로 저장한 산출물을 읽는다. ``kind`` 를 주면 종류가 다를 때 ``ValueError``."""
+    with open(path, "rb") as f:
+        codec, stored = _read_header(f, path, kind)
+        if stored in ("records", "matrix"):
+            raise ValueError(f"{stored} 산출물은 스트리밍으로 읽어야 합니다: {path}")
+        payload = _unpack(f.read(), codec)
+    if stored == "blocks":
+        return _decode_blocks(payload)
+    if stored == "embeddings":
+        return {name: [_decode_vectors(v) for v in groups] for name, groups in payload.items()}
+    return payload
+
+
+def write_records(path: str | Path, records: Iterable[Any], codec: Optional[Codec] = None) -> int:
+    """``records`` 를 하나씩 직렬화해 이어 쓴다(원자적 교체). 쓴 레코드 수를 돌려준다."""
+    codec = codec or DEFAULT_CODEC
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    count = 0
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, SCHEMA_VERSION, _CODECS[codec], _KINDS["records"]))
+            for record in records:
+                data = _pack(record, codec)
+                f.write(_RECORD_LEN.pack(len(data)))
+                f.write(data)
+                count += 1
+    except BaseException:
+        os.unlink(tmp)
+        raise
+    os.replace(tmp, path)
+    return count
+
+
+def iter_records(path: str | Path) -> Iterator[Any]:
+    """:func:`write_records` 로 쓴 레코드를 하나씩 읽는다."""
+    with open(path, "rb") as f:
+        codec, _ = _read_header(f, path, "records")
+        while True:
+            head = f.read(_RECORD_LEN.size)
+            if not head:
+                return
+            (size,) = _RECORD_LEN.unpack(head)
+            yield _unpack(f.read(size), codec)
+
+
+class MatrixWriter:
+    """float32 행렬을 행 묶음 단위로 이어 쓴다. ``with`` 블록이 정상 종료될 때 파일을 교체한다."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, self._tmp = tempfile.mkstemp(dir=self.path.parent, suffix=".tmp")
+        self._f = os.fdopen(fd, "wb")
+        self._f.write(_HEADER.pack(MAGIC, SCHEMA_VERSION, _CODECS[DEFAULT_CODEC], _KINDS["matrix"]))
+        self._f.write(_MATRIX_DIM.pack(0))  # 첫 행을 받으면 채운다
+        self.dim = 0
+        self.rows = 0
+
+    def append(self, rows: Sequence[Sequence[float]]) -> None:
+        block = np.asarray(rows, dtype="<f4")
+        if block.size == 0:
+            return
+        if block.ndim != 2 or (self.dim and block.shape[1] != self.dim):
+            raise ValueError("벡터 차원이 일정하지 않습니다")
+        if not self.dim:
+            self.dim = block.shape[1]
+            self._f.seek(_HEADER.size)
+            self._f.write(_MATRIX_DIM.pack(self.dim))
+            self._f.seek(0, os.SEEK_END)
+        self._f.write(block.tobytes())
+        self.rows += block.shape[0]
+
+    def __enter__(self) -> "MatrixWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self._f.close()
+        if exc_type is None:
+            os.replace(self._tmp, self.path)
+        else:
+            os.unlink(self._tmp)
+
+
+def load_matrix(path: str | Path) -> np.ndarray:
+    """:class:`MatrixWriter` 로 쓴 행렬을 ``(rows, dim)`` float32 ``np.memmap`` 으로 연다."""
+    with open(path, "rb") as f:
+        _read_header(f, path, "matrix")
+        (dim,) = _MATRIX_DIM.unpack(f.read(_MATRIX_DIM.size))
+    offset = _HEADER.size + _MATRIX_DIM.size
+    rows = (os.path.getsize(path) - offset) // (4 * dim) if dim else 0
+    if not rows:
+        return np.zeros((0, dim), dtype="<f4")
+    return np.memmap(path, dtype="<f4", mode="r", offset=offset, shape=(rows, dim))
+
+
+def save_blocks(path: str | Path, blocks: Sequence[Block], codec: Optional[Codec] = None) -> str:
+    return dump(path, list(blocks), "blocks", codec)
+
+
+def load_blocks(path: str | Path) -> List[Block]:
+    return load(path, "blocks")
+
+
+def save_embeddings(path: str | Path, groups: Dict[str, Sequence[Sequence[Sequence[float]]]],
+                    codec: Optional[Codec] = None) -> str:
+    """이름 → 벡터 리스트들의 리스트(예: ``{"documents": [[v, ...], ...], "md": [[v, ...]]}``)."""
+    return dump(path, groups, "embeddings", codec)
+
+
+def load_embeddings(path: str | Path) -> Dict[str, List[List[List[float]]]]:
+    return load(path, "embeddings")
+
+
+def export_json(path: str | Path, out_path: str | Path | None = None) -> str:
+    """산출물을 일반 JSON 파일로 내보낸다(기본: 같은 이름의 ``.json``)."""
+    out = Path(out_path) if out_path else Path(path).with_suffix(".json")
+    with open(path, "rb") as f:
+        _, kind = _read_header(f, path, None)
+    if kind == "records":
+        data = list(iter_records(path))
+    elif kind == "matrix":
+        data = load_matrix(path).tolist()
+    else:
+        data = load(path)
+    with out.open("w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False)
+    return str(out)
@@ -0,0 +1,91 @@
+from __future__ import annotations
+from typing import TypedDict, List, Optional
+from pathlib import Path
+from html import escape
+
+import pymupdf as fitz
+
+from .extract_assets import Block
+
+
+class PageProfile(TypedDict):
+    page_num: int            # 1-based
+    text_chars: int          # 추출 가능한 텍스트 글자 수(공백 제외)
+    image_coverage: float    # 이미지가 덮는 페이지 면적 비율(0~1)
+    drawings: int            # 벡터 드로잉 개수(표 괘선·차트 지표)
+    needs_layout: bool
+    reason: Optional[str]
+
+
+def page_count(pdf_path: str | Path) -> int:
+    with fitz.open(pdf_path) as doc:
+        return doc.page_count
+
+
+def _image_coverage(page: "fitz.Page") -> float:
+    area = abs(page.rect) or 1.0
+    covered = sum(abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info())
+    return min(covered / area, 1.0)
+
+
+def classify_pages(
+    pdf_path: str | Path,
+    min_text_chars: int = 20,
+    max_image_coverage: float = 0.15,
+    max_drawings: int = 20,
+    max_garbled_ratio: float = 0.05,
+) -> List[PageProfile]:
+    """
+    PyMuPDF 로 페이지별 텍스트 레이어·이미지 면적·표 유사도를 점수화해
+    원격 레이아웃 분석이 필요한 페이지(스캔본, 그림/표 위주)를 가려낸다.
+    """
+    profiles: List[PageProfile] = []
+    with fitz.open(pdf_path) as doc:
+        for page in doc:
+            text = page.get_text()
+            chars = sum(1 for ch in text if not ch.isspace())
+            garbled = text.count("�") / chars if chars else 0.0
+            coverage = _image_coverage(page)
+            drawings = len(page.get_drawings())
+
+            reason: Optional[str] = None
+            if chars < min_text_chars:
+                reason = "no_text_layer"
+            elif garbled > max_garbled_ratio:
+                reason = "garbled_text"
+            elif coverage > max_image_coverage:
+                reason = "images"
+            elif drawings > max_drawings:
+                reason = "table_or_chart"
+
+            profiles.append({
+                "page_num": page.number + 1,
+                "text_chars": chars,
+                "image_coverage": round(coverage, 4),
+                "drawings": drawings,
+                "needs_layout": reason is not None,
+                "reason": reason,
+            })
+    return profiles
+
+
+def native_text_blocks(pdf_path: str | Path, page_nums: List[int]) -> List[Block]:
+    """
+    텍스트 레이어만으로 충분한 페이지를 extract_blocks_and_images 와 같은 형태의
+    text 블록으로 변환한다(html 은 Upstage 의 paragraph 태그 모양).
+    """
+    blocks: List[Block] = []
+    with fitz.open(pdf_path) as doc:
+        for page_num in page_nums:
+            page = doc[page_num - 1]
+            for x0, y0, x1, y1, text, _no, kind in page.get_text("blocks", sort=True):
+                text = " ".join(text.split())
+                if kind != 0 or not text:
+                    continue
+                blocks.append({
+                    "block_type": "text",
+                    "page_num": page_num,
+                    "html": f"<p data-category='paragraph'>{escape(text)}</p>",
+                    "text": text,
+                })
+    return blocks
@@ -1,7 +1,9 @@
 from __future__ import annotations
-from typing import TypedDict, Literal, Optional, List, Dict, Any
+from typing import TypedDict, Literal, Optional, List, Dict, Sequence, Tuple
 from pathlib import Path
-import json, os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+import math, multiprocessing, os
 
 # 충돌  문제 해결하기 위해서 fitz 강제
 import pymupdf as fitz
@@ -11,7 +13,13 @@ from PIL import Image
 from bs4 import BeautifulSoup
 from markdownify import markdownify as markdown
 
+from .layout_json import read_layout
+
 BlockType = Literal["text","table","figure"]
+# page: 페이지 전체 래스터화 후 크롭, clip: figure 영역만 PyMuPDF clip 으로 렌더
+FigureMode = Literal["page","clip"]
+# figure 렌더·PNG 인코딩 프로세스 수(1: 현재 프로세스에서 순차, 0: CPU 수)
+FIGURE_WORKERS = int(os.getenv("FIGURE_WORKERS", "1"))
 
 class Block(TypedDict, total=False):
     text: str
@@ -21,16 +29,6 @@ class Block(TypedDict, total=False):
     caption: Optional[str]
     html: Optional[str]
 
-def _load_json(path: str | Path) -> Dict[str, Any]:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-def _page_sizes(j: Dict[str, Any]) -> Dict[int, list[float]]:
-    sizes: Dict[int, list[float]] = {}
-    for p in j.get("metadata", {}).get("pages", []):
-        sizes[p["page"]] = [p["width"], p["height"]]
-    return sizes
-
 def _norm_bbox(coords: list[Dict[str, float]], wh: list[float]) -> tuple[float,float,float,float]:
     xs = [c["x"] for c in coords]; ys = [c["y"] for c in coords]
     x1,y1,x2,y2 = min(xs), min(ys), max(xs), max(ys)
@@ -50,22 +48,170 @@ def _crop(img: Image.Image, nb: tuple[float,float,float,float], out_path: str |
 #         raise ValueError(f"페이지 {page_num_1based} 렌더 실패")
 #     return images[0]
 
+def _render_page(doc: "fitz.Document", page_num_1based: int, dpi: int = 300) -> Image.Image:
+    page = doc[page_num_1based - 1]
+    zoom = dpi / 72.0
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
+    mode = "RGBA" if pix.alpha else "RGB"
+    img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+    return img.convert("RGB")
+
 def pdf_page_to_image(pdf_path: str | Path, page_num_1based: int, dpi: int = 300) -> Image.Image:
     with fitz.open(pdf_path) as doc:
-        page = doc[page_num_1based - 1]
-        zoom = dpi / 72.0
-        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom))
-        mode = "RGBA" if pix.alpha else "RGB"
-        img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
-        return img.convert("RGB")
+        return _render_page(doc, page_num_1based, dpi)
+
+def _clip_rect(page: "fitz.Page", nb: tuple[float,float,float,float]) -> "fitz.Rect":
+    """_norm_bbox 결과(0~1)를 PDF 포인트 좌표의 clip 사각형으로 되돌린다."""
+    x1,y1,x2,y2 = nb
+    r = page.rect
+    return fitz.Rect(r.x0 + x1*r.width, r.y0 + y1*r.height, r.x0 + x2*r.width, r.y0 + y2*r.height)
+
+def _render_clip(doc: "fitz.Document", page_num_1based: int, nb: tuple[float,float,float,float], dpi: int = 300) -> Image.Image:
+    page = doc[page_num_1based - 1]
+    zoom = dpi / 72.0
+    pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=_clip_rect(page, nb))
+    mode = "RGBA" if pix.alpha else "RGB"
+    img = Image.frombytes(mode, (pix.width, pix.height), pix.samples)
+    return img.convert("RGB")
+
 
+class PageRenderCache:
+    """
+    추출 1회 동안 PDF 를 한 번만 열고, 각 페이지를 최대 한 번만 래스터화한다.
+    렌더된 페이지는 ``max_bytes`` 한도 안에서 LRU 로 보관되며,
+    요소 처리가 지나간 페이지는 :meth:`evict_before` 로 즉시 해제한다.
+    """
 
+    def __init__(self, pdf_path: str | Path, dpi: int = 300, max_bytes: int = 256 * 1024 * 1024):
+        self.pdf_path = str(pdf_path)
+        self.dpi = dpi
+        self.max_bytes = max_bytes
+        self.renders = 0
+        self._doc: Optional["fitz.Document"] = None
+        self._pages: Dict[int, Image.Image] = {}
+        self._bytes = 0
+
+    def __enter__(self) -> "PageRenderCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    @property
+    def doc(self) -> "fitz.Document":
+        if self._doc is None:
+            self._doc = fitz.open(self.pdf_path)
+        return self._doc
+
+    def get(self, page_num_1based: int) -> Image.Image:
+        img = self._pages.pop(page_num_1based, None)
+        if img is None:
+            img = _render_page(self.doc, page_num_1based, self.dpi)
+            self.renders += 1
+            self._bytes += img.width * img.height * 3
+        self._pages[page_num_1based] = img  # 최근 사용으로 이동
+        self._shrink(keep=page_num_1based)
+        return img
+
+    def clip(self, page_num_1based: int, nb: tuple[float,float,float,float]) -> Image.Image:
+        """페이지 전체 대신 정규화 bbox 영역만 렌더한다(메모리·CPU 가 figure 면적에 비례)."""
+        self.renders += 1
+        return _render_clip(self.doc, page_num_1based, nb, self.dpi)
+
+    def save_figure(self, page_num_1based: int, nb: tuple[float,float,float,float],
+                    out_path: str | Path, mode: FigureMode = "clip") -> None:
+        if mode == "clip":
+            self.clip(page_num_1based, nb).save(out_path)
+        else:
+            self.evict_before(page_num_1based)
+            _crop(self.get(page_num_1based), nb, out_path)
+
+    def _drop(self, page_num_1based: int) -> None:
+        img = self._pages.pop(page_num_1based)
+        self._bytes -= img.width * img.height * 3
+
+    def _shrink(self, keep: int) -> None:
+        for p in list(self._pages):
+            if self._bytes <= self.max_bytes:
+                break
+            if p != keep:
+                self._drop(p)
+
+    def evict_before(self, page_num_1based: int) -> None:
+        """``page_num_1based`` 이전 페이지의 렌더 결과를 해제한다."""
+        for p in [p for p in self._pages if p < page_num_1based]:
+            self._drop(p)
+
+    def close(self) -> None:
+        self._pages.clear()
+        self._bytes = 0
+        if self._doc is not None:
+            self._doc.close()
+            self._doc = None
+
+
+# (1-based 페이지, 정규화 bbox, 출력 PNG 경로)
+FigureTask = Tuple[int, Tuple[float,float,float,float], str]
+
+# 프로세스 풀 워커마다 PDF 를 직접 열어 둔다(픽스맵/이미지를 프로세스 간에 넘기지 않음)
+_worker_pages: Optional[PageRenderCache] = None
+
+def _init_figure_worker(pdf_path: str, dpi: int) -> None:
+    global _worker_pages
+    _worker_pages = PageRenderCache(pdf_path, dpi=dpi)
+
+def _render_figure_group(tasks: Sequence[FigureTask], mode: FigureMode) -> int:
+    for page_num, nb, out_path in tasks:
+        _worker_pages.save_figure(page_num, nb, out_path, mode)
+    return len(tasks)
+
+def _resolve_workers(workers: Optional[int]) -> int:
+    workers = FIGURE_WORKERS if workers is None else workers
+    return workers if workers > 0 else (os.cpu_count() or 1)
+
+def _page_groups(tasks: Sequence[FigureTask], n_groups: int) -> List[List[FigureTask]]:
+    """연속 페이지 단위로 묶되, 묶음마다 figure 수가 비슷하도록 나눈다(한 페이지는 한 묶음에만)."""
+    target = max(1, math.ceil(len(tasks) / n_groups))
+    groups: List[List[FigureTask]] = []
+    current: List[FigureTask] = []
+    for task in sorted(tasks, key=lambda t: t[0]):
+        if len(current) >= target and current[-1][0] != task[0]:
+            groups.append(current)
+            current = []
+        current.append(task)
+    if current:
+        groups.append(current)
+    return groups
+
+def render_figures(pdf_path: str | Path, tasks: Sequence[FigureTask], dpi: int = 300,
+                   mode: FigureMode = "clip", workers: Optional[int] = None) -> None:
+    """
+    figure 들을 렌더해 PNG 로 저장한다. 출력 경로(번호)는 호출 전에 정해지므로
+    워커 수와 관계없이 결과 파일은 같다. ``workers`` > 1 이면 페이지 묶음을 프로세스 풀에 나눈다.
+    """
+    workers = _resolve_workers(workers)
+    if workers <= 1 or len(tasks) < 2:
+        with PageRenderCache(pdf_path, dpi=dpi) as pages:
+            for page_num, nb, out_path in tasks:
+                pages.save_figure(page_num, nb, out_path, mode)
+        return
+    groups = _page_groups(tasks, workers * 4)
+    # 서버 프로세스(스레드 다수)에서 fork 하지 않도록 spawn 사용
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(groups)),
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_figure_worker,
+        initargs=(str(pdf_path), dpi),
+    ) as pool:
+        list(pool.map(_render_figure_group, groups, repeat(mode)))
 
 
 def extract_blocks_and_images(
     pdf_path: str | Path,
     json_paths: list[str | Path],
     out_dir: str | Path,
+    figure_mode: FigureMode = "clip",
+    workers: Optional[int] = None,
 ) -> tuple[list[Block], list[str]]:
     pdf_path = Path(pdf_path)
     out_dir = Path(out_dir)
@@ -73,10 +219,10 @@ def extract_blocks_and_images(
 
     saved_images: list[str] = []
     blocks: list[Block] = []
-
+    tasks: list[FigureTask] = []
+    figure_count: Dict[int, int] = {}
     for jp in sorted(json_paths):
-        j = _load_json(jp)
-        sizes = _page_sizes(j)
+        sizes, elements = read_layout(jp)
 
         name_parts = Path(jp).stem.split("_")
         try:
@@ -84,7 +230,7 @@ def extract_blocks_and_images(
         except Exception:
             start_page = 0
 
-        for el in j.get("elements", []):
+        for el in elements:
             cat = el.get("category")
             rel_page = int(el.get("page", 1))
             abs_page = start_page + rel_page
@@ -100,11 +246,12 @@ def extract_blocks_and_images(
             if cat == "figure":
                 coords = el.get("bounding_box", [])
                 nb = _norm_bbox(coords, sizes.get(rel_page, [612, 792]))
-                img = pdf_page_to_image(pdf_path, abs_page)
-                out_img = out_dir / f"page_{abs_page}_figure_{len([p for p in saved_images if f'page_{abs_page}_' in p])+1}.png"
-                _crop(img, nb, out_img)
+                figure_count[abs_page] = figure_count.get(abs_page, 0) + 1
+                out_img = out_dir / f"page_{abs_page}_figure_{figure_count[abs_page]}.png"
+                tasks.append((abs_page, nb, str(out_img)))
                 saved_images.append(str(out_img))
             blocks.append(b)
+    render_figures(pdf_path, tasks, mode=figure_mode, workers=workers)
     return blocks, saved_images
 
 
@@ -114,12 +261,15 @@ class PDFImageProcessor:
     """
 
     def __init__(self, pdf_file: str, json_files: Optional[List[str]] = None,
-                 output_folder: Optional[str] = None, dpi: int = 300):
+                 output_folder: Optional[str] = None, dpi: int = 300,
+                 figure_mode: FigureMode = "clip", workers: Optional[int] = None):
         """
         :param pdf_file: PDF 파일 경로
         :param json_files: 사용할 JSON 목록(없으면 prefix 자동 탐색)
         :param output_folder: 산출물 폴더(없으면 <pdf_stem>/)
         :param dpi: 페이지 렌더링 DPI
+        :param figure_mode: "clip"(figure 영역만 렌더) 또는 "page"(페이지 렌더 후 크롭)
+        :param workers: figure 렌더 프로세스 수(None: FIGURE_WORKERS, 0: CPU 수)
         """
         self.pdf_file = pdf_file
         base = os.path.splitext(pdf_file)[0]
@@ -127,56 +277,65 @@ class PDFImageProcessor:
         self.output_folder = output_folder or base
         self.filename = os.path.basename(base)
         self.dpi = dpi    # Dots Per Inch  1인치 안에 몇개 찍는지 해상도 높이면 선명
+        self.figure_mode = figure_mode
+        self.workers = workers
 
     def extract_images(self) -> None:
         """JSON을 읽어 figure 크롭, HTML/MD 생성."""
         os.makedirs(self.output_folder, exist_ok=True)
 
         figure_count: Dict[int, int] = {}
-        html_content: List[str] = []
-
-        for json_file in self.json_files:
-            json_data = _load_json(json_file)
-            page_sizes = _page_sizes(json_data)
-
-            parts = os.path.basename(json_file).split("_")
-            try:
-                start_page = int(parts[1])
-            except (IndexError, ValueError):
-                start_page = 0
-
-            for element in json_data.get("elements", []):
-                if element.get("category") == "figure":
-                    rel_page = element["page"]
-                    page_num = start_page + rel_page
-
-                    coords = element["bounding_box"]
-                    output_size = page_sizes.get(rel_page, [612, 792])
-                    pdf_img = pdf_page_to_image(self.pdf_file, page_num, dpi=self.dpi)
-                    norm_coords = _norm_bbox(coords, output_size)
-
-                    figure_count[page_num] = figure_count.get(page_num, 0) + 1
-                    output_file = os.path.join(
-                        self.output_folder,
-                        f"page_{page_num}_figure_{figure_count[page_num]}.png",
-                    )
-                    _crop(pdf_img, norm_coords, output_file)
-
-                    soup = BeautifulSoup(element.get("html", ""), "html.parser")
-                    img_tag = soup.find("img")
-                    if img_tag:
-                        rel_path = os.path.relpath(output_file, self.output_folder)
-                        img_tag["src"] = rel_path.replace("\\", "/")
-                    element["html"] = str(soup)
-
-                html_content.append(element.get("html", ""))
-
+        tasks: List[FigureTask] = []
         html_path = os.path.join(self.output_folder, f"{self.filename}.html")
-        combined_html = "\n".join(html_content)
-        with open(html_path, "w", encoding="utf-8") as f:
-            f.write(combined_html)
-
         md_path = os.path.join(self.output_folder, f"{self.filename}.md")
-        md_out = markdown(combined_html)
-        with open(md_path, "w", encoding="utf-8") as f:
-            f.write(md_out)
+
+        # 번호·img src 는 여기서 순서대로 정하고, 렌더/PNG 인코딩은 render_figures 에 맡긴다.
+        # 레이아웃 JSON 은 요소 단위로 스트리밍하고 HTML·MD 도 요소마다 바로 파일에 쓴다.
+        with open(html_path, "w", encoding="utf-8") as html_out, \
+                open(md_path, "w", encoding="utf-8") as md_out:
+            first = md_first = True
+            for json_file in self.json_files:
+                page_sizes, elements = read_layout(json_file)
+
+                parts = os.path.basename(json_file).split("_")
+                try:
+                    start_page = int(parts[1])
+                except (IndexError, ValueError):
+                    start_page = 0
+
+                for element in elements:
+                    if element.get("category") == "figure":
+                        rel_page = element["page"]
+                        page_num = start_page + rel_page
+
+                        coords = element["bounding_box"]
+                        output_size = page_sizes.get(rel_page, [612, 792])
+                        norm_coords = _norm_bbox(coords, output_size)
+
+                        figure_count[page_num] = figure_count.get(page_num, 0) + 1
+                        output_file = os.path.join(
+                            self.output_folder,
+                            f"page_{page_num}_figure_{figure_count[page_num]}.png",
+                        )
+                        tasks.append((page_num, norm_coords, output_file))
+
+                        soup = BeautifulSoup(element.get("html", ""), "html.parser")
+                        img_tag = soup.find("img")
+                        if img_tag:
+                            rel_path = os.path.relpath(output_file, self.output_folder)
+                            img_tag["src"] = rel_path.replace("\\", "/")
+                        element["html"] = str(soup)
+
+                    if not first:
+                        html_out.write("\n")
+                    html_out.write(element.get("html", ""))
+                    first = False
+
+                    md = markdown(element.get("html", "")).strip()
+                    if md:
+                        if not md_first:
+                            md_out.write("\n\n")
+                        md_out.write(md)
+                        md_first = False
+
+        render_figures(self.pdf_file, tasks, dpi=self.dpi, mode=self.figure_mode, workers=self.workers)
@@ -0,0 +1,87 @@
+"""분할 PDF 바이트 해시 + 요청 옵션 기준의 Upstage 레이아웃 결과 캐시.
+
+결과는 ``artifact_store`` 바이너리 포맷의 ``<key>.art`` 파일로 저장되며(원자적 교체라 여러 워커가 공유 가능),
+전체 크기가 ``max_bytes`` 를 넘으면 가장 오래 사용하지 않은 항목부터 지운다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from . import artifact_store
+
+STORAGE_ROOT = Path(os.getenv("INGESTION_STORAGE", "file/ingestion")).resolve()
+
+
+def layout_cache_key(content: bytes, options: Dict[str, Any]) -> str:
+    h = hashlib.sha256(content)
+    h.update(json.dumps(options, sort_keys=True).encode("utf-8"))
+    return h.hexdigest()
+
+
+class LayoutCache:
+    def __init__(self, root: str | Path, max_bytes: int = 2 * 1024 ** 3):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}{artifact_store.SUFFIX}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        path = self._path(key)
+        try:
+            payload = artifact_store.load(path, "layout")
+        except (FileNotFoundError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None
+        os.utime(path)  # LRU 순서 갱신
+        with self._lock:
+            self.hits += 1
+        return payload
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        artifact_store.dump(self._path(key), payload, "layout")
+        self._evict()
+
+    def _evict(self) -> None:
+        entries = []
+        total = 0
+        for p in self.root.glob(f"*{artifact_store.SUFFIX}"):
+            try:
+                st = p.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((st.st_mtime, st.st_size, p))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, p in sorted(entries):
+            p.unlink(missing_ok=True)
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+@lru_cache(maxsize=None)
+def get_layout_cache() -> LayoutCache | None:
+    """환경 변수 설정에 따른 프로세스 공용 캐시. ``LAYOUT_CACHE=off`` 면 ``None``."""
+    if os.getenv("LAYOUT_CACHE", "on").lower() in ("0", "off", "false", "no"):
+        return None
+    return LayoutCache(
+        os.getenv("LAYOUT_CACHE_DIR", STORAGE_ROOT / "cache" / "layout"),
+        max_bytes=int(os.getenv("LAYOUT_CACHE_MAX_BYTES", str(2 * 1024 ** 3))),
+    )
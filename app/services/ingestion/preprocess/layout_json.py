@@ -0,0 +1,143 @@
+"""Upstage 레이아웃 JSON 을 통째로 올리지 않고 읽는 스트리밍 파서.
+
+최상위 객체를 키 단위로 훑어 ``metadata.pages`` 를 먼저 읽고, ``elements`` 배열은
+요소 하나씩 디코드해 돌려준다. 한 번에 메모리에 있는 것은 읽기 버퍼와 현재 요소뿐이라
+파트 크기와 관계없이 최대 메모리가 일정하다.
+
+``elements`` 가 ``metadata`` 보다 앞에 있는 파일(Upstage 원본 응답)은 첫 패스에서 요소를
+하나씩 버리며 metadata 를 찾고, 두 번째 패스에서 요소를 돌려준다. analyzer 가 쓰는 결과는
+metadata 를 앞에 두므로 첫 패스는 파일 앞부분만 읽는다.
+"""
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+
+READ_SIZE = 64 * 1024
+_WS = " \t\n\r"
+_decoder = json.JSONDecoder()
+
+
+class _Scanner:
+    def __init__(self, f: TextIO, read_size: Optional[int] = None):
+        self.f = f
+        self.read_size = read_size or READ_SIZE
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self, size: int) -> bool:
+        if self.eof:
+            return False
+        if self.pos > len(self.buf) // 2:
+            # 소비한 앞부분은 버려 버퍼가 커지지 않게 한다
+            self.buf = self.buf[self.pos:]
+            self.pos = 0
+        data = self.f.read(size)
+        if not data:
+            self.eof = True
+            return False
+        self.buf += data
+        return True
+
+    def peek(self) -> str:
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill(self.read_size):
+                raise ValueError("레이아웃 JSON 이 예상보다 일찍 끝났습니다")
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"레이아웃 JSON 파싱 실패: {ch!r} 필요, {self.buf[self.pos]!r} 발견")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """현재 위치의 JSON 값 하나를 디코드한다(부족하면 버퍼를 늘려 다시 시도)."""
+        self.peek()
+        size = self.read_size
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+            # 버퍼 끝에서 끝난 숫자 등은 잘렸을 수 있으므로 더 읽어 확인
+            if end == len(self.buf) and self._fill(size):
+                size *= 2
+                continue
+            self.pos = end
+            return obj
+
+    def items(self) -> Iterator[Any]:
+        """배열 요소를 하나씩 디코드해 돌려준다."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("]")
+            return
+
+    def keys(self) -> Iterator[str]:
+        """최상위 객체의 키를 차례로 돌려준다. 호출한 쪽이 각 키의 값을 소비해야 한다."""
+        self.expect("{")
+        if self.peek() == "}":
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.peek() == ",":
+                self.pos += 1
+                continue
+            self.expect("}")
+            return
+
+
+def _page_sizes(metadata: Optional[Dict[str, Any]]) -> Dict[int, List[float]]:
+    sizes: Dict[int, List[float]] = {}
+    for p in (metadata or {}).get("pages", []):
+        sizes[p["page"]] = [p["width"], p["height"]]
+    return sizes
+
+
+def _scan_metadata(path: Path) -> Optional[Dict[str, Any]]:
+    """metadata 를 찾을 때까지만 읽는다. 앞에 있는 elements 는 요소 하나씩 디코드해 버린다."""
+    with open(path, "r", encoding="utf-8") as f:
+        scanner = _Scanner(f)
+        for key in scanner.keys():
+            if key == "metadata":
+                return scanner.value()
+            if key == "elements":
+                for _ in scanner.items():
+                    pass
+            else:
+                scanner.value()
+    return None
+
+
+def _iter_elements(path: Path) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        scanner = _Scanner(f)
+        for key in scanner.keys():
+            if key == "elements":
+                yield from scanner.items()
+                return
+            scanner.value()
+
+
+def read_layout(path: str | Path) -> Tuple[Dict[int, List[float]], Iterator[Dict[str, Any]]]:
+    """(페이지 번호 → [width, height], elements 이터레이터)를 돌려준다."""
+    path = Path(path)
+    metadata = _scan_metadata(path)
+    return _page_sizes(metadata), _iter_elements(path)
@@ -0,0 +1,304 @@
+"""개정된 PDF 로 기존 File 을 증분 재인제스트한다.
+
+페이지 구간(Document) 단위로 페이지 텍스트 해시를 비교해 바뀌지 않은 문서는 건드리지 않고,
+바뀐 구간만 /ingestion/run 과 같은 경로(Upstage 레이아웃 분석 → 블록 추출 →
+:func:`~app.services.pipeline.part_chunks`)로 다시 청크한 뒤 청크 내용 해시로 기존 청크와 맞춘다.
+분석은 레이아웃 캐시를 거치므로 바이트가 같은 파트는 Upstage 를 다시 호출하지 않는다.
+
+- 같은 내용의 청크는 (다른 문서로 옮겨졌더라도) 행과 임베딩을 그대로 두고 위치만 갱신
+- 파일 안의 거의 같은 청크는 dedup 단계처럼 남는 청크 하나로 합쳐 페이지만 기록
+- 다른 파일의 거의 같은 청크는 이 파일에도 저장하되 임베딩은 복사
+- 나머지 새 내용의 청크만 임베딩해 추가(MinHash 서명과 LSH 밴드도 함께 저장)
+- 더 이상 없는 청크/문서는 삭제(바뀌지 않은 문서의 페이지를 대신하던 청크는 그 문서로 옮겨 남김)
+
+변경이 있으면 코퍼스 버전(corpus_versions)을 올린다.
+HTML·MD 산출물은 다루지 않는다(필요하면 /ingestion/run 으로 갱신).
+"""
+from __future__ import annotations
+
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, TypedDict
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.db import crud, models
+from app.schemas.db import DocumentCreate, ChunkCreate
+from app.services.chunk import content_hash, get_embeddings, page_hashes
+from app.services.pipeline import ARTIFACT_DIR, file_sha256, lsh_band_rows, part_chunks, reuse_embeddings
+from app.services.retrieval import keyword_index, vector_index
+from .dedup import MinHashIndex, band_buckets, decode_signature, encode_signature, signature, similarity
+from .preprocess import artifact_store
+from .preprocess.analyzer_upstage import LayoutAnalyzer
+from .preprocess.classify_pages import page_count
+from .preprocess.extract_assets import Block, extract_blocks_and_images
+from .preprocess.split_pdf import iter_pdf_parts, page_ranges
+
+
+class ReingestStats(TypedDict):
+    documents_unchanged: int
+    documents_added: int
+    documents_changed: int
+    documents_removed: int
+    chunks_kept: int
+    chunks_inserted: int      # 다른 파일 청크의 임베딩을 재사용한 것 포함
+    chunks_merged: int        # 파일 안의 다른 청크로 합친(저장하지 않은) 중복 청크
+    embeddings_reused: int
+    chunks_deleted: int
+    corpus_version: int | None  # 변경이 없으면 None
+
+
+def _doc_range(doc: models.Document) -> Tuple[int, int] | None:
+    pages = (doc.doc_meta or {}).get("pages")
+    if not pages:
+        return None
+    return pages[0] - 1, pages[1] - 1
+
+
+def _chunk_hash(chunk: models.Chunk) -> str:
+    return (chunk.chunk_meta or {}).get("content_hash") or content_hash(chunk.content)
+
+
+def _analyze_ranges(
+    pdf: Path,
+    ranges: Sequence[Tuple[int, int]],
+    work_dir: Path,
+    api_key: Optional[str],
+    concurrency: Optional[int] = None,
+) -> Tuple[List[Block], Dict[Tuple[int, int], str]]:
+    """구간별 파트를 레이아웃 분석해 (블록, 구간 → 결과 JSON 경로)를 돌려준다."""
+    parts = (
+        part
+        for start, end in ranges
+        for part in iter_pdf_parts(pdf, batch_size=end - start + 1, pages=range(start, end + 1))
+    )
+    json_paths = LayoutAnalyzer(api_key=api_key).analyze_many(parts, concurrency=concurrency, out_dir=work_dir)
+    blocks, _ = extract_blocks_and_images(pdf_path=pdf, json_paths=json_paths, out_dir=work_dir)
+    # chunk_meta["block_ids"] 는 이 블록 산출물의 순번
+    artifact_store.save_blocks(work_dir / f"{pdf.stem}.blocks{artifact_store.SUFFIX}", blocks)
+    return blocks, {rng: str(Path(jp).resolve()) for rng, jp in zip(ranges, json_paths)}
+
+
+def reingest_file(
+    db: Session,
+    db_file: models.File,
+    pdf_path: str | Path,
+    batch_size: int = 10,
+    api_key: Optional[str] = None,
+    concurrency: Optional[int] = None,
+    dedup_threshold: Optional[float] = None,
+) -> ReingestStats:
+    """바뀐 구간의 레이아웃 분석이 필요하면 ``api_key`` 로 Upstage 를 호출한다(실패는 ``ValueError``)."""
+    pdf = Path(pdf_path).resolve()
+    stats: ReingestStats = {
+        "documents_unchanged": 0, "documents_added": 0, "documents_changed": 0, "documents_removed": 0,
+        "chunks_kept": 0, "chunks_inserted": 0, "chunks_merged": 0, "embeddings_reused": 0,
+        "chunks_deleted": 0, "corpus_version": None,
+    }
+    sha256 = file_sha256(pdf)
+
+    # 페이지 구간 메타가 없는 문서(수동 등록 등)는 대상에서 제외
+    existing: Dict[Tuple[int, int], models.Document] = {}
+    for doc in db_file.documents:
+        rng = _doc_range(doc)
+        if rng is not None:
+            existing[rng] = doc
+    own_docs = {doc.id for doc in db_file.documents}
+
+    # 1) 페이지 해시가 그대로인 문서는 건너뛰고, 나머지 문서의 청크를 재사용 후보로 모은다
+    todo: List[Tuple[Tuple[int, int], List[str], models.Document | None]] = []
+    unchanged: Dict[int, models.Document] = {}  # 남는 페이지(1-based) → 문서
+    for start, end in page_ranges(range(page_count(pdf)), batch_size):
+        hashes = page_hashes(pdf, range(start, end + 1))
+        doc = existing.pop((start, end), None)
+        if doc is not None and (doc.doc_meta or {}).get("page_hashes") == hashes:
+            stats["documents_unchanged"] += 1
+            unchanged.update((page, doc) for page in range(start + 1, end + 2))
+            continue
+        todo.append(((start, end), hashes, doc))
+    removed_docs = list(existing.values())
+
+    candidate_docs = [doc.id for _, _, doc in todo if doc is not None] + [d.id for d in removed_docs]
+    candidates = crud.list_chunks_by_documents(db, candidate_docs)
+    embedded = crud.embedded_chunk_ids(db, [c.id for c in candidates])
+    pool: Dict[str, List[models.Chunk]] = defaultdict(list)
+    for c in candidates:
+        if c.id in embedded:
+            pool[_chunk_hash(c)].append(c)
+    stale = [c.id for c in candidates if c.id not in embedded]
+
+    # 파일 안 중복 판별: 남는 청크와 이번에 저장하는 청크를 /ingestion/run 의 dedup 단계처럼 합친다.
+    # 키 → 청크 위치({"id", "document_id", "chunk_order", "chunk_meta"}; 새 청크는 저장 전까지 id 가 None)
+    index = MinHashIndex(dedup_threshold)
+    positions: Dict[int, dict] = {}
+    merged: set = set()  # 메타(pages/duplicates)가 바뀐 키
+    last_order: Dict[int, int] = defaultdict(int)
+    for c in crud.list_chunks_by_documents(db, list({doc.id for doc in unchanged.values()})):
+        last_order[c.document_id] = max(last_order[c.document_id], c.chunk_order)
+        minhash = (c.chunk_meta or {}).get("minhash")
+        if minhash:
+            index.add(c.id, decode_signature(minhash))
+            positions[c.id] = {"id": c.id, "document_id": c.document_id, "chunk_order": c.chunk_order,
+                               "chunk_meta": dict(c.chunk_meta)}
+
+    # 2) 바뀐/새 구간만 분석·청크하고 내용 해시로 기존 청크와 맞춘다
+    blocks: List[Block] = []
+    json_paths: Dict[Tuple[int, int], str] = {}
+    if todo:
+        blocks, json_paths = _analyze_ranges(
+            pdf, [rng for rng, _, _ in todo], ARTIFACT_DIR / pdf.stem / f"reingest_{sha256[:12]}",
+            api_key, concurrency,
+        )
+    moves: List[dict] = []
+    banded: List[Tuple[int, str]] = []  # 서명 없이 남아 있던 재사용 청크의 (id, minhash)
+    inserted: List[Tuple[int, str]] = []  # 키워드 색인에 추가할 (청크 id, 내용)
+    model_name: Optional[str] = None
+    for (start, end), hashes, doc in todo:
+        meta = {
+            "pdf_path": str(pdf),
+            "pages": [start + 1, end + 1],
+            "json_path": json_paths[(start, end)],
+            "page_hashes": hashes,
+        }
+        if doc is None:
+            doc = crud.create_document(db, DocumentCreate(
+                file_id=db_file.id, title=f"{pdf.stem}_{start:04d}_{end:04d}.pdf", doc_meta=meta,
+            ))
+            own_docs.add(doc.id)
+            stats["documents_added"] += 1
+        else:
+            crud.update_document_meta(db, doc, {**(doc.doc_meta or {}), **meta})
+            stats["documents_changed"] += 1
+
+        new_keys: List[int] = []
+        texts: Dict[int, str] = {}
+        signatures: Dict[int, np.ndarray] = {}
+        order = 0
+        for record in part_chunks(blocks, start, end):
+            piece = record["text"]
+            h = content_hash(piece)
+            sig = signature(piece)
+            meta = {"content_hash": h, **record["meta"], "minhash": encode_signature(sig)}
+            if pool.get(h):
+                order += 1
+                kept = pool[h].pop()
+                stats["chunks_kept"] += 1
+                old = kept.chunk_meta or {}
+                # 합쳐 두었던 중복 중 바뀌지 않은 문서의 페이지는 계속 이 청크가 대신한다
+                carried = set(old.get("pages", [])) & unchanged.keys()
+                if carried:
+                    meta["pages"] = sorted(set(meta["pages"]) | carried)
+                    meta["duplicates"] = len(carried)
+                if not old.get("minhash"):
+                    banded.append((kept.id, meta["minhash"]))
+                position = {"id": kept.id, "document_id": doc.id, "chunk_order": order, "chunk_meta": meta}
+                if (kept.document_id, kept.chunk_order, kept.chunk_meta) != (doc.id, order, meta):
+                    moves.append(position)
+                index.add(kept.id, sig)
+                positions[kept.id] = position
+                continue
+            found = index.query(sig)
+            if found is not None:
+                target = positions[found]["chunk_meta"]
+                target["pages"] = sorted(set(target["pages"]) | set(meta["pages"]))
+                target["duplicates"] = target.get("duplicates", 0) + 1
+                merged.add(found)
+                stats["chunks_merged"] += 1
+                continue
+            order += 1
+            key = -(len(positions) + 1)  # 저장 전 새 청크(기존 청크 id 와 겹치지 않게 음수)
+            index.add(key, sig)
+            positions[key] = {"id": None, "document_id": doc.id, "chunk_order": order, "chunk_meta": meta}
+            new_keys.append(key)
+            texts[key] = piece
+            signatures[key] = sig
+        if not new_keys:
+            continue
+
+        # 다른 파일의 거의 같은 청크는 임베딩만 재사용한다(청크는 이 파일에도 저장)
+        threshold = index.threshold
+        owners: Dict[int, int] = {}
+        corpus = [
+            (c.id, decode_signature(c.chunk_meta["minhash"]))
+            for c in crud.find_lsh_candidates(db, [b for k in new_keys for b in band_buckets(signatures[k])])
+            if c.document_id not in own_docs and (c.chunk_meta or {}).get("minhash")
+        ]
+        for k in new_keys:
+            best = max(((similarity(signatures[k], sig), cid) for cid, sig in corpus), default=None)
+            if best is not None and best[0] >= threshold:
+                owners[k] = best[1]
+                positions[k]["chunk_meta"]["duplicate_of"] = best[1]
+        fresh = [k for k in new_keys if k not in owners]
+        vectors: Dict[int, Sequence[float]] = {}
+        if fresh:
+            # 새 내용의 청크만 임베딩
+            fresh_vectors, used = get_embeddings([texts[k] for k in fresh])
+            if model_name and used != model_name:
+                raise ValueError(f"임베딩 모델이 {model_name} 에서 {used} 로 바뀌었습니다")
+            model_name = used
+            vectors.update(zip(fresh, fresh_vectors))
+        reused_keys = list(owners)
+        reused, model_name = reuse_embeddings(
+            db, [texts[k] for k in reused_keys], [owners[k] for k in reused_keys], model_name,
+        )
+        vectors.update(zip(reused_keys, reused))
+        stats["embeddings_reused"] += len(reused_keys)
+
+        new_chunks = [
+            ChunkCreate(document_id=doc.id, content=texts[k], chunk_order=positions[k]["chunk_order"],
+                        chunk_meta=positions[k]["chunk_meta"])
+            for k in new_keys
+        ]
+        batch = [vectors[k] for k in new_keys]
+        ids = crud.bulk_create_chunks_with_embeddings(db, new_chunks, batch, model=model_name)
+        crud.create_lsh_bands(db, lsh_band_rows(ids, (c.chunk_meta["minhash"] for c in new_chunks)))
+        for k, cid in zip(new_keys, ids):
+            positions[k]["id"] = cid
+            merged.discard(k)  # 저장 전에 합친 페이지는 이미 메타에 들어갔다
+        inserted.extend(zip(ids, (c.content for c in new_chunks)))
+        vector_index.update_index(db, model_name, ids, batch)
+        stats["chunks_inserted"] += len(new_chunks)
+
+    # 3) 지울 청크 중 바뀌지 않은 문서의 페이지를 대신하던 청크는 그 문서 끝으로 옮겨 남긴다
+    leftover = [c for chunks in pool.values() for c in chunks]
+    for c in leftover[:]:
+        carried = sorted(set((c.chunk_meta or {}).get("pages", [])) & unchanged.keys())
+        if not carried:
+            continue
+        leftover.remove(c)
+        target = unchanged[carried[0]]
+        last_order[target.id] += 1
+        meta = {**c.chunk_meta, "pages": carried}
+        if len(carried) > 1:
+            meta["duplicates"] = len(carried) - 1
+        else:
+            meta.pop("duplicates", None)
+        moves.append({"id": c.id, "document_id": target.id, "chunk_order": last_order[target.id], "chunk_meta": meta})
+        stats["chunks_kept"] += 1
+
+    # 4) 재사용 청크 위치/메타 갱신 → 남은 청크/문서 삭제(순서 중요: 옮긴 청크가 문서와 함께 지워지지 않게)
+    moved = {m["id"] for m in moves}
+    moves.extend(positions[k] for k in merged if positions[k]["id"] not in moved)
+    crud.move_chunks(db, moves)
+    crud.create_lsh_bands(db, lsh_band_rows([cid for cid, _ in banded], (m for _, m in banded)))
+    deleted = stale + [c.id for c in leftover]
+    crud.delete_chunks(db, deleted)
+    stats["chunks_deleted"] = len(deleted)
+    crud.delete_documents(db, [d.id for d in removed_docs])
+    stats["documents_removed"] = len(removed_docs)
+    # 옮긴 청크는 내용이 그대로라 키워드 색인에서 건드리지 않는다
+    keyword_index.update_index(added=inserted, deleted=deleted)
+    vector_index.update_index(db, deleted=deleted)
+
+    if db_file.sha256 != sha256 or db_file.storage_path != str(pdf):
+        crud.update_file_source(db, db_file, str(pdf), sha256)
+
+    changed = (
+        stats["documents_added"] or stats["documents_changed"] or stats["documents_removed"]
+    )
+    if changed:
+        stats["corpus_version"] = crud.bump_corpus_version(
+            db, db_file.id, {k: v for k, v in stats.items() if k != "corpus_version"}
+        )
+    return stats
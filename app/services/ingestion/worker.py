@@ -0,0 +1,142 @@
+"""/ingestion/run 으로 등록된 작업을 처리하는 워커.
+
+    python -m app.services.ingestion.worker --workers 4
+
+작업은 ``SELECT … FOR UPDATE SKIP LOCKED`` 로 가져오므로 여러 프로세스/호스트에서
+워커를 띄워도 같은 작업을 두 번 처리하지 않는다. 처리 중에는 별도 스레드가 ``heartbeat_at`` 을
+``HEARTBEAT_INTERVAL`` 마다 갱신하고, ``LEASE_SECONDS`` 동안 갱신이 없던(워커가 죽은) running 작업은
+다른 워커가 ``MAX_ATTEMPTS`` 번까지 다시 가져가 체크포인트부터 재개한다. 작업 행 갱신은 모두
+``worker_id``·running 조건으로 묶여 있어(fencing) 임대를 잃은 옛 워커는 아무것도 덮어쓰지 못하고,
+heartbeat 실패나 단계 기록 실패로 임대를 잃은 것을 알면 다음 단계로 넘어가기 전에 중단한다. Upstage 키는 DB 에 저장하지 않고
+워커의 ``UPSTAGE_API_KEY`` 환경 변수를 사용한다. 프로세스마다 키워드 색인 델타 세그먼트를
+합치는 백그라운드 머저 스레드도 하나 띄운다(동시에 하나만 병합, ``--no-merger`` 로 끔).
+"""
+from __future__ import annotations
+
+import argparse
+import logging
+import os
+import socket
+import threading
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from app.db import crud, models
+from app.schemas.ingestion import RunRequest
+from app.services import pipeline
+from app.services.retrieval import keyword_index
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = float(os.getenv("INGESTION_WORKER_POLL_INTERVAL", "2.0"))
+LEASE_SECONDS = float(os.getenv("INGESTION_JOB_LEASE_SECONDS", "300"))
+HEARTBEAT_INTERVAL = float(os.getenv("INGESTION_JOB_HEARTBEAT_INTERVAL", "30"))
+MAX_ATTEMPTS = int(os.getenv("INGESTION_JOB_MAX_ATTEMPTS", "3"))
+
+
+class LeaseLost(RuntimeError):
+    """처리 중인 작업을 다른 워커가 다시 가져갔다."""
+
+
+def _heartbeat(
+    bind, job_id: int, worker_id: str, done: threading.Event, lost: threading.Event
+) -> None:
+    # 작업 세션은 파이프라인이 쓰고 있으므로 별도 세션으로
+    while not done.wait(HEARTBEAT_INTERVAL):
+        try:
+            with Session(bind=bind) as db:
+                if not crud.heartbeat_job(db, job_id, worker_id):
+                    logger.warning("job %s: lease lost (reclaimed by another worker)", job_id)
+                    lost.set()
+                    return
+        except Exception:
+            logger.exception("job %s: heartbeat failed", job_id)
+
+
+def process_job(db: Session, job: models.IngestionJob) -> None:
+    """claim 된 작업 하나를 실행하고 단계별 진행 상황·결과를 기록한다."""
+    job_id, worker_id = job.id, job.worker_id
+    done, lost = threading.Event(), threading.Event()
+    threading.Thread(
+        target=_heartbeat, args=(db.get_bind(), job_id, worker_id, done, lost), daemon=True,
+    ).start()
+    try:
+        req = RunRequest(**job.payload)
+        if not req.upstage_api_key:
+            raise ValueError("워커에 UPSTAGE_API_KEY 환경 변수가 필요합니다")
+
+        def on_stage(stage: str, status: str, seconds: Optional[float]) -> None:
+            # 단계 경계마다 임대를 확인해 새 주인과 같은 파일을 동시에 persist 하지 않는다
+            if lost.is_set() or not crud.update_job_stage(db, job, worker_id, stage, status, seconds):
+                raise LeaseLost(f"job {job_id}: lease lost before {stage} {status}")
+
+        result = pipeline.run_ingestion(db, req, req.upstage_api_key, on_stage=on_stage)
+    except LeaseLost as e:
+        db.rollback()
+        logger.warning("%s; abandoning", e)
+        return
+    except Exception as e:
+        logger.exception("ingestion job %s failed", job_id)
+        if not crud.fail_job(db, job, worker_id, f"{type(e).__name__}: {e}"):
+            logger.warning("job %s: lease lost; failure not recorded", job_id)
+        return
+    finally:
+        done.set()
+    # 임베딩 벡터는 청크 테이블에 있으므로 작업 결과에는 남기지 않는다
+    if not crud.finish_job(db, job, worker_id, result.model_dump(mode="json", exclude={"embeddings"})):
+        logger.warning("job %s: lease lost; result not recorded", job_id)
+
+
+def process_next(db: Session, worker_id: str) -> bool:
+    """대기 중인 작업 하나를 처리한다. 처리할 작업이 없으면 ``False``."""
+    job = crud.claim_job(db, worker_id, LEASE_SECONDS, MAX_ATTEMPTS)
+    if job is None:
+        return False
+    process_job(db, job)
+    return True
+
+
+def run_worker(worker_id: str, stop: threading.Event, poll_interval: float = POLL_INTERVAL) -> None:
+    from app.db.session import SessionLocal
+
+    while not stop.is_set():
+        with SessionLocal() as db:
+            try:
+                busy = process_next(db, worker_id)
+            except Exception:
+                logger.exception("worker %s: job claim failed", worker_id)
+                busy = False
+        if not busy:
+            stop.wait(poll_interval)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description="인제스트 작업 워커")
+    parser.add_argument("--workers", type=int, default=1, help="이 프로세스의 워커 스레드 수")
+    parser.add_argument("--poll-interval", type=float, default=POLL_INTERVAL)
+    parser.add_argument("--no-merger", action="store_true", help="키워드 색인 백그라운드 병합을 하지 않음")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+
+    stop = threading.Event()
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    threads = [
+        threading.Thread(target=run_worker, args=(f"{prefix}:{i}", stop, args.poll_interval), daemon=True)
+        for i in range(args.workers)
+    ]
+    if not args.no_merger:
+        threads.append(threading.Thread(target=keyword_index.run_merger, args=(stop,), daemon=True))
+    for t in threads:
+        t.start()
+    try:
+        for t in threads:
+            t.join()
+    except KeyboardInterrupt:
+        stop.set()
+        for t in threads:
+            t.join()
+
+
+if __name__ == "__main__":
+    main()
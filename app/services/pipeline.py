@@ -0,0 +1,578 @@
+"""단계별 체크포인트를 남기는 인제스트 파이프라인.
+
+split → analyze → extract → render → chunk → dedup → embed → persist 를 입력/출력이 선언된
+``Stage`` 로 모델링한다. 끝난 단계의 출력은 파일별 작업 폴더의
+``pipeline_state.json`` 에 기록되므로, 중간에 실패한 뒤 다시 실행하면 첫 번째
+미완료 단계부터 이어서 진행한다(이미 끝난 Upstage 호출 등은 반복하지 않음).
+
+체크포인트는 원본 PDF 의 sha256, 단계 옵션(``params``)이 같고 산출물 파일(``artifacts``)이
+남아 있을 때만 재사용한다. 어떤 단계가 다시 실행되면 그 뒤 단계도 모두 다시 실행한다.
+블록/청크/임베딩 산출물은 ``artifact_store`` 의 바이너리 포맷(``.art``)으로 저장한다.
+
+``parse_to_md_html`` 은 앞의 네 단계(PARSE_STAGES), /ingestion/run 작업은 전체(RUN_STAGES)를 사용한다.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import islice
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.db import crud
+from app.schemas.db import FileCreate, DocumentCreate, ChunkCreate
+from app.schemas.ingestion import RunRequest, RunResponse
+from app.services.chunk import content_hash, get_embeddings, page_hashes
+from app.services.ingestion.chunking import CHUNK_MAX_TOKENS, iter_chunk_blocks
+from app.services.ingestion.dedup import (
+    DEDUP_THRESHOLD, MinHashIndex, band_buckets, decode_signature, encode_signature, signature, similarity,
+)
+from app.services.ingestion.preprocess.split_pdf import split_pdf, iter_pdf_parts, page_ranges
+from app.services.ingestion.preprocess.analyzer_upstage import LayoutAnalyzer
+from app.services.ingestion.preprocess.extract_assets import extract_blocks_and_images
+from app.services.ingestion.preprocess import artifact_store
+from app.services.ingestion.preprocess.render_html_md import render_all
+from app.services.ingestion.preprocess.classify_pages import classify_pages, native_text_blocks, page_count
+from app.services.retrieval import keyword_index, vector_index
+
+STORAGE_ROOT = Path(os.getenv("INGESTION_STORAGE", "file/ingestion")).resolve()
+ARTIFACT_DIR = STORAGE_ROOT / "artifacts"
+ARTIFACT_DIR.mkdir(parents=True, exist_ok=True)
+
+STATE_FILE = "pipeline_state.json"
+# embed/persist 가 한 번에 메모리에 두는 청크 수
+CHUNK_WINDOW = int(os.getenv("INGESTION_CHUNK_WINDOW", "256"))
+
+# 단계 이름, 상태("running" | "done" | "skipped"), 소요 시간(초, done 일 때만)
+StageCallback = Callable[[str, str, Optional[float]], None]
+
+
+@dataclass
+class PipelineContext:
+    """단계 함수에 넘기는 실행 환경(체크포인트에 저장되지 않음)."""
+    pdf_path: Path
+    work_dir: Path
+    options: Dict[str, Any]
+    db: Optional[Session] = None
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[PipelineContext, Dict[str, Any]], Dict[str, Any]]
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    artifacts: Tuple[str, ...] = ()  # 파일 경로(또는 경로 리스트)인 출력: 없어지면 체크포인트 무효
+    params: Tuple[str, ...] = ()     # 바뀌면 체크포인트를 무효로 하는 옵션 키
+
+
+def file_sha256(path: str | Path, chunk_size: int = 1024 * 1024) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _write_json(path: Path, payload: Any) -> None:
+    """임시 파일에 쓴 뒤 교체해, 중간에 죽어도 반쯤 쓰인 파일이 남지 않게 한다."""
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(payload, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def _read_json(path: Path) -> Any:
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _artifacts_exist(outputs: Dict[str, Any], keys: Sequence[str]) -> bool:
+    for key in keys:
+        value = outputs.get(key)
+        paths = value if isinstance(value, list) else [value]
+        if any(p is not None and not Path(p).exists() for p in paths):
+            return False
+    return True
+
+
+class Pipeline:
+    def __init__(self, stages: Sequence[Stage]):
+        available = {"pdf_path", "work_dir", "source_sha256"}
+        for stage in stages:
+            missing = set(stage.inputs) - available
+            if missing:
+                raise ValueError(f"{stage.name}: 앞 단계에서 만들지 않는 입력 {sorted(missing)}")
+            available |= set(stage.outputs)
+        self.stages = list(stages)
+
+    def run(
+        self,
+        ctx: PipelineContext,
+        resume: bool = True,
+        on_stage: StageCallback | None = None,
+    ) -> Dict[str, Any]:
+        """모든 단계를 실행하고 누적된 출력 값을 돌려준다."""
+        ctx.work_dir.mkdir(parents=True, exist_ok=True)
+        state_path = ctx.work_dir / STATE_FILE
+        source = file_sha256(ctx.pdf_path)
+        state: Dict[str, Any] = {"source": source, "artifact_schema": artifact_store.SCHEMA_VERSION, "stages": {}}
+        if resume and state_path.exists():
+            try:
+                saved = _read_json(state_path)
+            except json.JSONDecodeError:
+                saved = None
+            # 원본이 같고 산출물 포맷(스키마 버전)도 같아야 이전 산출물을 재사용
+            if saved and saved.get("source") == source \
+                    and saved.get("artifact_schema") == artifact_store.SCHEMA_VERSION:
+                state = saved
+
+        values: Dict[str, Any] = {
+            "pdf_path": str(ctx.pdf_path), "work_dir": str(ctx.work_dir), "source_sha256": source,
+        }
+        reuse = resume
+        for stage in self.stages:
+            params = {k: ctx.options.get(k) for k in stage.params}
+            record = state["stages"].get(stage.name)
+            reuse = (
+                reuse
+                and record is not None
+                and record.get("params") == params
+                and _artifacts_exist(record["outputs"], stage.artifacts)
+            )
+            if reuse:
+                values.update(record["outputs"])
+                if on_stage:
+                    on_stage(stage.name, "skipped", None)
+                continue
+
+            state["stages"].pop(stage.name, None)
+            if on_stage:
+                on_stage(stage.name, "running", None)
+            t0 = time.perf_counter()
+            outputs = stage.run(ctx, {k: values[k] for k in stage.inputs})
+            seconds = time.perf_counter() - t0
+            missing = set(stage.outputs) - set(outputs)
+            if missing:
+                raise ValueError(f"{stage.name}: 선언한 출력 {sorted(missing)} 이(가) 없습니다")
+            outputs = {k: outputs[k] for k in stage.outputs}
+            values.update(outputs)
+            state["stages"][stage.name] = {"params": params, "outputs": outputs, "seconds": round(seconds, 3)}
+            _write_json(state_path, state)
+            if on_stage:
+                on_stage(stage.name, "done", seconds)
+        return values
+
+
+# --- 단계 구현 ---
+
+def _split(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    # 페이지 사전 분류: 텍스트 레이어로 충분한 페이지는 원격 분석 생략
+    if ctx.options.get("native_fast_path", True):
+        profiles = classify_pages(ctx.pdf_path)
+        layout_pages = [p["page_num"] for p in profiles if p["needs_layout"]]
+        native_pages = [p["page_num"] for p in profiles if not p["needs_layout"]]
+    else:
+        layout_pages, native_pages = list(range(1, page_count(ctx.pdf_path) + 1)), []
+    part_files = None
+    if ctx.options.get("write_parts") and layout_pages:
+        # 디버그용: 분할 파트 PDF 를 작업 폴더에 파일로 저장
+        part_files = [
+            str(Path(p).resolve())
+            for p in split_pdf(ctx.pdf_path, out_dir=ctx.work_dir,
+                               batch_size=ctx.options.get("batch_size", 10),
+                               pages=[p - 1 for p in layout_pages])
+        ]
+    return {"layout_pages": layout_pages, "native_pages": native_pages, "part_files": part_files}
+
+
+def _analyze(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    if not inputs["layout_pages"]:
+        return {"json_paths": []}
+    if inputs["part_files"] is not None:
+        parts = inputs["part_files"]
+    else:
+        # 분할 파트는 메모리에서만 만들어 바로 업로드
+        parts = iter_pdf_parts(ctx.pdf_path, batch_size=ctx.options.get("batch_size", 10),
+                               pages=[p - 1 for p in inputs["layout_pages"]])
+    analyzer = LayoutAnalyzer(api_key=ctx.options.get("upstage_key"), ocr=bool(ctx.options.get("ocr")))
+    json_paths = analyzer.analyze_many(
+        parts,
+        concurrency=ctx.options.get("concurrency"),
+        use_cache=ctx.options.get("use_cache", True),
+        out_dir=ctx.work_dir,
+    )
+    return {"json_paths": [str(Path(p).resolve()) for p in json_paths]}
+
+
+def _extract(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    blocks, images = [], []
+    if inputs["json_paths"]:
+        blocks, images = extract_blocks_and_images(
+            pdf_path=ctx.pdf_path, json_paths=inputs["json_paths"], out_dir=ctx.work_dir
+        )
+    # 로컬 텍스트 블록 병합(페이지 순서 유지)
+    if inputs["native_pages"]:
+        blocks = sorted(blocks + native_text_blocks(ctx.pdf_path, inputs["native_pages"]),
+                        key=lambda b: b.get("page_num", 0))
+    blocks_path = ctx.work_dir / f"{ctx.pdf_path.stem}.blocks{artifact_store.SUFFIX}"
+    artifact_store.save_blocks(blocks_path, blocks)
+    return {"blocks_path": str(blocks_path), "images": [str(Path(p).resolve()) for p in images]}
+
+
+def _render(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    blocks = artifact_store.load_blocks(inputs["blocks_path"])
+    result = render_all(blocks, out_dir=ctx.work_dir, base_name=ctx.pdf_path.stem)
+    return {"html_path": str(Path(result["html_path"]).resolve()), "md_path": str(Path(result["md_path"]).resolve())}
+
+
+def _part_range(json_path: str) -> Tuple[int, int]:
+    start, end = (int(x) for x in Path(json_path).stem.split("_")[-2:])
+    return start, end
+
+
+def _windows(items: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    it = iter(items)
+    while True:
+        window = list(islice(it, size))
+        if not window:
+            return
+        yield window
+
+
+def part_chunks(
+    blocks: Sequence[Dict[str, Any]], start: int, end: int, max_tokens: Optional[int] = None
+) -> Iterator[Dict[str, Any]]:
+    """0-based 포함 구간 ``[start, end]`` 파트의 블록을 청크 레코드로 묶는다(``block_ids`` 는 ``blocks`` 순번).
+
+    재인제스트도 바뀐 구간을 이 함수로 다시 청크해 최초 인제스트와 같은 청크(내용 해시)를 얻는다.
+    """
+    # 블록은 페이지 순서라 한 파트의 블록은 연속 구간이다
+    ids = [i for i, b in enumerate(blocks) if start < b.get("page_num", 0) <= end + 1]
+    if not ids:
+        return
+    for c in iter_chunk_blocks(blocks[ids[0]:ids[-1] + 1], max_tokens, first_block_id=ids[0]):
+        yield {"type": "chunk", "text": c["text"],
+               "meta": {"pages": c["pages"], "block_ids": c["block_ids"], "tokens": c["tokens"]}}
+
+
+def lsh_band_rows(chunk_ids: Sequence[int], minhashes: Iterable[str]) -> List[Dict[str, int]]:
+    """청크 id 와 ``chunk_meta["minhash"]`` → ``chunk_lsh_bands`` 행."""
+    return [
+        {"chunk_id": cid, "band": band, "bucket": bucket}
+        for cid, minhash in zip(chunk_ids, minhashes)
+        for band, bucket in enumerate(band_buckets(decode_signature(minhash)))
+    ]
+
+
+def _chunk(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    blocks = artifact_store.load_blocks(inputs["blocks_path"])
+    # 분석 파트마다 문서 하나, 로컬로 추출한 페이지는 분석 파트처럼 batch_size 구간마다 문서 하나(json_path 없음)
+    ranges = [(*_part_range(jp), jp) for jp in inputs["json_paths"]]
+    ranges += [
+        (start, end, None)
+        for start, end in page_ranges((p - 1 for p in inputs["native_pages"]), ctx.options.get("batch_size", 10))
+    ]
+
+    def records() -> Iterator[Dict[str, Any]]:
+        # 문서 레코드 뒤에 그 문서의 청크 레코드가 이어진다
+        for start, end, json_path in sorted(ranges, key=lambda r: r[0]):
+            yield {"type": "document", "json_path": json_path, "start": start, "end": end,
+                   "page_hashes": page_hashes(ctx.pdf_path, range(start, end + 1))}
+            yield from part_chunks(blocks, start, end, ctx.options.get("chunk_max_tokens"))
+
+    chunks_path = ctx.work_dir / f"{ctx.pdf_path.stem}.chunks{artifact_store.SUFFIX}"
+    artifact_store.write_records(chunks_path, records())
+    return {"chunks_path": str(chunks_path)}
+
+
+def _chunk_texts(chunks_path: str) -> Iterator[str]:
+    return (r["text"] for r in artifact_store.iter_records(chunks_path) if r["type"] == "chunk")
+
+
+def _dedup(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """거의 같은 청크를 앞에 나온 청크(파일 안) 또는 다른 파일의 기존 청크(코퍼스)로 합친다."""
+    chunks_path = inputs["chunks_path"]
+    index = MinHashIndex(ctx.options.get("dedup_threshold"))
+    signatures: List[np.ndarray] = []
+    kept_as: Dict[int, int] = {}                       # 중복 청크 → 남길 청크
+    merged_pages: Dict[int, set] = defaultdict(set)    # 남길 청크 → 중복들이 있던 페이지
+    merged_count: Dict[int, int] = defaultdict(int)
+    i = 0
+    for record in artifact_store.iter_records(chunks_path):
+        if record["type"] != "chunk":
+            continue
+        sig = signature(record["text"])
+        signatures.append(sig)
+        found = index.query(sig)
+        if found is None:
+            index.add(i, sig)
+        else:
+            kept_as[i] = found
+            merged_pages[found].update(record["meta"]["pages"])
+            merged_count[found] += 1
+        i += 1
+
+    # 다른 파일에 이미 저장된 청크와 비교(같은 원본 파일의 이전 청크는 제외)
+    corpus: Dict[int, int] = {}
+    if ctx.db is not None:
+        kept = (k for k in range(len(signatures)) if k not in kept_as)
+        for window in _windows(kept, CHUNK_WINDOW):
+            buckets = [b for k in window for b in band_buckets(signatures[k])]
+            candidates = [
+                (c.id, decode_signature(c.chunk_meta["minhash"]))
+                for c in crud.find_lsh_candidates(ctx.db, buckets, inputs["source_sha256"])
+                if (c.chunk_meta or {}).get("minhash")
+            ]
+            for k in window:
+                best = max(((similarity(signatures[k], sig), cid) for cid, sig in candidates), default=None)
+                if best is not None and best[0] >= index.threshold:
+                    corpus[k] = best[1]
+
+    def records() -> Iterator[Dict[str, Any]]:
+        k = 0
+        for record in artifact_store.iter_records(chunks_path):
+            if record["type"] != "chunk":
+                yield record
+                continue
+            pages = sorted(set(record["meta"]["pages"]) | merged_pages.get(k, set()))
+            if k not in kept_as:
+                meta = {**record["meta"], "pages": pages, "minhash": encode_signature(signatures[k])}
+                if merged_count.get(k):
+                    meta["duplicates"] = merged_count[k]  # 이 청크로 합친 중복 청크 수
+                if k in corpus:
+                    # 청크는 이 파일에도 저장하고(원본 파일이 지워져도 남도록) 임베딩만 재사용
+                    meta["duplicate_of"] = corpus[k]
+                    yield {"type": "corpus_duplicate", "chunk_id": corpus[k], "text": record["text"], "meta": meta}
+                else:
+                    yield {"type": "chunk", "text": record["text"], "meta": meta}
+            k += 1
+
+    dedup_path = ctx.work_dir / f"{ctx.pdf_path.stem}.dedup{artifact_store.SUFFIX}"
+    artifact_store.write_records(dedup_path, records())
+    stats = {
+        "chunks": len(signatures),
+        "kept": len(signatures) - len(kept_as) - len(corpus),
+        "file_duplicates": len(kept_as),
+        "corpus_duplicates": len(corpus),
+        "embeddings_saved": len(kept_as) + len(corpus),
+        "threshold": index.threshold,
+    }
+    return {"dedup_path": str(dedup_path), "dedup_stats": stats}
+
+
+def _embed(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    model_name = None
+    embeddings_path = ctx.work_dir / f"{ctx.pdf_path.stem}.embeddings{artifact_store.SUFFIX}"
+    with artifact_store.MatrixWriter(embeddings_path) as out:
+        # CHUNK_WINDOW 개씩 임베딩해 바로 디스크로(벡터 전체를 메모리에 두지 않음)
+        for window in _windows(_chunk_texts(inputs["dedup_path"]), CHUNK_WINDOW):
+            vectors, model_name = get_embeddings(window)
+            out.append(vectors)
+    return {"embeddings_path": str(embeddings_path), "embedding_model": model_name}
+
+
+def reuse_embeddings(
+    db: Session, texts: Sequence[str], owners: Sequence[int], model: Optional[str]
+) -> Tuple[List[Any], Optional[str]]:
+    """코퍼스 중복 청크의 벡터로 원본 청크(``owners``)의 ``model`` 임베딩을 복사한다.
+
+    원본이 그 사이 지워졌거나 다른 모델로 임베딩돼 재사용할 수 없는 청크만 새로 임베딩한다.
+    ``model`` 이 None(아직 임베딩한 청크가 없음)이면 전부 새로 임베딩한다. (벡터 목록, 모델)을 돌려준다.
+    """
+    copies = crud.get_embedding_vectors(db, owners, model) if model and owners else {}
+    out: List[Any] = [copies.get(cid) for cid in owners]
+    missing = [i for i, cid in enumerate(owners) if cid not in copies]
+    if missing:
+        embedded, used = get_embeddings([texts[i] for i in missing])
+        if model and used != model:
+            raise ValueError(f"임베딩 모델이 {model} 에서 {used} 로 바뀌었습니다")
+        model = used
+        for i, vec in zip(missing, embedded):
+            out[i] = vec
+    return out, model
+
+
+def _persist(ctx: PipelineContext, inputs: Dict[str, Any]) -> Dict[str, Any]:
+    db = ctx.db
+    if db is None:
+        raise ValueError("persist 단계에는 DB 세션이 필요합니다")
+    vectors = artifact_store.load_matrix(inputs["embeddings_path"])
+    pdf = ctx.pdf_path.resolve()
+    # 업로드로 이미 등록된 파일(같은 sha256)이면 그 행에 문서를 붙인다
+    db_file = crud.get_file_by_sha256(db, inputs["source_sha256"])
+    created = db_file is None
+    if created:
+        db_file = crud.create_file(
+            db,
+            FileCreate(original_name=pdf.name, mime_type="application/pdf", storage_path=str(pdf),
+                       sha256=inputs["source_sha256"]),
+        )
+    document_ids: List[int] = []
+    chunk_ids: List[int] = []  # vectors 행 순서
+    reused_ids: List[int] = []  # 코퍼스 중복으로 저장한 청크와 그 벡터
+    reused_vectors: List[Any] = []
+    pending: List[ChunkCreate] = []
+    sources: List[Optional[int]] = []  # pending 별 임베딩 출처: None 이면 vectors 다음 행, 아니면 재사용할 청크 id
+    row = 0
+    model = inputs["embedding_model"]
+
+    def flush() -> None:
+        nonlocal row, model
+        if not pending:
+            return
+        reused, model = reuse_embeddings(
+            db, [c.content for c, cid in zip(pending, sources) if cid is not None],
+            [cid for cid in sources if cid is not None], model,
+        )
+        reused_iter = iter(reused)
+        batch: List[Any] = []
+        for cid in sources:
+            if cid is None:
+                batch.append(vectors[row])
+                row += 1
+            else:
+                batch.append(next(reused_iter))
+        ids = crud.bulk_create_chunks_with_embeddings(
+            db, pending, np.asarray(batch, dtype=np.float32).tolist(), model=model,
+        )
+        for cid, source, vec in zip(ids, sources, batch):
+            if source is None:
+                chunk_ids.append(cid)
+            else:
+                reused_ids.append(cid)
+                reused_vectors.append(vec)
+        crud.create_lsh_bands(db, lsh_band_rows(ids, (c.chunk_meta["minhash"] for c in pending)))
+        pending.clear()
+        sources.clear()
+
+    try:
+        # 청크 레코드와 memmap 벡터를 CHUNK_WINDOW 개씩 저장
+        for record in artifact_store.iter_records(inputs["dedup_path"]):
+            if record["type"] == "document":
+                flush()
+                doc_meta = {
+                    "pdf_path": str(pdf),
+                    "pages": [record["start"] + 1, record["end"] + 1],
+                    "page_hashes": record["page_hashes"],  # 재인제스트 시 변경 페이지 판별용
+                }
+                if record["json_path"]:  # 로컬로 추출한 페이지 구간에는 레이아웃 JSON 이 없다
+                    doc_meta["json_path"] = str(Path(record["json_path"]))
+                db_doc = crud.create_document(
+                    db,
+                    DocumentCreate(
+                        file_id=db_file.id,
+                        title=f"{pdf.stem}_{record['start']:04d}_{record['end']:04d}.pdf",
+                        doc_meta=doc_meta,
+                    ),
+                )
+                document_ids.append(db_doc.id)
+                order = 0
+                continue
+            order += 1
+            pending.append(ChunkCreate(
+                document_id=db_doc.id, content=record["text"], chunk_order=order,
+                chunk_meta={"content_hash": content_hash(record["text"]), **record["meta"]},
+            ))
+            sources.append(record["chunk_id"] if record["type"] == "corpus_duplicate" else None)
+            if len(pending) >= CHUNK_WINDOW:
+                flush()
+        flush()
+    except Exception:
+        # 다시 실행할 때 중복 저장되지 않도록 이번에 만든 행을 지운다
+        if created:
+            crud.delete_file(db, db_file.id)
+        else:
+            crud.delete_documents(db, document_ids)
+        raise
+    # 키워드 색인에는 이번 파일의 청크를 델타 세그먼트 하나로 추가(DB 에서 다시 스트리밍)
+    keyword_index.update_index(added=crud.iter_chunk_contents(db, CHUNK_WINDOW, document_ids))
+    vector_index.update_index(db, model, chunk_ids, vectors[:row])
+    vector_index.update_index(db, model, reused_ids, reused_vectors)
+    return {"file_id": db_file.id, "document_ids": document_ids, "chunk_count": len(chunk_ids) + len(reused_ids)}
+
+
+SPLIT = Stage("split", _split, outputs=("layout_pages", "native_pages", "part_files"),
+              artifacts=("part_files",), params=("batch_size", "native_fast_path", "write_parts"))
+ANALYZE = Stage("analyze", _analyze, inputs=("layout_pages", "part_files"), outputs=("json_paths",),
+                artifacts=("json_paths",), params=("ocr",))
+EXTRACT = Stage("extract", _extract, inputs=("json_paths", "native_pages"), outputs=("blocks_path", "images"),
+                artifacts=("blocks_path", "images"))
+RENDER = Stage("render", _render, inputs=("blocks_path",), outputs=("html_path", "md_path"),
+               artifacts=("html_path", "md_path"))
+CHUNK = Stage("chunk", _chunk, inputs=("json_paths", "native_pages", "blocks_path"), outputs=("chunks_path",),
+              artifacts=("chunks_path",), params=("chunk_max_tokens",))
+DEDUP = Stage("dedup", _dedup, inputs=("chunks_path", "source_sha256"), outputs=("dedup_path", "dedup_stats"),
+              artifacts=("dedup_path",), params=("dedup_threshold",))
+EMBED = Stage("embed", _embed, inputs=("dedup_path",), outputs=("embeddings_path", "embedding_model"),
+              artifacts=("embeddings_path",))
+PERSIST = Stage("persist", _persist, inputs=("source_sha256", "dedup_path", "embeddings_path", "embedding_model"),
+                outputs=("file_id", "document_ids", "chunk_count"))
+
+PARSE_STAGES = (SPLIT, ANALYZE, EXTRACT, RENDER)
+RUN_STAGES = PARSE_STAGES + (CHUNK, DEDUP, EMBED, PERSIST)
+STAGES = tuple(s.name for s in RUN_STAGES)
+
+parse_pipeline = Pipeline(PARSE_STAGES)
+run_pipeline = Pipeline(RUN_STAGES)
+
+
+def run_ingestion(
+    db: Session,
+    req: RunRequest,
+    api_key: str,
+    on_stage: StageCallback | None = None,
+) -> RunResponse:
+    """/ingestion/run 작업: 전체 단계를 실행(또는 체크포인트에서 재개)한다.
+
+    텍스트 레이어로 충분한 페이지는 로컬에서 추출하고(``req.native_fast_path``) 나머지만 Upstage 로
+    분석한다. 분석 파트 하나, 로컬 페이지 구간(``batch_size`` 이하) 하나가 각각 Document 하나가 된다.
+    청크는 구간의 블록을 토큰 예산까지 묶은 것이다(:func:`part_chunks`).
+    Upstage 호출 실패는 ``ValueError`` 로 전달된다.
+    """
+    pdf = Path(req.pdf_path).resolve()
+    # 이름이 같은 다른 PDF 와 작업 폴더(체크포인트)를 공유하지 않도록 내용 해시를 붙인다
+    base = ARTIFACT_DIR / f"{pdf.stem}_{file_sha256(pdf)[:12]}"
+    ctx = PipelineContext(
+        pdf_path=pdf,
+        work_dir=base,
+        options={
+            "batch_size": req.batch_size,
+            "native_fast_path": req.native_fast_path,
+            "write_parts": req.write_parts,
+            "upstage_key": api_key,
+            "concurrency": req.concurrency,
+            "use_cache": req.use_cache,
+            "chunk_max_tokens": CHUNK_MAX_TOKENS,
+            "dedup_threshold": req.dedup_threshold if req.dedup_threshold is not None else DEDUP_THRESHOLD,
+        },
+        db=db,
+    )
+    values = run_pipeline.run(ctx, resume=req.resume, on_stage=on_stage)
+
+    json_paths: Dict[str, str] = {}
+    for jp in values["json_paths"]:
+        stem = Path(jp).stem
+        json_paths[str(base.resolve() / f"{stem}.pdf") if req.write_parts else f"{stem}.pdf"] = jp
+    # 청크/벡터는 DB 에 있으므로 응답에는 개수와 차원만 싣는다
+    vectors = artifact_store.load_matrix(values["embeddings_path"])
+    return RunResponse(
+        parts=list(json_paths),
+        json_paths=json_paths,
+        output_folder=str(base.resolve()),
+        html_path=values["html_path"],
+        md_path=values["md_path"],
+        images=sorted(values["images"]),
+        chunk_count=values["chunk_count"],
+        dedup=values["dedup_stats"],
+        embedding_model=values["embedding_model"],
+        embedding_dim=vectors.shape[1] if vectors.shape[0] else None,
+    )
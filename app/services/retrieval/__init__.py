@@ -0,0 +1 @@
+"""질의 시점 검색기(키워드 BM25 역색인, 한국어 형태소 토크나이저)."""
@@ -0,0 +1,524 @@
+"""``Chunk.content`` 위의 세그먼트 기반 디스크 BM25 역색인.
+
+색인 디렉터리 구성::
+
+    manifest.json       현재 세그먼트 목록, 툼스톤 파일, k1/b, 토크나이저 이름(교체로만 갱신)
+    seg-<ns>-<pid>/     불변 세그먼트
+        meta.json       문서 수, 길이 합
+        terms.json      정렬된 색인어 목록(i 번째 색인어의 포스팅은 offsets[i]:offsets[i+1])
+        offsets.npy     int64 (색인어 수 + 1)
+        docs.npy        int32 포스팅(세그먼트 안 문서 순번, 색인어별 오름차순)
+        tfs.npy         uint16 포스팅별 단어 빈도
+        doc_len.npy     int32 문서(청크) 길이(색인어 수)
+        chunk_ids.npy   int64 문서 순번 → ``chunks.id``
+    tombstones-<ns>.npy 지워진 ``chunks.id``(정렬된 int64)
+
+새로 인제스트한 청크는 :func:`add_chunks` 가 작은 델타 세그먼트로, 삭제는 :func:`delete_chunks` 가
+툼스톤으로 기록한다. :func:`merge_segments` (워커의 백그라운드 머저가 주기적으로 호출)는 크기 단계가
+같은 세그먼트가 ``MERGE_FACTOR`` 개 쌓이거나 툼스톤 비율이 높은 세그먼트를 하나로 합치면서
+지워진 문서를 실제로 뺀다. 세그먼트 배열은 ``mmap_mode="r"`` 로 열어 uvicorn 워커들이 페이지 캐시
+한 벌을 나눠 쓰고, 매니페스트가 더 이상 가리키지 않는 파일은 ``SEGMENT_GRACE_SECONDS`` 가 지난 뒤 지운다.
+
+점수는 rank_bm25 의 ``BM25Okapi`` 와 같은 식이되 idf 는 음수가 나오지 않는 Lucene 형태
+``log(1 + (N - df + 0.5) / (df + 0.5))`` 이고, N·df·평균 길이는 (Lucene 처럼) 병합 전까지
+툼스톤 문서를 포함한 전체 세그먼트 기준이다.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .tokenizer import tokenize, tokenizer_name
+
+try:  # pragma: no cover - POSIX 전용
+    import fcntl
+except Exception:  # pragma: no cover
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+KEYWORD_INDEX_DIR = Path(os.getenv("KEYWORD_INDEX_DIR", "file/index/bm25")).resolve()
+BM25_K1 = float(os.getenv("BM25_K1", "1.5"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+# 문서 수 기준 크기 단계(log_MERGE_FACTOR)가 같은 세그먼트가 이만큼 쌓이면 병합
+MERGE_FACTOR = int(os.getenv("KEYWORD_MERGE_FACTOR", "8"))
+# 툼스톤 문서 비율이 이보다 높은 세그먼트는 단독으로라도 다시 쓴다
+MERGE_DELETED_RATIO = float(os.getenv("KEYWORD_MERGE_DELETED_RATIO", "0.3"))
+MERGE_INTERVAL = float(os.getenv("KEYWORD_MERGE_INTERVAL", "30"))
+# 매니페스트에서 빠진 세그먼트를 다른 프로세스가 아직 읽고 있을 수 있어 이만큼 기다렸다가 지운다
+SEGMENT_GRACE_SECONDS = float(os.getenv("KEYWORD_SEGMENT_GRACE_SECONDS", "300"))
+_TF_MAX = np.iinfo(np.uint16).max
+_MANIFEST = "manifest.json"
+
+
+class Segment:
+    """불변 세그먼트 하나(배열은 memmap)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        with open(path / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        with open(path / "terms.json", encoding="utf-8") as f:
+            self.terms: List[str] = json.load(f)
+        self.term_ids: Dict[str, int] = {t: i for i, t in enumerate(self.terms)}
+        self.offsets = np.load(path / "offsets.npy", mmap_mode="r")
+        self.docs = np.load(path / "docs.npy", mmap_mode="r")
+        self.tfs = np.load(path / "tfs.npy", mmap_mode="r")
+        self.doc_len = np.load(path / "doc_len.npy", mmap_mode="r")
+        self.chunk_ids = np.load(path / "chunk_ids.npy", mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self.chunk_ids)
+
+    def postings(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        tid = self.term_ids.get(term)
+        if tid is None:
+            return np.empty(0, dtype=np.int32), np.empty(0, dtype=np.uint16)
+        start, end = int(self.offsets[tid]), int(self.offsets[tid + 1])
+        return np.asarray(self.docs[start:end]), np.asarray(self.tfs[start:end])
+
+
+class KeywordIndex:
+    """매니페스트 한 시점의 읽기 전용 BM25 색인(세그먼트 + 툼스톤)."""
+
+    def __init__(self, path: Path, manifest: dict, segments: List[Segment], tombstones: np.ndarray):
+        self.path = path
+        self.manifest = manifest
+        self.segments = segments
+        self.tombstones = tombstones
+        self.k1 = manifest["k1"]
+        self.b = manifest["b"]
+        self.n_docs = sum(len(s) for s in segments)
+        self.avg_len = (sum(s.meta["total_len"] for s in segments) / self.n_docs) if self.n_docs else 0.0
+
+    def __len__(self) -> int:
+        """툼스톤을 뺀 문서 수."""
+        return self.n_docs - sum(int(np.isin(s.chunk_ids, self.tombstones).sum()) for s in self.segments)
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """BM25 점수 상위 ``k`` 개 ``(chunk_id, score)``(점수 내림차순)."""
+        terms = set(tokenize(query))
+        if not terms or not self.n_docs:
+            return []
+        postings = {t: [s.postings(t) for s in self.segments] for t in terms}
+        avg_len = self.avg_len or 1.0
+        ids, scores = [], []
+        for seg_no, seg in enumerate(self.segments):
+            docs, parts = [], []
+            for per_segment in postings.values():
+                d, tf = per_segment[seg_no]
+                if not len(d):
+                    continue
+                df = sum(len(p[0]) for p in per_segment)
+                idf = np.log1p((self.n_docs - df + 0.5) / (df + 0.5))
+                tf = tf.astype(np.float32)
+                norm = self.k1 * (1.0 - self.b + self.b * seg.doc_len[d] / avg_len)
+                docs.append(d)
+                parts.append(idf * tf * (self.k1 + 1.0) / (tf + norm))
+            if not docs:
+                continue
+            # 후보(포스팅에 나온 문서)만 합산 — 세그먼트 문서 수 길이의 점수 배열을 만들지 않는다
+            uniq, inverse = np.unique(np.concatenate(docs), return_inverse=True)
+            ids.append(np.asarray(seg.chunk_ids[uniq]))
+            scores.append(np.bincount(inverse, weights=np.concatenate(parts)))
+        if not ids:
+            return []
+        ids_all, scores_all = np.concatenate(ids), np.concatenate(scores)
+        alive = ~np.isin(ids_all, self.tombstones)
+        ids_all, scores_all = ids_all[alive], scores_all[alive]
+        # 재색인 경합으로 같은 청크가 두 세그먼트에 있으면 높은 점수 하나만
+        order = np.lexsort((-scores_all, ids_all))
+        ids_all, scores_all = ids_all[order], scores_all[order]
+        first = np.ones(len(ids_all), dtype=bool)
+        first[1:] = ids_all[1:] != ids_all[:-1]
+        ids_all, scores_all = ids_all[first], scores_all[first]
+        if len(scores_all) > k:
+            top = np.argpartition(-scores_all, k - 1)[:k]
+        else:
+            top = np.arange(len(scores_all))
+        top = top[np.lexsort((ids_all[top], -scores_all[top]))]
+        return [(int(ids_all[i]), float(scores_all[i])) for i in top]
+
+
+# ---------------------------------------------------------------------------
+# 쓰기
+# ---------------------------------------------------------------------------
+
+
+@contextmanager
+def _locked(path: Path, name: str = ".lock", blocking: bool = True) -> Iterator[bool]:
+    """프로세스 간 배타 잠금. ``blocking=False`` 면 이미 잠겨 있을 때 ``False`` 를 내준다."""
+    path.mkdir(parents=True, exist_ok=True)
+    with open(path / name, "a+") as f:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _read_manifest(path: Path) -> Optional[dict]:
+    try:
+        with open(path / _MANIFEST, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except FileNotFoundError:
+        return None
+    if manifest.get("version") != INDEX_VERSION:
+        raise ValueError(f"지원하지 않는 키워드 색인 버전: {manifest.get('version')}")
+    return manifest
+
+
+def _new_manifest(k1: float = BM25_K1, b: float = BM25_B) -> dict:
+    return {"version": INDEX_VERSION, "tokenizer": tokenizer_name(), "k1": k1, "b": b,
+            "segments": [], "tombstones": None}
+
+
+def _write_manifest(path: Path, manifest: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    os.replace(tmp, path / _MANIFEST)
+
+
+def _load_tombstones(path: Path, manifest: dict) -> np.ndarray:
+    if not manifest.get("tombstones"):
+        return np.empty(0, dtype=np.int64)
+    return np.load(path / manifest["tombstones"])
+
+
+def _save_tombstones(path: Path, manifest: dict, ids: np.ndarray) -> None:
+    """툼스톤 파일은 불변으로 두고 새 이름으로 써서 매니페스트가 가리키게 한다."""
+    if not len(ids):
+        manifest["tombstones"] = None
+        return
+    name = f"tombstones-{time.time_ns():016x}-{os.getpid()}.npy"
+    np.save(path / name, np.unique(ids.astype(np.int64)))
+    manifest["tombstones"] = name
+
+
+def _check_tokenizer(manifest: dict) -> None:
+    if manifest["tokenizer"] != tokenizer_name():
+        raise ValueError(
+            f"색인 토크나이저({manifest['tokenizer']})와 현재 토크나이저({tokenizer_name()})가 다릅니다. "
+            "scripts/rebuild_index.py 로 다시 만드세요"
+        )
+
+
+def _segment_name() -> str:
+    # 생성 시각 순으로 정렬되는 이름(전체 재빌드 중에 추가된 세그먼트 판별에 쓴다)
+    return f"seg-{time.time_ns():016x}-{os.getpid()}"
+
+
+def _write_segment(
+    path: Path,
+    terms: Sequence[str],
+    offsets: np.ndarray,
+    docs: np.ndarray,
+    tfs: np.ndarray,
+    doc_len: np.ndarray,
+    chunk_ids: np.ndarray,
+) -> dict:
+    """세그먼트 디렉터리를 임시 이름으로 만든 뒤 제자리로 옮긴다. 매니페스트 항목을 반환."""
+    name = _segment_name()
+    tmp = Path(tempfile.mkdtemp(dir=path, prefix=f".{name}."))
+    try:
+        np.save(tmp / "offsets.npy", offsets.astype(np.int64))
+        np.save(tmp / "docs.npy", docs.astype(np.int32))
+        np.save(tmp / "tfs.npy", tfs.astype(np.uint16))
+        np.save(tmp / "doc_len.npy", doc_len.astype(np.int32))
+        np.save(tmp / "chunk_ids.npy", chunk_ids.astype(np.int64))
+        with open(tmp / "terms.json", "w", encoding="utf-8") as f:
+            json.dump(list(terms), f, ensure_ascii=False)
+        entry = {"name": name, "docs": int(len(chunk_ids)), "total_len": int(doc_len.sum())}
+        with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+            json.dump(entry, f)
+        os.replace(tmp, path / name)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    return entry
+
+
+def _build_segment(path: Path, chunks: Iterable[Tuple[int, str]]) -> Optional[dict]:
+    postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+    chunk_ids: List[int] = []
+    doc_len: List[int] = []
+    for doc, (chunk_id, content) in enumerate(chunks):
+        counts = Counter(tokenize(content or ""))
+        for term, tf in counts.items():
+            postings[term].append((doc, min(tf, _TF_MAX)))
+        chunk_ids.append(chunk_id)
+        doc_len.append(sum(counts.values()))
+    if not chunk_ids:
+        return None
+
+    terms = sorted(postings)
+    sizes = np.fromiter((len(postings[t]) for t in terms), dtype=np.int64, count=len(terms))
+    offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    docs = np.empty(int(offsets[-1]), dtype=np.int32)
+    tfs = np.empty(int(offsets[-1]), dtype=np.uint16)
+    for i, term in enumerate(terms):
+        pairs = np.asarray(postings.pop(term), dtype=np.int64)
+        docs[offsets[i]:offsets[i + 1]] = pairs[:, 0]
+        tfs[offsets[i]:offsets[i + 1]] = pairs[:, 1]
+    return _write_segment(
+        path, terms, offsets, docs, tfs,
+        np.asarray(doc_len, dtype=np.int32), np.asarray(chunk_ids, dtype=np.int64),
+    )
+
+
+def _merge_into_segment(path: Path, segments: Sequence[Segment], drop: np.ndarray) -> Optional[dict]:
+    """세그먼트들을 하나로 합치며 ``drop`` 의 청크를 뺀다(포스팅을 색인어·문서 순으로 재정렬)."""
+    vocab = sorted(set().union(*(s.terms for s in segments)))
+    vocab_ids = {t: i for i, t in enumerate(vocab)}
+    term_parts, doc_parts, tf_parts, id_parts, len_parts = [], [], [], [], []
+    base = 0
+    for seg in segments:
+        keep = ~np.isin(seg.chunk_ids, drop)
+        remap = np.cumsum(keep) - 1 + base
+        local = np.fromiter((vocab_ids[t] for t in seg.terms), dtype=np.int64, count=len(seg.terms))
+        posting_terms = np.repeat(local, np.diff(seg.offsets))
+        docs = np.asarray(seg.docs)
+        alive = keep[docs]
+        term_parts.append(posting_terms[alive])
+        doc_parts.append(remap[docs[alive]])
+        tf_parts.append(np.asarray(seg.tfs)[alive])
+        id_parts.append(np.asarray(seg.chunk_ids)[keep])
+        len_parts.append(np.asarray(seg.doc_len)[keep])
+        base += int(keep.sum())
+    if not base:
+        return None
+    term_of, doc_of, tf_of = np.concatenate(term_parts), np.concatenate(doc_parts), np.concatenate(tf_parts)
+    order = np.lexsort((doc_of, term_of))
+    counts = np.bincount(term_of, minlength=len(vocab))
+    used = counts > 0  # 지운 문서에만 있던 색인어는 뺀다
+    offsets = np.zeros(int(used.sum()) + 1, dtype=np.int64)
+    np.cumsum(counts[used], out=offsets[1:])
+    return _write_segment(
+        path, [t for t, u in zip(vocab, used) if u], offsets, doc_of[order], tf_of[order],
+        np.concatenate(len_parts), np.concatenate(id_parts),
+    )
+
+
+def _collect_garbage(path: Path, manifest: dict) -> None:
+    """매니페스트가 가리키지 않는 세그먼트/툼스톤/임시 파일 중 유예 시간이 지난 것을 지운다."""
+    live = {s["name"] for s in manifest["segments"]}
+    live |= {manifest.get("tombstones"), _MANIFEST, ".lock", ".merge.lock"}
+    cutoff = time.time() - SEGMENT_GRACE_SECONDS
+    for entry in path.iterdir():
+        if entry.name in live:
+            continue
+        try:
+            if entry.stat().st_mtime > cutoff:
+                continue
+            if entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+            else:
+                entry.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def build_index(
+    chunks: Iterable[Tuple[int, str]],
+    path: str | Path | None = None,
+    k1: float = BM25_K1,
+    b: float = BM25_B,
+) -> int:
+    """``(chunk_id, content)`` 전체로 단일 세그먼트 색인을 새로 만든다(툼스톤 초기화).
+
+    만드는 동안 :func:`add_chunks` 로 추가된 세그먼트는 유지한다. 색인한 청크 수를 반환.
+    """
+    path = Path(path or KEYWORD_INDEX_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    started = _segment_name()
+    entry = _build_segment(path, chunks)
+    with _locked(path):
+        try:
+            manifest = _read_manifest(path)
+        except ValueError:  # 이전 버전 색인은 버린다
+            manifest = None
+        newer = []
+        if manifest is not None and manifest["tokenizer"] == tokenizer_name():
+            newer = [s for s in manifest["segments"] if s["name"] > started]
+        fresh = _new_manifest(k1, b)
+        fresh["segments"] = ([entry] if entry else []) + newer
+        _write_manifest(path, fresh)
+        _collect_garbage(path, fresh)
+    return entry["docs"] if entry else 0
+
+
+def add_chunks(chunks: Iterable[Tuple[int, str]], path: str | Path | None = None) -> int:
+    """새 청크들을 델타 세그먼트 하나로 추가한다. 추가한 청크 수를 반환."""
+    path = Path(path or KEYWORD_INDEX_DIR)
+    path.mkdir(parents=True, exist_ok=True)
+    manifest = _read_manifest(path)
+    if manifest is not None:
+        _check_tokenizer(manifest)
+    entry = _build_segment(path, chunks)
+    if entry is None:
+        return 0
+    with _locked(path):
+        manifest = _read_manifest(path) or _new_manifest()
+        manifest["segments"].append(entry)
+        _write_manifest(path, manifest)
+    return entry["docs"]
+
+
+def delete_chunks(chunk_ids: Iterable[int], path: str | Path | None = None) -> None:
+    """청크를 툼스톤으로 지운다(다음 병합 때 세그먼트에서 실제로 빠진다)."""
+    ids = np.fromiter(chunk_ids, dtype=np.int64)
+    path = Path(path or KEYWORD_INDEX_DIR)
+    if not len(ids) or not (path / _MANIFEST).exists():
+        return
+    with _locked(path):
+        manifest = _read_manifest(path)
+        _save_tombstones(path, manifest, np.concatenate([_load_tombstones(path, manifest), ids]))
+        _write_manifest(path, manifest)
+
+
+def _plan_merges(segments: List[Segment], tombstones: np.ndarray) -> List[List[Segment]]:
+    tiers: Dict[int, List[Segment]] = defaultdict(list)
+    plans: List[List[Segment]] = []
+    for seg in segments:
+        deleted = int(np.isin(seg.chunk_ids, tombstones).sum()) if len(tombstones) else 0
+        if deleted and deleted >= MERGE_DELETED_RATIO * len(seg):
+            plans.append([seg])
+            continue
+        tier, size = 0, len(seg)
+        while size >= MERGE_FACTOR:
+            size //= MERGE_FACTOR
+            tier += 1
+        tiers[tier].append(seg)
+    for tier in sorted(tiers):
+        if len(tiers[tier]) >= MERGE_FACTOR:
+            plans.append(tiers[tier])
+    return plans
+
+
+def merge_segments(path: str | Path | None = None, force: bool = False) -> int:
+    """병합 정책에 맞는 세그먼트를 합친다(``force`` 면 전부 하나로). 병합한 횟수를 반환.
+
+    다른 프로세스가 병합 중이면 아무것도 하지 않는다.
+    """
+    path = Path(path or KEYWORD_INDEX_DIR)
+    if not (path / _MANIFEST).exists():
+        return 0
+    with _locked(path, ".merge.lock", blocking=False) as acquired:
+        if not acquired:
+            return 0
+        with _lock:
+            index = _open(path)
+        if index is None or not index.segments:
+            return 0
+        if force:
+            plans = [index.segments] if len(index.segments) > 1 or len(index.tombstones) else []
+        else:
+            plans = _plan_merges(index.segments, index.tombstones)
+        for group in plans:
+            group_ids = np.concatenate([np.asarray(s.chunk_ids) for s in group])
+            dropped = index.tombstones[np.isin(index.tombstones, group_ids)]
+            entry = _merge_into_segment(path, group, dropped)
+            names = {s.name for s in group}
+            with _locked(path):
+                manifest = _read_manifest(path)
+                position = next(i for i, s in enumerate(manifest["segments"]) if s["name"] in names)
+                rest = [s for s in manifest["segments"] if s["name"] not in names]
+                manifest["segments"] = rest[:position] + ([entry] if entry else []) + rest[position:]
+                # 병합 중에 새로 들어온 툼스톤은 그대로 두고, 실제로 뺀 것만 지운다
+                current = _load_tombstones(path, manifest)
+                _save_tombstones(path, manifest, current[~np.isin(current, dropped)])
+                _write_manifest(path, manifest)
+                _collect_garbage(path, manifest)
+        return len(plans)
+
+
+def run_merger(stop: threading.Event, path: str | Path | None = None, interval: float = MERGE_INTERVAL) -> None:
+    """``stop`` 이 설정될 때까지 ``interval`` 초마다 :func:`merge_segments` 를 돌린다(백그라운드 스레드용)."""
+    while not stop.wait(interval):
+        try:
+            merge_segments(path)
+        except Exception:
+            logger.exception("keyword index merge failed")
+
+
+def update_index(
+    added: Iterable[Tuple[int, str]] = (),
+    deleted: Iterable[int] = (),
+    path: str | Path | None = None,
+) -> None:
+    """인제스트 경로에서 쓰는 색인 갱신. DB 가 원본이므로 실패해도 예외를 올리지 않고 로그만 남긴다
+    (``scripts/rebuild_index.py`` 로 복구)."""
+    try:
+        delete_chunks(deleted, path)
+        add_chunks(added, path)
+    except Exception:
+        logger.exception("keyword index update failed; rebuild with scripts/rebuild_index.py")
+
+
+# ---------------------------------------------------------------------------
+# 읽기
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+_segments: Dict[Path, Segment] = {}
+_loaded: Dict[Path, Tuple[Tuple[int, int], Optional[KeywordIndex]]] = {}
+
+
+def _open(path: Path) -> Optional[KeywordIndex]:
+    manifest = _read_manifest(path)
+    if manifest is None:
+        return None
+    segments = []
+    for entry in manifest["segments"]:
+        seg_path = path / entry["name"]
+        seg = _segments.get(seg_path)
+        if seg is None:
+            seg = _segments[seg_path] = Segment(seg_path)
+        segments.append(seg)
+    live = {path / e["name"] for e in manifest["segments"]}
+    for stale in [p for p in _segments if p.parent == path and p not in live]:
+        del _segments[stale]
+    return KeywordIndex(path, manifest, segments, _load_tombstones(path, manifest))
+
+
+def get_keyword_index(path: str | Path | None = None) -> Optional[KeywordIndex]:
+    """색인을 열어 재사용한다. 매니페스트가 바뀌면(추가·삭제·병합) 다시 연다. 없으면 ``None``."""
+    path = Path(path or KEYWORD_INDEX_DIR)
+    try:
+        stat = (path / _MANIFEST).stat()
+    except FileNotFoundError:
+        return None
+    version = (stat.st_ino, stat.st_mtime_ns)
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != version:
+            index = _open(path)
+            if index is not None and index.manifest["tokenizer"] != tokenizer_name():
+                logger.warning("keyword index tokenizer mismatch (%s != %s); rebuild required",
+                               index.manifest["tokenizer"], tokenizer_name())
+                index = None
+            cached = (version, index)
+            _loaded[path] = cached
+        return cached[1]
@@ -0,0 +1,75 @@
+"""임베딩 모델별 벡터 정밀도 단계와 NumPy 양자화·근사 점수.
+
+단계(바이트/차원): ``float32``(4) · ``float16``(2) · ``int8``(1, 행마다 스케일 하나) · ``binary``(1/8, 부호 비트).
+양자화 단계는 근사 점수로 ``k × RESCORE_FACTOR`` 개 후보를 뽑고, DB 에 float32 로 남아 있는 원래
+벡터로 정확한 코사인 유사도를 다시 계산해 top-k 를 고른다.
+
+PostgreSQL 에서는 ``float16`` → ``vector::halfvec(dim)`` HNSW, ``binary`` → ``binary_quantize(...)::bit(dim)``
+HNSW(마이그레이션 0007_embeddings_quantized_ann)를 쓰고, pgvector 에 int8 형이 없으므로 ``int8`` 은 ``float16``
+으로 대신한다. memmap 벡터 색인(``vector_index``)은 네 단계를 모두 지원한다.
+
+``RAG_VECTOR_PRECISION`` 형식: ``기본[,모델=단계...]`` (예: ``float32,openai=binary``).
+"""
+from __future__ import annotations
+
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+PRECISIONS = ("float32", "float16", "int8", "binary")
+VECTOR_PRECISION = os.getenv("RAG_VECTOR_PRECISION", "float32")
+# 양자화 단계에서 정확 재계산할 후보 수 = k × RESCORE_FACTOR
+RESCORE_FACTOR = int(os.getenv("RAG_RESCORE_FACTOR", "4"))
+# 단계 → PostgreSQL ANN 식의 형
+PG_TYPES = {"float32": "vector", "float16": "halfvec", "int8": "halfvec", "binary": "bit"}
+
+
+def parse_precisions(spec: str) -> Tuple[str, Dict[str, str]]:
+    """``RAG_VECTOR_PRECISION`` 형식 문자열 → ``(기본 단계, {모델: 단계})``."""
+    default, per_model = "float32", {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        model, sep, precision = item.rpartition("=")
+        if precision not in PRECISIONS:
+            raise ValueError(f"알 수 없는 벡터 정밀도: {precision!r} (가능: {', '.join(PRECISIONS)})")
+        if sep:
+            per_model[model.strip()] = precision
+        else:
+            default = precision
+    return default, per_model
+
+
+def precision_for(model: str, spec: Optional[str] = None) -> str:
+    default, per_model = parse_precisions(VECTOR_PRECISION if spec is None else spec)
+    return per_model.get(model, default)
+
+
+def code_shape(dim: int, precision: str) -> Tuple[np.dtype, int]:
+    """한 행의 코드 ``(dtype, 열 수)``."""
+    if precision == "binary":
+        return np.dtype(np.uint8), (dim + 7) // 8
+    return np.dtype({"float32": np.float32, "float16": np.float16, "int8": np.int8}[precision]), dim
+
+
+def encode(vectors: np.ndarray, precision: str) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """L2 정규화한 float32 행들 → ``(코드, int8 행 스케일 또는 None)``."""
+    if precision in ("float32", "float16"):
+        return vectors.astype(precision), None
+    if precision == "int8":
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales = np.where(scales == 0, 1.0, scales).astype(np.float32)
+        return np.rint(vectors / scales[:, None]).astype(np.int8), scales
+    return np.packbits(vectors > 0, axis=1), None
+
+
+def approx_scores(
+    queries: np.ndarray, codes: np.ndarray, scales: Optional[np.ndarray], precision: str, dim: int
+) -> np.ndarray:
+    """정규화한 질의 ``(nq, dim)`` 과 코드 블록의 근사 코사인 유사도 ``(nq, rows)``."""
+    if precision == "binary":
+        bits = np.packbits(queries > 0, axis=1)
+        hamming = np.bitwise_count(bits[:, None, :] ^ codes[None, :, :]).sum(axis=2, dtype=np.int32)
+        # 부호가 다른 비트 비율 ≈ 두 벡터 사이 각도 / π
+        return np.cos(np.pi * hamming / dim).astype(np.float32)
+    scores = queries @ codes.astype(np.float32, copy=False).T
+    return scores * scales[None, :] if scales is not None else scores
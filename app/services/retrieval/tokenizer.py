@@ -0,0 +1,67 @@
+"""키워드 검색용 한국어 토크나이저.
+
+kiwipiepy 가 있으면 형태소 분석 결과에서 내용어(명사·어근·용언 어간·외국어·숫자)만 남기고,
+없으면 한글/영문/숫자 덩어리로 나눈 뒤 한글 어절 끝의 조사를 떼는 규칙 기반 근사를 쓴다.
+색인과 질의가 같은 토크나이저를 써야 하므로 색인 메타에 :func:`tokenizer_name` 을 기록한다.
+"""
+from __future__ import annotations
+
+import os
+import re
+from functools import lru_cache
+from typing import Callable, List
+
+try:  # pragma: no cover - optional dependency
+    from kiwipiepy import Kiwi  # type: ignore
+except Exception:  # pragma: no cover
+    Kiwi = None
+
+# "kiwi" | "regex" (기본: kiwipiepy 가 있으면 kiwi)
+KEYWORD_TOKENIZER = os.getenv("KEYWORD_TOKENIZER", "kiwi" if Kiwi is not None else "regex")
+
+# 명사(일반/고유/수사), 어근, 동사·형용사 어간, 외국어, 한자, 숫자
+_KIWI_TAGS = {"NNG", "NNP", "NR", "XR", "VV", "VA", "SL", "SH", "SN"}
+_WORD = re.compile(r"[가-힣]+|[a-z]+|\d+")
+_JOSA_SET = frozenset(
+    "에서부터 으로부터 에게서 으로서 으로써 이라고 에서 에게 한테 께서 으로 로서 로써 까지 부터 처럼 "
+    "보다 이나 이란 이라 라도 마다 조차 밖에 은 는 이 가 을 를 에 의 와 과 도 만 로 나".split()
+)
+# 긴 것부터 시도. 한 글자 조사는 남는 어간이 두 글자 이상일 때만 뗀다
+_JOSA = sorted(_JOSA_SET, key=len, reverse=True)
+
+
+def _strip_josa(word: str) -> str:
+    for josa in _JOSA:
+        if word.endswith(josa) and len(word) - len(josa) >= (2 if len(josa) == 1 else 1):
+            return word[: -len(josa)]
+    return word
+
+
+def _regex_tokenize(text: str) -> List[str]:
+    tokens = []
+    for word in _WORD.findall(text.lower()):
+        if "가" <= word[0] <= "힣":
+            if word in _JOSA_SET:  # 영문/숫자 뒤에 붙은 조사("API를")
+                continue
+            word = _strip_josa(word)
+        tokens.append(word)
+    return tokens
+
+
+@lru_cache(maxsize=None)
+def get_keyword_tokenizer() -> Callable[[str], List[str]]:
+    """텍스트 → 색인어 리스트 함수(프로세스당 한 번 로드)."""
+    if KEYWORD_TOKENIZER == "kiwi" and Kiwi is not None:
+        kiwi = Kiwi()
+        return lambda text: [
+            t.form.lower() for t in kiwi.tokenize(text) if t.tag in _KIWI_TAGS
+        ]
+    return _regex_tokenize
+
+
+def tokenizer_name() -> str:
+    return "kiwi" if KEYWORD_TOKENIZER == "kiwi" and Kiwi is not None else "regex"
+
+
+def tokenize(text: str) -> List[str]:
+    return get_keyword_tokenizer()(text)
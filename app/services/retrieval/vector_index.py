@@ -0,0 +1,269 @@
+"""pgvector 가 없는 DB(SQLite, 소규모 설치)용 memmap NumPy 정확 검색 벡터 색인.
+
+임베딩 모델·차원마다 디렉터리 하나::
+
+    <VECTOR_INDEX_DIR>/<model>-<dim>/
+        meta.json     차원, 정밀도 단계(quantization.PRECISIONS)
+        vectors.bin   L2 정규화한 벡터의 코드 행들(append 전용, 행 우선 연속 배열)
+        scales.bin    int8 단계의 행 스케일(float32)
+        ids.bin       행 → ``chunks.id`` (int64, vectors.bin 과 같은 순서)
+        deleted.bin   지운 ``chunks.id`` (int64, append 전용)
+
+행은 항상 vectors.bin → ids.bin 순으로 덧붙이고, 읽는 쪽은 ids.bin 길이만큼만 행으로 본다
+(쓰다 만 행은 보이지 않음). 파일은 ``np.memmap`` 읽기 전용으로 열어 워커들이 페이지 캐시 한 벌을
+나눠 쓰고, 파일이 자라면 다음 검색 때 다시 연다. 검색은 ``SCAN_ROWS`` 행 블록마다 행렬-벡터 곱과
+``argpartition`` 으로 후보를 고른 뒤 합친다. 색인이 없거나 모델의 정밀도 설정이 바뀌었으면 첫 검색 때
+DB 임베딩으로 (다시) 만든다. 양자화 단계는 ``search`` 가 후보를 DB 의 float32 벡터로 다시 채점한다.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.db import crud
+
+from .keyword_index import _locked
+from .quantization import RESCORE_FACTOR, approx_scores, code_shape, encode, precision_for
+
+logger = logging.getLogger(__name__)
+
+VECTOR_INDEX_DIR = Path(os.getenv("VECTOR_INDEX_DIR", "file/index/vectors")).resolve()
+# 한 번에 곱하는 행 수(블록 × 차원 × 4바이트 만큼의 임시 메모리)
+SCAN_ROWS = int(os.getenv("VECTOR_INDEX_SCAN_ROWS", "16384"))
+_SAFE_NAME = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class VectorIndex:
+    """모델 하나의 읽기 전용 스냅샷(열 때의 행 수까지)."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / "meta.json", encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.dim = self.meta["dim"]
+        self.precision = self.meta["precision"]
+        dtype, width = code_shape(self.dim, self.precision)
+        self.rows = (path / "ids.bin").stat().st_size // 8
+        self.scales = None
+        if self.rows:
+            self.ids = np.memmap(path / "ids.bin", dtype="<i8", mode="r", shape=(self.rows,))
+            self.vectors = np.memmap(path / "vectors.bin", dtype=dtype, mode="r", shape=(self.rows, width))
+            if self.precision == "int8":
+                self.scales = np.memmap(path / "scales.bin", dtype=np.float32, mode="r", shape=(self.rows,))
+        else:
+            self.ids = np.empty(0, dtype="<i8")
+            self.vectors = np.empty((0, width), dtype=dtype)
+        deleted = np.fromfile(path / "deleted.bin", dtype="<i8") if (path / "deleted.bin").exists() else ()
+        self.deleted_size = len(deleted) * 8
+        # 프로세스마다 행당 1바이트
+        self.alive = ~np.isin(self.ids, deleted) if len(deleted) else None
+
+    def __len__(self) -> int:
+        return self.rows if self.alive is None else int(self.alive.sum())
+
+    def search(self, queries: Sequence[float] | np.ndarray, k: int = 10) -> List[List[Tuple[int, float]]] | List[Tuple[int, float]]:
+        """코사인 유사도 상위 ``k`` 개 ``(chunk_id, similarity)``. 질의가 2차원이면 질의마다 목록.
+
+        ``float32`` 가 아닌 단계의 유사도는 근사값이다(정확한 값은 모듈의 ``search``).
+        """
+        q = np.asarray(queries, dtype=np.float32)
+        single = q.ndim == 1
+        q = _normalize(q.reshape(-1, self.dim))
+        results: List[List[Tuple[int, float]]] = [[] for _ in range(len(q))]
+        if not self.rows or k <= 0:
+            return results[0] if single else results
+
+        cand_rows, cand_scores = [], []
+        for start in range(0, self.rows, SCAN_ROWS):
+            block = self.vectors[start:start + SCAN_ROWS]
+            scales = self.scales[start:start + SCAN_ROWS] if self.scales is not None else None
+            scores = approx_scores(q, block, scales, self.precision, self.dim)  # (질의 수, 블록 행 수)
+            if self.alive is not None:
+                scores[:, ~self.alive[start:start + len(block)]] = -np.inf
+            if scores.shape[1] > k:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+            cand_rows.append(top + start)
+            cand_scores.append(np.take_along_axis(scores, top, axis=1))
+        rows = np.concatenate(cand_rows, axis=1)
+        scores = np.concatenate(cand_scores, axis=1)
+        for i in range(len(q)):
+            order = np.lexsort((rows[i], -scores[i]))
+            seen = set()
+            for j in order:
+                if not np.isfinite(scores[i, j]):
+                    break
+                chunk_id = int(self.ids[rows[i, j]])
+                if chunk_id in seen:  # 지연 빌드와 인제스트가 겹쳐 같은 청크가 두 번 들어간 경우
+                    continue
+                seen.add(chunk_id)
+                results[i].append((chunk_id, float(scores[i, j])))
+                if len(results[i]) == k:
+                    break
+        return results[0] if single else results
+
+
+def index_path(model: str, dim: int, root: str | Path | None = None) -> Path:
+    return Path(root or VECTOR_INDEX_DIR) / f"{_SAFE_NAME.sub('_', model)}-{dim}"
+
+
+def _append(path: Path, chunk_ids: Sequence[int], vectors: np.ndarray) -> None:
+    with open(path / "meta.json", encoding="utf-8") as f:
+        meta = json.load(f)
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim != 2 or vectors.shape[1] != meta["dim"] or len(vectors) != len(chunk_ids):
+        raise ValueError("벡터 차원/개수가 색인과 맞지 않습니다")
+    codes, scales = encode(_normalize(vectors), meta["precision"])
+    if scales is not None:
+        with open(path / "scales.bin", "ab") as f:
+            f.write(scales.tobytes())
+    with open(path / "vectors.bin", "ab") as f:
+        f.write(codes.tobytes())
+    with open(path / "ids.bin", "ab") as f:  # ids 를 나중에 써야 읽는 쪽이 쓰다 만 행을 보지 않는다
+        f.write(np.asarray(chunk_ids, dtype="<i8").tobytes())
+
+
+def build_index(
+    db: Session, model: str, dim: int, root: str | Path | None = None, precision: str | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """DB 의 ``model``/``dim`` 임베딩 전체로 색인을 새로 만든다(정밀도 기본값은 모델 설정). 넣은 행 수를 반환."""
+    path = index_path(model, dim, root)
+    tmp = path.with_name(f".{path.name}.build")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"dim": dim, "precision": precision or precision_for(model)}, f)
+    (tmp / "vectors.bin").touch()
+    (tmp / "ids.bin").touch()
+    rows = 0
+    for chunk_ids, vectors in crud.iter_embeddings(db, model, dim, batch_size):
+        _append(tmp, chunk_ids, np.asarray(vectors, dtype=np.float32))
+        rows += len(chunk_ids)
+    old = path.with_name(f".{path.name}.old")
+    shutil.rmtree(old, ignore_errors=True)
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return rows
+
+
+_lock = threading.Lock()
+_loaded: Dict[Path, Tuple[Tuple[int, int, int], VectorIndex]] = {}
+
+
+def _version(path: Path) -> Tuple[int, int, int]:
+    deleted = path / "deleted.bin"
+    return (
+        (path / "meta.json").stat().st_ino,
+        (path / "ids.bin").stat().st_size,
+        deleted.stat().st_size if deleted.exists() else 0,
+    )
+
+
+def _precision(path: Path) -> Optional[str]:
+    try:
+        with open(path / "meta.json", encoding="utf-8") as f:
+            return json.load(f)["precision"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def get_vector_index(
+    db: Session, model: str, dim: int, root: str | Path | None = None, precision: str | None = None
+) -> VectorIndex:
+    """``model``/``dim`` 색인을 연다(없거나 ``precision``(기본은 모델 설정)과 다르면 DB 에서 만든다).
+    행이 늘거나 삭제가 생기면 다시 연다."""
+    path = index_path(model, dim, root)
+    precision = precision or precision_for(model)
+    try:
+        version = _version(path)
+    except OSError:
+        version = None
+    with _lock:
+        cached = _loaded.get(path)
+    if cached is not None and cached[0] == version and cached[1].precision == precision:
+        return cached[1]
+    if _precision(path) != precision:
+        with _locked(path.parent, f".{path.name}.lock"):
+            if _precision(path) != precision:
+                logger.info("building %s vector index %s", precision, path)
+                build_index(db, model, dim, root, precision)
+    version = _version(path)
+    with _lock:
+        cached = _loaded.get(path)
+        if cached is None or cached[0] != version:
+            cached = (version, VectorIndex(path))
+            _loaded[path] = cached
+        return cached[1]
+
+
+def search(
+    db: Session, model: str, vector: Sequence[float], k: int = 10,
+    rescore_factor: Optional[int] = None, root: str | Path | None = None, precision: str | None = None,
+) -> List[Tuple[int, float]]:
+    """``model`` 색인에서 ``vector`` 와 코사인 유사도 상위 ``k`` 개 ``(chunk_id, similarity)``.
+
+    양자화 단계면 근사 상위 ``k × rescore_factor`` 개를 DB 의 float32 벡터로 다시 채점한다.
+    """
+    index = get_vector_index(db, model, len(vector), root, precision)
+    if index.precision == "float32":
+        return index.search(vector, k)
+    candidates = index.search(vector, k * (rescore_factor or RESCORE_FACTOR))
+    exact = crud.get_embedding_vectors(db, [cid for cid, _ in candidates], model)
+    if not exact:
+        return []
+    ids = [cid for cid, _ in candidates if cid in exact]
+    matrix = _normalize(np.asarray([exact[cid] for cid in ids], dtype=np.float32))
+    q = _normalize(np.asarray(vector, dtype=np.float32).reshape(1, -1))[0]
+    sims = matrix @ q
+    return [(ids[i], float(sims[i])) for i in np.argsort(-sims, kind="stable")[:k]]
+
+
+def update_index(
+    db: Session,
+    model: Optional[str] = None,
+    chunk_ids: Sequence[int] = (),
+    vectors: Sequence[Sequence[float]] | np.ndarray = (),
+    deleted: Iterable[int] = (),
+    root: str | Path | None = None,
+) -> None:
+    """인제스트 경로에서 쓰는 색인 갱신(pgvector 가 있는 PostgreSQL 이면 아무것도 안 함).
+
+    아직 만들지 않은 모델 색인은 건너뛴다(첫 검색 때 DB 에서 새 행까지 포함해 만든다).
+    DB 가 원본이므로 실패해도 예외를 올리지 않고 로그만 남긴다.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return
+    try:
+        root = Path(root or VECTOR_INDEX_DIR)
+        deleted = np.fromiter(deleted, dtype="<i8")
+        if len(deleted) and root.exists():
+            for path in root.iterdir():
+                if (path / "meta.json").exists():
+                    with _locked(root, f".{path.name}.lock"), open(path / "deleted.bin", "ab") as f:
+                        f.write(deleted.tobytes())
+        if model is not None and len(chunk_ids):
+            vectors = np.asarray(vectors, dtype=np.float32)
+            path = index_path(model, vectors.shape[1], root)
+            with _locked(root, f".{path.name}.lock"):
+                if (path / "meta.json").exists():
+                    _append(path, chunk_ids, vectors)
+    except Exception:
+        logger.exception("vector index update failed; it is rebuilt by deleting %s", root)
@@ -0,0 +1,174 @@
+"""질의 → 키워드(BM25)·벡터(pgvector ANN, 그 외 DB 는 memmap 정확 검색) 검색 → reciprocal-rank fusion 으로 청크 top-k.
+
+두 검색기는 동시에 돈다: 키워드 검색은 스레드 풀에서, 벡터 검색은 질의 임베딩(외부 API 호출)과
+요청의 DB 세션을 쓰므로 요청 스레드에서 실행한다. 키워드 백엔드는 프로세스 안 memmap BM25 색인
+(``bm25``) 또는 PostgreSQL ``search_tsv``/pg_trgm 인덱스(``postgres``, 별도 세션) 중 하나다.
+융합 점수는 ``Σ weight_r / (rrf_k + rank_r)`` (rank 는 1부터)이고, 검색기별 점수·순위·지연도 함께 돌려준다.
+"""
+from __future__ import annotations
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Dict, List, Literal, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.db import crud, models
+from app.services.chunk import get_embedding
+from app.services.retrieval import vector_index
+from app.services.retrieval.keyword_index import get_keyword_index
+from app.services.retrieval.quantization import RESCORE_FACTOR, precision_for
+
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "5"))
+# HNSW 후보 리스트 크기(클수록 재현율↑ 지연↑). k 보다 작으면 k 개를 못 채울 수 있어 최소 k 로 올린다
+HNSW_EF_SEARCH = int(os.getenv("RAG_HNSW_EF_SEARCH", "40"))
+# IVFFlat 인덱스를 쓰는 경우 탐색할 리스트 수
+IVFFLAT_PROBES = int(os.getenv("RAG_IVFFLAT_PROBES", "10"))
+# 하이브리드일 때 검색기마다 융합에 넘기는 후보 수(최소 k)
+RAG_CANDIDATES = int(os.getenv("RAG_CANDIDATES", "50"))
+RRF_K = int(os.getenv("RAG_RRF_K", "60"))
+DEFAULT_WEIGHTS = {
+    "keyword": float(os.getenv("RAG_KEYWORD_WEIGHT", "1.0")),
+    "vector": float(os.getenv("RAG_VECTOR_WEIGHT", "1.0")),
+}
+
+# "bm25"(scripts/rebuild_index.py 로 만든 색인) | "postgres"(0006_chunks_keyword_search, PostgreSQL 에서만)
+KEYWORD_BACKEND = os.getenv("RAG_KEYWORD_BACKEND", "bm25")
+# postgres 백엔드에서 tsvector 점수에 더할 pg_trgm word_similarity 가중치(0 이면 trigram 후보 안 씀)
+TRIGRAM_WEIGHT = float(os.getenv("RAG_TRIGRAM_WEIGHT", "0.3"))
+
+SearchMode = Literal["hybrid", "keyword", "vector"]
+KeywordBackend = Literal["bm25", "postgres"]
+
+_executor = ThreadPoolExecutor(max_workers=int(os.getenv("RAG_SEARCH_THREADS", "4")), thread_name_prefix="keyword")
+
+
+@dataclass
+class SearchHit:
+    chunk: models.Chunk
+    score: float                                            # 융합 점수(단일 검색기면 그 검색기 점수)
+    scores: Dict[str, float] = field(default_factory=dict)  # 검색기별 점수(BM25/ts_rank_cd, 코사인 유사도)
+    ranks: Dict[str, int] = field(default_factory=dict)     # 검색기별 순위(1부터)
+
+
+@dataclass
+class SearchResult:
+    model: Optional[str]            # 질의 임베딩 모델(벡터 검색을 안 했으면 None)
+    hits: List[SearchHit]
+    latency_ms: Dict[str, float]
+    keyword_backend: Optional[str]  # 실제로 쓴 키워드 백엔드(키워드 검색을 안 했으면 None)
+
+
+def reciprocal_rank_fusion(
+    rankings: Mapping[str, Sequence[int]],
+    weights: Mapping[str, float],
+    rrf_k: int = RRF_K,
+) -> List[Tuple[int, float]]:
+    """검색기별 id 순위 목록을 RRF 로 합쳐 ``(id, 점수)`` 를 점수 내림차순으로(동점은 먼저 나온 순)."""
+    fused: Dict[int, float] = {}
+    for name, ids in rankings.items():
+        weight = weights.get(name, 0.0)
+        for rank, item in enumerate(ids, start=1):
+            fused[item] = fused.get(item, 0.0) + weight / (rrf_k + rank)
+    return sorted(fused.items(), key=lambda kv: -kv[1])
+
+
+def _keyword_search(
+    query: str, depth: int, backend: KeywordBackend, bind: Engine
+) -> Tuple[List[Tuple[int, float]], float]:
+    t0 = time.perf_counter()
+    if backend == "postgres":
+        with Session(bind=bind) as db:  # 요청 세션은 다른 스레드와 나눠 쓸 수 없다
+            hits = crud.keyword_search_chunks(db, query, depth, TRIGRAM_WEIGHT)
+    else:
+        index = get_keyword_index()
+        hits = index.search(query, depth) if index is not None else []
+    return hits, (time.perf_counter() - t0) * 1000
+
+
+def search_chunks(
+    db: Session,
+    query: str,
+    k: Optional[int] = None,
+    mode: SearchMode = "hybrid",
+    weights: Optional[Mapping[str, float]] = None,
+    rrf_k: Optional[int] = None,
+    ef_search: Optional[int] = None,
+    probes: Optional[int] = None,
+    keyword_backend: Optional[KeywordBackend] = None,
+) -> SearchResult:
+    """``mode`` 의 검색기를 동시에 돌려 청크 top-``k`` 를 돌려준다(가중치 0 인 검색기는 건너뜀).
+
+    ``postgres`` 키워드 백엔드는 PostgreSQL 이 아니면 ``bm25`` 로 대신한다.
+    """
+    started = time.perf_counter()
+    k = k or RAG_TOP_K
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    use = [name for name in ("keyword", "vector") if mode in ("hybrid", name) and weights[name] > 0]
+    depth = max(k, RAG_CANDIDATES) if len(use) > 1 else k
+    latency: Dict[str, float] = {}
+
+    backend = keyword_backend or KEYWORD_BACKEND
+    if backend == "postgres" and db.get_bind().dialect.name != "postgresql":
+        backend = "bm25"
+    pending = None
+    if "keyword" in use:
+        pending = _executor.submit(_keyword_search, query, depth, backend, db.get_bind())
+
+    model = None
+    vector_hits: List[Tuple[models.Chunk, float]] = []
+    if "vector" in use:
+        t0 = time.perf_counter()
+        vector, model = get_embedding(query)
+        if db.get_bind().dialect.name == "postgresql":
+            precision = precision_for(model)
+            # 양자화 단계는 HNSW 후보를 depth × RESCORE_FACTOR 개 뽑아 float32 로 다시 정렬
+            candidates = depth if precision == "float32" else depth * RESCORE_FACTOR
+            rows = crud.search_chunks(
+                db, vector, model, k=depth,
+                ef_search=max(ef_search or HNSW_EF_SEARCH, candidates),
+                probes=probes or IVFFLAT_PROBES,
+                precision=precision, candidates=candidates,
+            )
+            vector_hits = [(chunk, 1.0 - distance) for chunk, distance in rows]
+        else:
+            # pgvector 가 없으면 memmap 벡터 색인(처음이면 DB 임베딩으로 만든다)
+            ranked = vector_index.search(db, model, vector, depth)
+            found = crud.get_chunks(db, [cid for cid, _ in ranked])
+            vector_hits = [(found[cid], score) for cid, score in ranked if cid in found]
+        latency["vector"] = (time.perf_counter() - t0) * 1000
+
+    keyword_hits: List[Tuple[int, float]] = []
+    if pending is not None:
+        keyword_hits, latency["keyword"] = pending.result()
+
+    t0 = time.perf_counter()
+    chunks = {chunk.id: chunk for chunk, _ in vector_hits}
+    chunks.update(crud.get_chunks(db, [cid for cid, _ in keyword_hits if cid not in chunks]))
+    per_retriever = {
+        "keyword": [(cid, score) for cid, score in keyword_hits if cid in chunks],  # 색인 후 지워진 청크 제외
+        "vector": [(chunk.id, score) for chunk, score in vector_hits],
+    }
+    scores: Dict[int, Dict[str, float]] = {}
+    ranks: Dict[int, Dict[str, int]] = {}
+    for name, ranked in per_retriever.items():
+        for rank, (cid, score) in enumerate(ranked, start=1):
+            scores.setdefault(cid, {})[name] = score
+            ranks.setdefault(cid, {})[name] = rank
+
+    if len(use) > 1:
+        ordered = reciprocal_rank_fusion(
+            {name: [cid for cid, _ in ranked] for name, ranked in per_retriever.items()},
+            weights, RRF_K if rrf_k is None else rrf_k,
+        )
+    else:
+        ordered = per_retriever[use[0]] if use else []
+    hits = [SearchHit(chunks[cid], score, scores[cid], ranks[cid]) for cid, score in ordered[:k]]
+    latency["fusion"] = (time.perf_counter() - t0) * 1000
+    latency["total"] = (time.perf_counter() - started) * 1000
+    return SearchResult(
+        model=model, hits=hits, latency_ms=latency, keyword_backend=backend if pending is not None else None,
+    )
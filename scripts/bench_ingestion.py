@@ -0,0 +1,495 @@
+"""인제스트 단계별 간단 벤치마크.
+
+    python scripts/bench_ingestion.py db-insert --rows 2000
+    python scripts/bench_ingestion.py split test.pdf --batch-size 10
+    python scripts/bench_ingestion.py figures --pages 24 --workers 1 2 4 8
+    python scripts/bench_ingestion.py search --rows 20000 --queries 200 --ef-search 40
+    python scripts/bench_ingestion.py vector-index --rows 100000 --dim 1536 --batch 8
+    DATABASE_URL=postgresql+psycopg://... python scripts/bench_ingestion.py quantization --model openai --factors 2 4 8
+    python scripts/bench_ingestion.py keyword --docs 200000 --deltas 16
+    DATABASE_URL=postgresql+psycopg://... python scripts/bench_ingestion.py keyword-compare --queries 200
+    DATABASE_URL=postgresql+psycopg://... python scripts/bench_ingestion.py db-insert
+
+``DATABASE_URL`` 이 없으면 임시 SQLite 파일을 사용한다(PostgreSQL 은 마이그레이션된 스키마 필요).
+"""
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from app.db import crud  # noqa: E402
+from app.services.ingestion.preprocess.split_pdf import iter_pdf_parts  # noqa: E402
+from app.services.ingestion.preprocess.extract_assets import PDFImageProcessor  # noqa: E402
+from app.schemas.db import ChunkCreate, EmbeddingCreate  # noqa: E402
+
+SQLITE_DDL = (
+    """
+    CREATE TABLE IF NOT EXISTS chunks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        document_id INTEGER NOT NULL,
+        content TEXT NOT NULL,
+        chunk_order INTEGER NOT NULL,
+        chunk_meta JSON
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS embeddings (
+        chunk_id INTEGER PRIMARY KEY,
+        vector TEXT NOT NULL,
+        model VARCHAR NOT NULL,
+        dim INTEGER NOT NULL
+    )
+    """,
+)
+
+
+def _session_factory(url: str | None):
+    if url is None:
+        url = f"sqlite:///{Path(tempfile.mkdtemp()) / 'bench.db'}"
+    engine = create_engine(url)
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            for ddl in SQLITE_DDL:
+                conn.exec_driver_sql(ddl)
+    return engine, sessionmaker(bind=engine, autoflush=False)
+
+
+def _rows(document_id: int, n: int, dim: int):
+    chunks = [
+        ChunkCreate(document_id=document_id, content=f"chunk {i} " * 40, chunk_order=i)
+        for i in range(1, n + 1)
+    ]
+    vectors = [[(i % 97) / 97.0] * dim for i in range(n)]
+    return chunks, vectors
+
+
+def bench_db_insert(args: argparse.Namespace) -> None:
+    engine, Session = _session_factory(os.getenv("DATABASE_URL"))
+    document_id = args.document_id
+
+    chunks, vectors = _rows(document_id, args.rows, args.dim)
+    with Session() as db:
+        t0 = time.perf_counter()
+        for chunk, vec in zip(chunks, vectors):
+            row = crud.create_chunk(db, chunk)
+            crud.create_embedding(
+                db, EmbeddingCreate(chunk_id=row.id, vector=vec, model="bench", dim=len(vec))
+            )
+        per_row = time.perf_counter() - t0
+
+    with Session() as db:
+        t0 = time.perf_counter()
+        crud.bulk_create_chunks_with_embeddings(db, chunks, vectors, model="bench")
+        bulk = time.perf_counter() - t0
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM chunks WHERE document_id = :d"), {"d": document_id})
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("DELETE FROM embeddings WHERE model = 'bench'"))
+
+    print(f"[{engine.dialect.name}] rows={args.rows} dim={args.dim}")
+    print(f"  per-row create_chunk/create_embedding : {args.rows / per_row:10.0f} rows/s")
+    print(f"  bulk_create_chunks_with_embeddings    : {args.rows / bulk:10.0f} rows/s")
+    print(f"  speedup                               : {per_row / bulk:10.1f}x")
+
+
+def bench_search(args: argparse.Namespace) -> None:
+    import numpy as np
+
+    engine, Session = _session_factory(os.getenv("DATABASE_URL"))
+    rng = np.random.default_rng(0)
+    chunks, _ = _rows(args.document_id, args.rows, 1)
+    vectors = rng.standard_normal((args.rows, args.dim), dtype=np.float32)
+    with Session() as db:
+        for start in range(0, args.rows, 1000):
+            crud.bulk_create_chunks_with_embeddings(
+                db, chunks[start:start + 1000], vectors[start:start + 1000].tolist(), model=args.model
+            )
+        if engine.dialect.name == "postgresql":
+            db.execute(text("ANALYZE embeddings"))
+            db.commit()
+
+        latencies = []
+        for q in rng.standard_normal((args.queries, args.dim), dtype=np.float32):
+            t0 = time.perf_counter()
+            crud.search_chunks(db, q.tolist(), args.model, k=args.k, ef_search=args.ef_search, probes=args.probes)
+            latencies.append(time.perf_counter() - t0)
+            db.rollback()  # SET LOCAL 은 질의마다 새 트랜잭션에서
+
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM chunks WHERE document_id = :d"), {"d": args.document_id})
+        if engine.dialect.name == "sqlite":
+            conn.execute(text("DELETE FROM embeddings WHERE model = :m"), {"m": args.model})
+
+    p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+    print(f"[{engine.dialect.name}] rows={args.rows} dim={args.dim} k={args.k} ef_search={args.ef_search}")
+    print(f"  search_chunks latency : p50 {p50:8.2f} ms  p95 {p95:8.2f} ms")
+
+
+def bench_vector_index(args: argparse.Namespace) -> None:
+    """SQLite 의 memmap 벡터 색인: 빌드 시간, 정밀도 단계별 스캔 지연(단건·배치)과 재채점 없는 재현율."""
+    import numpy as np
+    from app.services.retrieval import vector_index
+
+    engine, Session = _session_factory(None)
+    rng = np.random.default_rng(0)
+    chunks, _ = _rows(1, args.rows, 1)
+    vectors = rng.standard_normal((args.rows, args.dim), dtype=np.float32)
+    queries = rng.standard_normal((args.queries, args.dim), dtype=np.float32)
+    root = Path(tempfile.mkdtemp())
+    print(f"[sqlite] rows={args.rows} dim={args.dim} k={args.k} batch={args.batch}")
+    with Session() as db:
+        for start in range(0, args.rows, 1000):
+            crud.bulk_create_chunks_with_embeddings(
+                db, chunks[start:start + 1000], vectors[start:start + 1000].tolist(), model="bench"
+            )
+        if args.db_queries:
+            t0 = time.perf_counter()
+            for q in queries[:args.db_queries]:
+                crud.search_chunks(db, q.tolist(), "bench", k=args.k)
+            db_scan = (time.perf_counter() - t0) / len(queries[:args.db_queries])
+            print(f"  crud.search_chunks (DB scan)   : {db_scan * 1000:8.2f} ms/query")
+
+        truth = None
+        for precision in args.precisions:
+            t0 = time.perf_counter()
+            vector_index.build_index(db, "bench", args.dim, root / precision, precision=precision)
+            build = time.perf_counter() - t0
+            index = vector_index.VectorIndex(vector_index.index_path("bench", args.dim, root / precision))
+            latencies = []
+            for q in queries:
+                t0 = time.perf_counter()
+                index.search(q, args.k)
+                latencies.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            found = []
+            for start in range(0, len(queries), args.batch):
+                found.extend(index.search(queries[start:start + args.batch], args.k))
+            batched = (time.perf_counter() - t0) / len(queries)
+            ids = [{cid for cid, _ in hits} for hits in found]
+            truth = truth or ids
+            recall = np.mean([len(a & b) / args.k for a, b in zip(ids, truth)])
+            p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+            size = (index.path / "vectors.bin").stat().st_size / 2 ** 20
+            print(f"  {precision:7s}: build {build:6.2f} s  {size:7.1f} MiB  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms  "
+                  f"batched {batched * 1000:7.2f} ms/query  recall@{args.k} {recall:.3f}")
+
+
+def bench_quantization(args: argparse.Namespace) -> None:
+    """코퍼스 임베딩으로 정밀도 단계 × 재채점 배수별 recall@k·지연·바이트/벡터를 잰다.
+
+    정답은 float32 전체 정확 검색이고, 질의는 저장된 벡터에 잡음을 더해 코퍼스 분포를 따르게 만든다.
+    PostgreSQL 은 ``crud.search_chunks``(0005/0007 인덱스)를, 그 외 DB 는 memmap 벡터 색인을 잰다.
+    ``DATABASE_URL`` 이 없으면 군집이 있는 합성 코퍼스를 임시 SQLite 에 만든다.
+    """
+    import numpy as np
+    from app.services.retrieval import vector_index
+    from app.services.retrieval.quantization import code_shape
+
+    url = os.getenv("DATABASE_URL")
+    engine, Session = _session_factory(url)
+    pg = engine.dialect.name == "postgresql"
+    rng = np.random.default_rng(0)
+    with Session() as db:
+        if url is None:
+            centers = rng.standard_normal((64, args.dim), dtype=np.float32)
+            vectors = centers[rng.integers(0, 64, args.rows)] + 0.7 * rng.standard_normal((args.rows, args.dim), dtype=np.float32)
+            chunks, _ = _rows(1, args.rows, 1)
+            for start in range(0, args.rows, 1000):
+                crud.bulk_create_chunks_with_embeddings(
+                    db, chunks[start:start + 1000], vectors[start:start + 1000].tolist(), model=args.model
+                )
+        ids, batches = [], []
+        for batch_ids, batch in crud.iter_embeddings(db, args.model, args.dim, 5000):
+            ids.extend(batch_ids)
+            batches.append(batch)
+        if not ids:
+            raise SystemExit(f"{args.model}/{args.dim} 임베딩이 없습니다")
+        matrix = np.concatenate(batches)
+        matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+        picks = rng.choice(len(ids), args.queries)
+        queries = matrix[picks] + args.noise / np.sqrt(args.dim) * rng.standard_normal((args.queries, args.dim))
+        truth = [{ids[j] for j in np.argsort(-(matrix @ q))[:args.k]} for q in queries]
+
+        print(f"[{engine.dialect.name}] model={args.model} rows={len(ids)} dim={args.dim} k={args.k} "
+              f"queries={args.queries} noise={args.noise}")
+        root = Path(tempfile.mkdtemp())
+        for precision in args.precisions:
+            dtype, width = code_shape(args.dim, precision)
+            for factor in (args.factors if precision != "float32" else [1]):
+                latencies, recalls = [], []
+                for q, expected in zip(queries, truth):
+                    t0 = time.perf_counter()
+                    if pg:
+                        rows = crud.search_chunks(
+                            db, q.tolist(), args.model, k=args.k, ef_search=max(args.ef_search, args.k * factor),
+                            precision=precision, candidates=args.k * factor,
+                        )
+                        found = {chunk.id for chunk, _ in rows}
+                        db.rollback()  # SET LOCAL 은 질의마다 새 트랜잭션에서
+                    else:
+                        found = {cid for cid, _ in vector_index.search(db, args.model, q, args.k, factor, root, precision)}
+                    latencies.append(time.perf_counter() - t0)
+                    recalls.append(len(found & expected) / args.k)
+                p50, p95 = np.percentile(np.asarray(latencies) * 1000, [50, 95])
+                print(f"  {precision:7s} x{factor:<3d} {dtype.itemsize * width:6d} B/vec  recall@{args.k} "
+                      f"{np.mean(recalls):.3f}  p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+        if pg:
+            sizes = db.execute(text(
+                "SELECT indexrelname, pg_relation_size(indexrelid) FROM pg_stat_user_indexes "
+                "WHERE indexrelname LIKE :pattern ORDER BY indexrelname"
+            ), {"pattern": f"ix_embeddings_ann_{args.model}_{args.dim}%"}).all()
+            for name, size in sizes:
+                print(f"  {name:40s} {size / 2 ** 20:9.1f} MiB")
+
+
+def bench_keyword(args: argparse.Namespace) -> None:
+    import numpy as np
+    from app.services.retrieval import keyword_index
+
+    rng = np.random.default_rng(0)
+    vocab = [f"단어{i}" for i in range(args.vocab)]
+    # 지프 분포로 단어를 뽑은 합성 청크
+    weights = 1.0 / np.arange(1, args.vocab + 1)
+    weights /= weights.sum()
+
+    def docs(start: int, n: int):
+        for i in range(start, start + n):
+            yield i, " ".join(vocab[j] for j in rng.choice(args.vocab, args.doc_len, p=weights))
+
+    path = Path(tempfile.mkdtemp()) / "bm25"
+    t0 = time.perf_counter()
+    keyword_index.build_index(docs(1, args.docs), path)
+    build = time.perf_counter() - t0
+
+    delta = max(args.docs // 100, 1)
+    t0 = time.perf_counter()
+    for d in range(args.deltas):
+        keyword_index.add_chunks(docs(args.docs + 1 + d * delta, delta), path)
+    keyword_index.delete_chunks(range(1, args.docs, 10), path)
+    add = (time.perf_counter() - t0) / max(args.deltas, 1)
+
+    def query_latency() -> tuple[float, float]:
+        index = keyword_index.get_keyword_index(path)
+        latencies = []
+        for _ in range(args.queries):
+            query = " ".join(vocab[j] for j in rng.choice(args.vocab, 3, p=weights))
+            t = time.perf_counter()
+            index.search(query, 10)
+            latencies.append(time.perf_counter() - t)
+        return tuple(np.percentile(np.asarray(latencies) * 1000, [50, 95]))
+
+    before = query_latency()
+    segments = len(keyword_index.get_keyword_index(path).segments)
+    t0 = time.perf_counter()
+    keyword_index.merge_segments(path, force=True)
+    merge = time.perf_counter() - t0
+    after = query_latency()
+
+    print(f"docs={args.docs} doc_len={args.doc_len} vocab={args.vocab}")
+    print(f"  full build                  : {build:8.2f} s ({args.docs / build:10.0f} docs/s)")
+    print(f"  delta segment ({delta:6d} docs) : {add * 1000:8.1f} ms")
+    print(f"  query {segments:2d} segments + tombstones: p50 {before[0]:6.2f} ms  p95 {before[1]:6.2f} ms")
+    print(f"  force merge                 : {merge:8.2f} s")
+    print(f"  query 1 segment             : p50 {after[0]:6.2f} ms  p95 {after[1]:6.2f} ms")
+
+
+def bench_keyword_compare(args: argparse.Namespace) -> None:
+    """같은 질의로 BM25 색인과 PostgreSQL tsvector(+pg_trgm) 순위를 비교한다."""
+    import random
+
+    import numpy as np
+    from app.services.retrieval import keyword_index
+    from app.services.retrieval.tokenizer import tokenize
+
+    engine, Session = _session_factory(os.getenv("DATABASE_URL"))
+    if engine.dialect.name != "postgresql":
+        raise SystemExit("keyword-compare 는 PostgreSQL(DATABASE_URL)이 필요합니다")
+    index = keyword_index.get_keyword_index()
+    if index is None:
+        raise SystemExit("BM25 색인이 없습니다(scripts/rebuild_index.py)")
+    rnd = random.Random(0)
+    with Session() as db:
+        # 임의 청크에서 색인어 몇 개를 뽑아 질의로
+        sample = db.execute(text("SELECT content FROM chunks ORDER BY random() LIMIT :n"), {"n": args.queries}).scalars()
+        queries = []
+        for content in sample:
+            terms = tokenize(content)
+            if terms:
+                queries.append(" ".join(rnd.sample(terms, min(args.terms, len(terms)))))
+
+        timings = {"bm25": [], "postgres": []}
+        overlap = []
+        for query in queries:
+            t = time.perf_counter()
+            bm25 = [cid for cid, _ in index.search(query, args.k)]
+            timings["bm25"].append(time.perf_counter() - t)
+            t = time.perf_counter()
+            pg = [cid for cid, _ in crud.keyword_search_chunks(db, query, args.k, args.trigram_weight)]
+            timings["postgres"].append(time.perf_counter() - t)
+            if bm25 or pg:
+                overlap.append(len(set(bm25) & set(pg)) / max(len(bm25), len(pg)))
+
+    print(f"[postgresql] queries={len(queries)} k={args.k} terms/query={args.terms} trigram={args.trigram_weight}")
+    for name, values in timings.items():
+        p50, p95 = np.percentile(np.asarray(values) * 1000, [50, 95])
+        print(f"  {name:8s}: p50 {p50:7.2f} ms  p95 {p95:7.2f} ms")
+    print(f"  overlap@{args.k}: {np.mean(overlap) if overlap else 0.0:.3f}")
+
+
+def bench_split(args: argparse.Namespace) -> None:
+    print(f"{args.pdf} batch_size={args.batch_size} repeat={args.repeat}")
+    for backend in ("pypdf", "pymupdf"):
+        best = float("inf")
+        total = 0
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            total = sum(len(p.data) for p in iter_pdf_parts(args.pdf, batch_size=args.batch_size, backend=backend))
+            best = min(best, time.perf_counter() - t0)
+        print(f"  {backend:8s}: {best * 1000:8.1f} ms  ({total / 1024:.0f} KiB of parts)")
+
+
+def _figure_fixture(work: Path, pages: int, figures_per_page: int) -> tuple[Path, Path]:
+    """이미지 위주 합성 PDF 와 figure 요소만 있는 레이아웃 JSON(압축이 잘 안 되는 노이즈 이미지)."""
+    import pymupdf as fitz
+    from PIL import Image
+
+    pdf_path = work / "figures.pdf"
+    doc = fitz.open()
+    for _ in range(pages):
+        page = doc.new_page()
+        img = Image.frombytes("RGB", (600, 800), os.urandom(600 * 800 * 3))
+        buf = io.BytesIO()
+        img.save(buf, format="PNG")
+        page.insert_image(page.rect, stream=buf.getvalue())
+    doc.save(pdf_path)
+    doc.close()
+
+    w, h = 612, 792
+    step = h / figures_per_page
+    box = lambda k: [  # noqa: E731
+        {"x": 20, "y": k * step + 5}, {"x": w - 20, "y": k * step + 5},
+        {"x": w - 20, "y": (k + 1) * step - 5}, {"x": 20, "y": (k + 1) * step - 5},
+    ]
+    elements = [
+        {"category": "figure", "page": p, "bounding_box": box(k), "html": "<figure><img/></figure>"}
+        for p in range(1, pages + 1) for k in range(figures_per_page)
+    ]
+    json_path = work / f"figures_0000_{pages - 1:04d}.json"
+    json_path.write_text(json.dumps({
+        "elements": elements,
+        "metadata": {"pages": [{"page": p, "width": w, "height": h} for p in range(1, pages + 1)]},
+    }), encoding="utf-8")
+    return pdf_path, json_path
+
+
+def bench_figures(args: argparse.Namespace) -> None:
+    work = Path(tempfile.mkdtemp())
+    pdf_path, json_path = _figure_fixture(work, args.pages, args.figures_per_page)
+    cores = os.cpu_count() or 1
+    print(f"pages={args.pages} figures={args.pages * args.figures_per_page} dpi={args.dpi} cores={cores}")
+    base = None
+    for workers in sorted(set(args.workers)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            out = work / f"out_{workers}"
+            t0 = time.perf_counter()
+            PDFImageProcessor(str(pdf_path), json_files=[str(json_path)], output_folder=str(out),
+                              dpi=args.dpi, workers=workers).extract_images()
+            best = min(best, time.perf_counter() - t0)
+        base = base or best
+        print(f"  workers={workers:2d}: {best:7.2f} s  speedup {base / best:4.1f}x  "
+              f"(efficiency {base / best / min(workers, cores):4.0%})")
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p = sub.add_parser("db-insert", help="청크+임베딩 저장 rows/s (건별 vs 벌크)")
+    p.add_argument("--rows", type=int, default=2000)
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--document-id", type=int, default=1, help="PostgreSQL 에서는 존재하는 documents.id")
+    p.set_defaults(func=bench_db_insert)
+
+    p = sub.add_parser("search", help="crud.search_chunks 지연 p50/p95 (PostgreSQL 은 모델별 HNSW 인덱스)")
+    p.add_argument("--rows", type=int, default=20000)
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--k", type=int, default=5)
+    p.add_argument("--ef-search", type=int, default=40)
+    p.add_argument("--probes", type=int, default=10)
+    p.add_argument("--model", default="openai", help="PostgreSQL 에서는 RAG_ANN_MODELS 로 0005 마이그레이션이 인덱스를 만든 모델")
+    p.add_argument("--document-id", type=int, default=1, help="PostgreSQL 에서는 존재하는 documents.id")
+    p.set_defaults(func=bench_search)
+
+    p = sub.add_parser("vector-index", help="memmap 벡터 색인(SQLite) 빌드·질의 지연과 float16 재현율")
+    p.add_argument("--rows", type=int, default=100000)
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--db-queries", type=int, default=5, help="비교용 DB 전체 스캔 질의 수")
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--batch", type=int, default=8, help="한 번에 곱하는 질의 수")
+    p.add_argument("--precisions", nargs="+", default=["float32", "float16", "int8", "binary"])
+    p.set_defaults(func=bench_vector_index)
+
+    p = sub.add_parser("quantization", help="정밀도 단계(float32/float16/int8/binary)별 재현율·지연 트레이드오프")
+    p.add_argument("--model", default="openai")
+    p.add_argument("--dim", type=int, default=1536)
+    p.add_argument("--rows", type=int, default=20000, help="DATABASE_URL 이 없을 때 합성 코퍼스 크기")
+    p.add_argument("--queries", type=int, default=100)
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--noise", type=float, default=0.5, help="질의 = 저장 벡터 + 이 크기의 잡음(단위 벡터 기준)")
+    p.add_argument("--precisions", nargs="+", default=["float32", "float16", "int8", "binary"])
+    p.add_argument("--factors", type=int, nargs="+", default=[1, 2, 4, 8], help="재채점 후보 배수(k × factor)")
+    p.add_argument("--ef-search", type=int, default=40)
+    p.set_defaults(func=bench_quantization)
+
+    p = sub.add_parser("keyword", help="키워드 색인 빌드/델타 추가/병합 시간과 질의 지연")
+    p.add_argument("--docs", type=int, default=200000)
+    p.add_argument("--doc-len", type=int, default=120)
+    p.add_argument("--vocab", type=int, default=50000)
+    p.add_argument("--deltas", type=int, default=16)
+    p.add_argument("--queries", type=int, default=200)
+    p.set_defaults(func=bench_keyword)
+
+    p = sub.add_parser("keyword-compare", help="BM25 색인 vs PostgreSQL tsvector/pg_trgm: 지연과 top-k 겹침")
+    p.add_argument("--queries", type=int, default=200)
+    p.add_argument("--terms", type=int, default=3, help="질의당 색인어 수")
+    p.add_argument("--k", type=int, default=10)
+    p.add_argument("--trigram-weight", type=float, default=0.3)
+    p.set_defaults(func=bench_keyword_compare)
+
+    p = sub.add_parser("split", help="메모리 분할 백엔드 비교(pypdf vs PyMuPDF insert_pdf)")
+    p.add_argument("pdf", type=Path, nargs="?", default=ROOT / "test.pdf")
+    p.add_argument("--batch-size", type=int, default=10)
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=bench_split)
+
+    p = sub.add_parser("figures", help="figure 렌더/PNG 인코딩: 프로세스 수별 속도(코어 대비 speedup)")
+    p.add_argument("--pages", type=int, default=24)
+    p.add_argument("--figures-per-page", type=int, default=2)
+    p.add_argument("--dpi", type=int, default=300)
+    p.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    p.add_argument("--repeat", type=int, default=1)
+    p.set_defaults(func=bench_figures)
+
+    args = parser.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
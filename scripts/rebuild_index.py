@@ -0,0 +1,74 @@
+"""``chunks`` 전체로 키워드(BM25) 색인을 다시 만들거나 세그먼트를 병합한다.
+
+    python scripts/rebuild_index.py
+    python scripts/rebuild_index.py --path file/index/bm25 --batch-size 5000
+    python scripts/rebuild_index.py --merge          # 병합 정책에 맞는 세그먼트만
+    python scripts/rebuild_index.py --merge --force  # 전부 하나로 합치고 툼스톤 정리
+    python scripts/rebuild_index.py --pg-backfill    # PostgreSQL chunks.search_text 빈 행 채우기(0006 이후)
+    python scripts/rebuild_index.py --vectors openai:1536  # pgvector 없는 DB 의 memmap 벡터 색인 재생성
+
+``DATABASE_URL`` 의 DB 를 읽고, 색인 위치는 기본 ``KEYWORD_INDEX_DIR``.
+실행 중인 서버는 다음 검색 때 바뀐 매니페스트를 알아채고 새로 연다.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from app.services.retrieval.keyword_index import (  # noqa: E402
+    KEYWORD_INDEX_DIR, build_index, get_keyword_index, merge_segments,
+)
+from app.services.retrieval.tokenizer import tokenizer_name  # noqa: E402
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--path", type=Path, default=KEYWORD_INDEX_DIR)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--merge", action="store_true", help="DB 를 읽지 않고 기존 세그먼트만 병합")
+    parser.add_argument("--force", action="store_true", help="--merge 와 함께: 모든 세그먼트를 하나로")
+    parser.add_argument("--pg-backfill", action="store_true",
+                        help="BM25 색인 대신 chunks.search_text(→ search_tsv) 가 빈 행을 채움")
+    parser.add_argument("--vectors", metavar="MODEL:DIM",
+                        help="BM25 색인 대신 MODEL/DIM 벡터 색인을 VECTOR_INDEX_DIR 에 다시 만듦(삭제분 정리)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    if args.merge:
+        merged = merge_segments(args.path, force=args.force)
+        index = get_keyword_index(args.path)
+        segments = len(index.segments) if index is not None else 0
+        print(f"{merged} merges → {segments} segments in {time.perf_counter() - t0:.1f}s")
+        return
+
+    from app.db import crud
+    from app.db.session import SessionLocal
+
+    if args.pg_backfill:
+        with SessionLocal() as db:
+            count = crud.backfill_search_text(db, args.batch_size)
+        print(f"{count} chunks tokenized ({tokenizer_name()}) in {time.perf_counter() - t0:.1f}s")
+        return
+
+    if args.vectors:
+        from app.services.retrieval import vector_index
+
+        model, _, dim = args.vectors.rpartition(":")
+        with SessionLocal() as db:
+            count = vector_index.build_index(db, model, int(dim), batch_size=args.batch_size)
+        print(f"{count} vectors → {vector_index.index_path(model, int(dim))} in {time.perf_counter() - t0:.1f}s")
+        return
+
+    with SessionLocal() as db:
+        count = build_index(crud.iter_chunk_contents(db, args.batch_size), args.path)
+    print(f"{count} chunks indexed ({tokenizer_name()}) → {args.path} in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 import os
 import sys
+import tempfile
 from pathlib import Path
 
 # 프로젝트 루트를 모듈 탐색 경로에 추가
@@ -10,3 +11,8 @@ if str(ROOT) not in sys.path:
 # pytest 실행 시 전역 적용
 os.environ["DEBUG"] = "true"
 os.environ["UPLOAD_FOLDER"] = "./tmp"
+# 임베딩/레이아웃 캐시, 키워드·벡터 색인은 테스트 실행마다 빈 임시 디렉터리 사용
+os.environ["EMBEDDING_CACHE_DIR"] = tempfile.mkdtemp(prefix="emb_cache_")
+os.environ["LAYOUT_CACHE_DIR"] = tempfile.mkdtemp(prefix="layout_cache_")
+os.environ["KEYWORD_INDEX_DIR"] = tempfile.mkdtemp(prefix="keyword_index_")
+os.environ["VECTOR_INDEX_DIR"] = tempfile.mkdtemp(prefix="vector_index_")
@@ -20,3 +20,122 @@ def test_analyzer_mock(monkeypatch, tmp_path: Path):
     assert Path(out).exists()
     data = json.loads(Path(out).read_text(encoding="utf-8"))
     assert "elements" in data
+
+
+def test_async_analyzer_retries_and_keeps_order(tmp_path: Path):
+    import asyncio
+    import threading
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from app.services.ingestion.preprocess.analyzer_upstage import AsyncLayoutAnalyzer
+    from app.services.ingestion.preprocess.layout_cache import LayoutCache
+
+    seen = {"requests": 0, "throttled": 0}
+    lock = threading.Lock()
+
+    class StandIn(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            with lock:
+                seen["requests"] += 1
+                throttle = seen["throttled"] < 2
+                if throttle:
+                    seen["throttled"] += 1
+            if throttle:
+                self.send_response(429)
+                self.send_header("Retry-After", "0")
+                self.end_headers()
+                return
+            # 업로드한 파일 이름(part_N)을 결과에 담아 순서를 검증
+            name = body.split(b'filename="')[1].split(b'"')[0].decode()
+            payload = json.dumps({"elements": [], "metadata": {"pages": []}, "name": name}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, *a):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StandIn)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        parts = []
+        for i in range(5):
+            p = tmp_path / f"part_{i}.pdf"
+            p.write_bytes(f"%PDF-1.4 {i}".encode())
+            parts.append(p)
+        analyzer = AsyncLayoutAnalyzer(
+            "x", concurrency=3, backoff_base=0.01, url=f"http://127.0.0.1:{server.server_port}/",
+            cache=LayoutCache(tmp_path / "cache"),
+        )
+        outs = asyncio.run(analyzer.analyze_many(parts))
+        # 같은 바이트·옵션은 캐시에서 바로 materialize, use_cache=False 면 다시 요청
+        for o in outs:
+            Path(o).unlink()
+        again = asyncio.run(analyzer.analyze_many(parts))
+        assert all(Path(o).exists() for o in again)
+        assert seen["requests"] == len(parts) + 2
+        asyncio.run(analyzer.analyze_many(parts[:1], use_cache=False))
+    finally:
+        server.shutdown()
+
+    assert [Path(o).stem for o in outs] == [p.stem for p in parts]
+    assert [json.loads(Path(o).read_text(encoding="utf-8"))["name"] for o in outs] == [p.name for p in parts]
+    assert seen["requests"] == len(parts) + 3
+
+
+def test_layout_cache_evicts_oldest(tmp_path: Path):
+    import os
+    from app.services.ingestion.preprocess.layout_cache import LayoutCache, layout_cache_key
+    cache = LayoutCache(tmp_path, max_bytes=130)
+    k1 = layout_cache_key(b"a", {"ocr": "false"})
+    k2 = layout_cache_key(b"a", {"ocr": "true"})
+    assert k1 != k2
+    cache.put(k1, {"elements": ["x" * 40]})
+    os.utime(tmp_path / f"{k1}.art", (0, 0))
+    cache.put(k2, {"elements": ["y" * 40]})
+    cache.put(layout_cache_key(b"b", {}), {"elements": ["z" * 40]})
+    assert cache.get(k1) is None
+    assert cache.get(k2) == {"elements": ["y" * 40]}
+
+
+def test_analyzer_accepts_in_memory_part(monkeypatch, tmp_path: Path):
+    import requests
+    from app.services.ingestion.preprocess.split_pdf import PdfPart
+    sent = {}
+
+    def fake_post(url, headers=None, data=None, files=None, timeout=None):
+        sent["name"], sent["data"] = files["document"]
+        return DummyResp({"elements": [], "metadata": {"pages": []}})
+    monkeypatch.setattr(requests, "post", fake_post)
+
+    part = PdfPart(name="doc_0000_0004", start=0, end=4, data=b"%PDF-1.4 in-memory")
+    out = LayoutAnalyzer(api_key="x").analyze(part, use_cache=False, out_dir=tmp_path)
+    assert Path(out) == tmp_path / "doc_0000_0004.json"
+    assert sent == {"name": "doc_0000_0004.pdf", "data": b"%PDF-1.4 in-memory"}
+
+
+def test_split_parts_hit_layout_cache_on_rerun(monkeypatch, tmp_path: Path):
+    import requests
+    from app.services.ingestion.preprocess.layout_cache import LayoutCache
+    from app.services.ingestion.preprocess.split_pdf import iter_pdf_parts
+    calls = []
+
+    def fake_post(url, headers=None, data=None, files=None, timeout=None):
+        calls.append(files["document"][0])
+        return DummyResp({"elements": [], "metadata": {"pages": []}})
+    monkeypatch.setattr(requests, "post", fake_post)
+
+    src = Path(__file__).resolve().parents[2] / "test.pdf"
+    analyzer = LayoutAnalyzer(api_key="x")
+    analyzer.cache = LayoutCache(tmp_path / "cache")
+    for backend in ("pymupdf", "pypdf"):
+        calls.clear()
+        # 같은 PDF 를 두 번 분할하면 파트 바이트가 같아 두 번째 분석은 캐시에 적중
+        first = next(iter_pdf_parts(src, batch_size=10, backend=backend))
+        second = next(iter_pdf_parts(src, batch_size=10, backend=backend))
+        assert first.data == second.data
+        analyzer.analyze(first, out_dir=tmp_path)
+        analyzer.analyze(second, out_dir=tmp_path)
+        assert calls == ["test_0000_0009.pdf"]
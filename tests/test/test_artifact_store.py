@@ -0,0 +1,80 @@
+import json
+import time
+
+import pytest
+
+from app.services.ingestion.preprocess import artifact_store
+from app.services.ingestion.preprocess.artifact_store import (
+    dump, export_json, load, load_blocks, load_embeddings, save_blocks, save_embeddings,
+)
+
+
+def _blocks(n):
+    blocks = []
+    for i in range(n):
+        kind = ("text", "table", "figure")[i % 3]
+        b = {"block_type": kind, "page_num": 1 + i // 20, "html": f"<p>문단 {i}</p>"}
+        if kind == "text":
+            b["text"] = f"문단 {i} " * 10
+        if kind == "figure":
+            b["caption"] = f"그림 {i}"
+            b["coords"] = {"x1": 0.1, "y1": 0.2, "x2": 0.5 + i / 1e6, "y2": 0.9}
+        blocks.append(b)
+    return blocks
+
+
+def test_blocks_round_trip_and_json_export(tmp_path):
+    blocks = _blocks(30)
+    path = tmp_path / "doc.blocks.art"
+    save_blocks(path, blocks)
+    assert path.read_bytes()[:4] == artifact_store.MAGIC
+    assert load_blocks(path) == blocks
+    exported = export_json(path)
+    assert exported.endswith("doc.blocks.json")
+    with open(exported, encoding="utf-8") as f:
+        assert json.load(f) == blocks
+
+
+def test_default_codec_is_binary(tmp_path):
+    # ormsgpack 은 requirements.txt 에 고정되어 있으므로 JSON 으로 떨어지면 안 된다
+    assert artifact_store.DEFAULT_CODEC == "msgpack"
+    path = tmp_path / "doc.blocks.art"
+    save_blocks(path, _blocks(3))
+    header = artifact_store._HEADER.unpack(path.read_bytes()[:artifact_store._HEADER.size])
+    assert header[2] == artifact_store._CODECS["msgpack"]
+    assert load_blocks(path) == _blocks(3)
+
+
+def test_embeddings_and_objects_round_trip(tmp_path):
+    groups = {"documents": [[[0.1, -2.5], [3.0, 1e-9]], []], "md": [[[0.5, 0.25]]]}
+    save_embeddings(tmp_path / "e.art", groups)
+    assert load_embeddings(tmp_path / "e.art") == groups
+
+    dump(tmp_path / "c.art", {"documents": [{"start": 0, "pieces": ["가"]}], "md": []})
+    assert load(tmp_path / "c.art")["documents"][0]["pieces"] == ["가"]
+    with pytest.raises(ValueError):
+        load_blocks(tmp_path / "c.art")
+
+
+def test_rejects_foreign_or_newer_files(tmp_path):
+    (tmp_path / "old.art").write_text("[]", encoding="utf-8")
+    with pytest.raises(ValueError):
+        load(tmp_path / "old.art")
+
+    path = tmp_path / "new.art"
+    dump(path, {"a": 1})
+    data = bytearray(path.read_bytes())
+    data[4:6] = (artifact_store.SCHEMA_VERSION + 1).to_bytes(2, "little")
+    path.write_bytes(bytes(data))
+    with pytest.raises(ValueError, match="스키마"):
+        load(path)
+
+
+def test_thousand_page_blocks_reload_fast(tmp_path):
+    blocks = _blocks(20000)  # 1,000 페이지 × 20 블록
+    path = tmp_path / "big.blocks.art"
+    save_blocks(path, blocks)
+    t0 = time.perf_counter()
+    loaded = load_blocks(path)
+    assert time.perf_counter() - t0 < 1.0
+    assert len(loaded) == 20000 and loaded[-1] == blocks[-1]
@@ -9,4 +9,48 @@ def test_chunk_text_splits_and_orders():
     assert chunks[1]["order"] == 2
     assert chunks[2]["order"] == 3
     assert chunks[0]["text"] == "A" * 500
-    assert chunks[-1]["text"] == "A" * 200
\ No newline at end of file
+    assert chunks[-1]["text"] == "A" * 200
+
+def _blocks():
+    table = "<table><tr><th>항목</th><th>값</th></tr>" + "".join(
+        f"<tr><td>행{i}</td><td>{i}</td></tr>" for i in range(60)
+    ) + "</table>"
+    return [
+        {"block_type": "text", "page_num": 1, "html": "<h1>개요</h1>"},
+        {"block_type": "text", "page_num": 1, "html": "<p>" + "가나다라 " * 20 + "</p>"},
+        {"block_type": "text", "page_num": 1, "html": "<p>" + "마바사 " * 20 + "</p>"},
+        {"block_type": "text", "page_num": 2, "html": "<h2>표</h2>"},
+        {"block_type": "table", "page_num": 2, "html": table},
+        {"block_type": "figure", "page_num": 3, "html": "<figure><img src='page_3_figure_1.png' alt='차트'/></figure>",
+         "caption": "그림 1"},
+    ]
+
+
+def test_chunk_blocks_packs_whole_blocks_within_budget():
+    from app.services.ingestion.chunking import chunk_blocks, count_tokens
+
+    chunks = chunk_blocks(_blocks(), max_tokens=120)
+    assert all(c["tokens"] <= 120 and count_tokens(c["text"]) <= 125 for c in chunks)
+    # 제목은 뒤따르는 본문과 같은 청크, 제목에서 새 청크 시작
+    assert chunks[0]["text"].startswith("# 개요") and chunks[0]["block_ids"] == [0, 1]
+    assert chunks[1]["block_ids"] == [2]
+    assert chunks[2]["text"].startswith("## 표\n\n| 항목 | 값 |")
+    # 큰 표는 행 단위로 나누고 조각마다 헤더 반복
+    table_chunks = [c for c in chunks if 4 in c["block_ids"]]
+    assert len(table_chunks) > 1
+    assert all("| 항목 | 값 |\n| --- | --- |" in c["text"] for c in table_chunks)
+    assert sum(c["text"].count("| 행") for c in table_chunks) == 60
+    # figure 는 이미지 경로 없이 alt/캡션만
+    assert chunks[-1]["pages"][-1] == 3 and "png" not in chunks[-1]["text"]
+    assert "차트" in chunks[-1]["text"] and "그림 1" in chunks[-1]["text"]
+
+
+def test_chunk_blocks_has_no_overlap_and_keeps_ids():
+    from app.services.ingestion.chunking import block_text, chunk_blocks, count_tokens
+
+    blocks = [{"block_type": "text", "page_num": 1 + i // 2, "html": f"<p>{'문장입니다. ' * 10}{i}</p>"}
+              for i in range(40)]
+    chunks = chunk_blocks(blocks, max_tokens=200, first_block_id=100)
+    assert [i for c in chunks for i in c["block_ids"]] == list(range(100, 140))
+    assert sum(c["tokens"] for c in chunks) == sum(count_tokens(block_text(b)) for b in blocks)
+    assert chunks[0]["pages"] == [1, 2]
@@ -0,0 +1,25 @@
+from pathlib import Path
+from app.services.ingestion.preprocess.classify_pages import classify_pages, native_text_blocks
+from app.services.ingestion.preprocess.split_pdf import page_ranges
+
+PDF = Path(__file__).resolve().parents[2] / "test.pdf"
+
+
+def test_classify_pages_flags_image_and_table_pages():
+    profiles = classify_pages(PDF)
+    assert len(profiles) == 23
+    by_page = {p["page_num"]: p for p in profiles}
+    assert by_page[1]["needs_layout"] and by_page[1]["reason"] == "images"
+    assert not by_page[2]["needs_layout"]
+    assert any(not p["needs_layout"] for p in profiles)
+
+
+def test_native_text_blocks_shape():
+    blocks = native_text_blocks(PDF, [2])
+    assert blocks
+    assert all(b["block_type"] == "text" and b["page_num"] == 2 for b in blocks)
+    assert all(b["html"].startswith("<p") and b["text"] for b in blocks)
+
+
+def test_page_ranges_groups_contiguous_pages():
+    assert page_ranges([0, 1, 2, 5, 6, 9], batch_size=2) == [(0, 1), (2, 2), (5, 6), (9, 9)]
@@ -0,0 +1,107 @@
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import crud
+from app.schemas.db import ChunkCreate
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                document_id INTEGER NOT NULL,
+                content TEXT NOT NULL,
+                chunk_order INTEGER NOT NULL,
+                chunk_meta JSON
+            )
+            """
+        )
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE embeddings (
+                chunk_id INTEGER PRIMARY KEY,
+                vector TEXT NOT NULL,
+                model VARCHAR NOT NULL,
+                dim INTEGER NOT NULL
+            )
+            """
+        )
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def test_bulk_create_chunks_with_embeddings(tmp_path):
+    db = _session(tmp_path)
+    chunks = [ChunkCreate(document_id=1, content=f"c{i}", chunk_order=i) for i in range(1, 6)]
+    vectors = [[float(i), 0.5] for i in range(1, 6)]
+
+    ids = crud.bulk_create_chunks_with_embeddings(db, chunks, vectors, model="dummy")
+    assert len(ids) == 5 and ids == sorted(ids)
+
+    stored = crud.list_chunks_by_document(db, 1)
+    assert [c.id for c in stored] == ids
+    assert [c.content for c in stored] == [f"c{i}" for i in range(1, 6)]
+    rows = db.execute(text("SELECT chunk_id, dim, model FROM embeddings ORDER BY chunk_id")).all()
+    assert [tuple(r) for r in rows] == [(cid, 2, "dummy") for cid in ids]
+
+
+def test_bulk_create_rejects_vector_count_mismatch(tmp_path):
+    db = _session(tmp_path)
+    chunks = [ChunkCreate(document_id=1, content="a", chunk_order=1)]
+    with pytest.raises(ValueError):
+        crud.bulk_create_chunks_with_embeddings(db, chunks, [[1.0], [2.0]], model="dummy")
+    assert crud.list_chunks_by_document(db, 1) == []
+
+
+def test_bulk_create_rolls_back_chunks_when_embedding_insert_fails(tmp_path, monkeypatch):
+    db = _session(tmp_path)
+    chunks = [ChunkCreate(document_id=1, content=f"c{i}", chunk_order=i) for i in range(1, 4)]
+
+    def failing_insert(session, rows):
+        # 청크 INSERT 는 이미 같은 트랜잭션에서 실행된 상태
+        assert session.execute(text("SELECT count(*) FROM chunks")).scalar() == 3
+        raise RuntimeError("embedding insert failed")
+
+    monkeypatch.setattr(crud, "_insert_embedding_rows", failing_insert)
+    with pytest.raises(RuntimeError):
+        crud.bulk_create_chunks_with_embeddings(db, chunks, [[1.0, 0.0]] * 3, model="dummy")
+    assert db.execute(text("SELECT count(*) FROM chunks")).scalar() == 0
+    assert db.execute(text("SELECT count(*) FROM embeddings")).scalar() == 0
+
+
+def test_keyword_search_stmt_uses_tsvector_and_trigram_indexes():
+    from sqlalchemy.dialects import postgresql
+
+    assert crud.keyword_search_stmt("  ?! ") is None
+    sql = str(crud.keyword_search_stmt("퇴직금 기준", k=5, trigram_weight=0.3).compile(dialect=postgresql.dialect()))
+    assert "chunks.search_tsv @@ (plainto_tsquery(" in sql and "|| plainto_tsquery(" in sql
+    assert "<%% chunks.content" in sql and "word_similarity(" in sql
+    assert "ORDER BY score DESC" in sql
+    # trigram 가중치가 0 이면 tsvector 인덱스만
+    assert "<%" not in str(crud.keyword_search_stmt("퇴직금").compile(dialect=postgresql.dialect()))
+
+
+def test_vector_search_stmt_matches_quantized_index_expressions():
+    from sqlalchemy.dialects import postgresql
+
+    def sql(precision):
+        stmt = crud.vector_search_stmt([0.5, -1.0, 2.0], "openai", k=3, precision=precision, candidates=12)
+        return str(stmt.compile(dialect=postgresql.dialect()))
+
+    assert "CAST(embeddings.vector AS VECTOR(3)) <=>" in sql("float32") and " AS ann " not in sql("float32")
+    # 후보는 0007 인덱스 식으로, 최종 순서는 float32 원래 벡터로
+    assert "ORDER BY CAST(embeddings.vector AS HALFVEC(3)) <=>" in sql("float16")
+    assert sql("int8") == sql("float16")
+    binary = sql("binary")
+    assert "ORDER BY CAST(binary_quantize(CAST(embeddings.vector AS VECTOR(3))) AS BIT(3)) <~>" in binary
+    assert "CAST(ann.vector AS VECTOR(3)) <=>" in binary and "ORDER BY distance" in binary
+
+
+def test_search_text_is_only_written_on_postgres(tmp_path):
+    db = _session(tmp_path)
+    chunk = ChunkCreate(document_id=1, content="퇴직금은 평균임금의 기준", chunk_order=1)
+    assert "search_text" not in crud._chunk_row(db, chunk)  # SQLite 에는 search_tsv 가 없다
+    assert crud.search_text(chunk.content).startswith("퇴직금 ")
@@ -1,5 +1,7 @@
 import types
 
+import numpy as np
+
 from app.services.ingestion import embedding
 
 
@@ -17,6 +19,35 @@ def test_embed_text_returns_vector_and_meta(monkeypatch):
     monkeypatch.setenv("OPENAI_API_KEY", "test")
     monkeypatch.setattr(embedding, "OpenAI", DummyClient)
     vec, model, dim = embedding.embed_text("hello", model="test-model")
-    assert vec == [0.1, 0.2, 0.3]
+    # 캐시가 켜져 있으면 캐시 적중과 같은 float32 값으로 돌려준다
+    assert np.allclose(vec, [0.1, 0.2, 0.3], rtol=0, atol=1e-7)
     assert model == "test-model"
-    assert dim == 3
\ No newline at end of file
+    assert dim == 3
+
+def test_embedding_service_batches_and_keeps_order(monkeypatch):
+    calls = []
+
+    class DummyEmbeddings:
+        def create(self, model, input):
+            calls.append(list(input))
+            data = [
+                types.SimpleNamespace(index=i, embedding=[float(len(t))])
+                for i, t in enumerate(input)
+            ]
+            return types.SimpleNamespace(data=list(reversed(data)))
+
+    class DummyClient:
+        def __init__(self, api_key):
+            self.embeddings = DummyEmbeddings()
+
+    monkeypatch.setattr(embedding, "OpenAI", DummyClient)
+    service = embedding.EmbeddingService(
+        model="test-model", api_key="test", max_batch_size=3, max_batch_tokens=10, max_concurrency=2
+    )
+    texts = ["a", "bb", "ccc", "dddd", "e", "ffffff", "g"]
+    vectors = service.embed(texts)
+    assert vectors == [[float(len(t))] for t in texts]
+    # 배치 당 최대 3개, 토큰(문자 수 근사) 합 10 이하
+    assert sorted(len(c) for c in calls) == sorted(len(b) for b in service.batches(texts))
+    assert all(len(c) <= 3 for c in calls)
+    assert len(calls) < len(texts)
@@ -0,0 +1,68 @@
+import types
+
+from app.services.ingestion import embedding
+from app.services.ingestion.embedding_cache import EmbeddingCache
+
+
+def test_cache_roundtrip_and_counters(tmp_path):
+    cache = EmbeddingCache(tmp_path / "emb.sqlite3", memory_items=1)
+    assert cache.get_many("m", 0, ["a", "b"]) == [None, None]
+    cache.put_many("m", 0, ["a", "b"], [[0.5, 1.0], [2.0, 4.0]])
+
+    # 다른 프로세스(새 인스턴스)도 디스크 계층을 공유
+    other = EmbeddingCache(tmp_path / "emb.sqlite3")
+    assert other.get_many("m", 0, ["b", "a", "c"]) == [[2.0, 4.0], [0.5, 1.0], None]
+    assert other.get_many("m", 8, ["a"]) == [None]  # 차원이 다르면 다른 키
+    stats = other.stats()
+    assert stats["disk_hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["disk_size"] == 2
+
+    assert other.get_many("m", 0, ["a"]) == [[0.5, 1.0]]
+    assert other.stats()["memory_hits"] == 1
+
+
+def test_service_only_embeds_misses(tmp_path, monkeypatch):
+    calls = []
+
+    class DummyEmbeddings:
+        def create(self, model, input):
+            calls.append(list(input))
+            return types.SimpleNamespace(
+                data=[types.SimpleNamespace(index=i, embedding=[float(len(t))]) for i, t in enumerate(input)]
+            )
+
+    class DummyClient:
+        def __init__(self, api_key):
+            self.embeddings = DummyEmbeddings()
+
+    monkeypatch.setattr(embedding, "OpenAI", DummyClient)
+    service = embedding.EmbeddingService(
+        model="m", api_key="k", cache=EmbeddingCache(tmp_path / "emb.sqlite3")
+    )
+    assert service.embed(["aa", "b", "aa"]) == [[2.0], [1.0], [2.0]]
+    assert calls == [["aa", "b"]]
+    assert service.embed(["b", "ccc"]) == [[1.0], [3.0]]
+    assert calls[-1] == ["ccc"]
+    assert service.cache.stats()["hits"] == 1
+
+
+def test_miss_and_hit_return_same_float32_values(tmp_path, monkeypatch):
+    class DummyEmbeddings:
+        def create(self, model, input):
+            return types.SimpleNamespace(
+                data=[types.SimpleNamespace(index=i, embedding=[0.1, 1 / 3]) for i, _ in enumerate(input)]
+            )
+
+    class DummyClient:
+        def __init__(self, api_key):
+            self.embeddings = DummyEmbeddings()
+
+    monkeypatch.setattr(embedding, "OpenAI", DummyClient)
+    path = tmp_path / "emb.sqlite3"
+    service = embedding.EmbeddingService(model="m", api_key="k", cache=EmbeddingCache(path))
+    miss = service.embed(["a"])
+    assert service.embed(["a"]) == miss  # 메모리 계층
+    disk_hit = embedding.EmbeddingService(model="m", api_key="k", cache=EmbeddingCache(path)).embed(["a"])
+    assert disk_hit == miss
+    assert miss[0] != [0.1, 1 / 3]  # float32 로 반올림된 값
@@ -14,3 +14,86 @@ def test_extract_blocks_and_images(tmp_path: Path, monkeypatch):
     blocks, images = extract_blocks_and_images(pdf, [jp], tmp_path)
     assert isinstance(blocks, list)
     assert isinstance(images, list)
+
+
+def test_each_page_rendered_once(tmp_path: Path, monkeypatch):
+    pdf = Path(__file__).resolve().parents[2] / "test.pdf"
+    box = [{"x": 10, "y": 10}, {"x": 100, "y": 10}, {"x": 100, "y": 80}, {"x": 10, "y": 80}]
+    elements = [
+        {"category": "figure", "page": p, "bounding_box": box, "html": "<img/>"}
+        for p in (1, 1, 1, 2, 2, 3)
+    ]
+    jp = tmp_path / "part_0000_0009.json"
+    jp.write_text(json.dumps({"elements": elements, "metadata": {"pages": [
+        {"page": p, "width": 780, "height": 540} for p in (1, 2, 3)
+    ]}}), encoding="utf-8")
+
+    from PIL import Image
+    from app.services.ingestion.preprocess import extract_assets as m
+    rendered = []
+    monkeypatch.setattr(m, "_render_page", lambda doc, page, dpi=300: rendered.append(page) or Image.new("RGB", (200, 100)))
+
+    blocks, images = extract_blocks_and_images(pdf, [jp], tmp_path / "out", figure_mode="page")
+    assert rendered == [1, 2, 3]
+    assert len(images) == 6
+
+
+def test_page_render_cache_evicts(tmp_path: Path):
+    from app.services.ingestion.preprocess.extract_assets import PageRenderCache
+    pdf = Path(__file__).resolve().parents[2] / "test.pdf"
+    with PageRenderCache(pdf, dpi=20) as pages:
+        first = pages.get(1)
+        assert pages.get(1) is first
+        pages.get(2)
+        pages.evict_before(2)
+        pages.get(1)
+        assert pages.renders == 3
+        pages.max_bytes = 0  # 한도를 넘으면 현재 페이지만 유지
+        pages.get(3)
+        assert list(pages._pages) == [3]
+
+
+def test_clip_mode_matches_page_crop(tmp_path: Path):
+    from PIL import Image
+    from app.services.ingestion.preprocess.extract_assets import PageRenderCache
+    pdf = Path(__file__).resolve().parents[2] / "test.pdf"
+    nb = (0.1, 0.2, 0.6, 0.7)
+    with PageRenderCache(pdf, dpi=72) as pages:
+        pages.save_figure(1, nb, tmp_path / "clip.png", "clip")
+        pages.save_figure(1, nb, tmp_path / "page.png", "page")
+    clip, page = Image.open(tmp_path / "clip.png"), Image.open(tmp_path / "page.png")
+    assert abs(clip.width - page.width) <= 1 and abs(clip.height - page.height) <= 1
+
+
+def test_process_pool_matches_sequential(tmp_path: Path):
+    from app.services.ingestion.preprocess.extract_assets import PDFImageProcessor, _page_groups
+    pdf = Path(__file__).resolve().parents[2] / "test.pdf"
+    box = [{"x": 10, "y": 10}, {"x": 300, "y": 10}, {"x": 300, "y": 200}, {"x": 10, "y": 200}]
+    elements = [
+        {"category": "figure", "page": p, "bounding_box": box, "html": "<figure><img src='x'/></figure>"}
+        for p in (1, 1, 2, 3, 3, 4)
+    ]
+    jp = tmp_path / "doc_0000_0009.json"
+    jp.write_text(json.dumps({"elements": elements, "metadata": {"pages": [
+        {"page": p, "width": 780, "height": 540} for p in (1, 2, 3, 4)
+    ]}}), encoding="utf-8")
+
+    outputs = {}
+    for workers in (1, 2):
+        out = tmp_path / f"w{workers}"
+        PDFImageProcessor(str(pdf), json_files=[str(jp)], output_folder=str(out), dpi=30, workers=workers).extract_images()
+        outputs[workers] = (
+            {p.name: p.read_bytes() for p in out.glob("*.png")},
+            (out / "test.html").read_text(encoding="utf-8"),
+            (out / "test.md").read_text(encoding="utf-8"),
+        )
+    assert outputs[1] == outputs[2]
+    assert sorted(outputs[1][0]) == [
+        "page_1_figure_1.png", "page_1_figure_2.png", "page_2_figure_1.png",
+        "page_3_figure_1.png", "page_3_figure_2.png", "page_4_figure_1.png",
+    ]
+    assert "src=\"page_1_figure_2.png\"" in outputs[1][1]
+    assert outputs[1][2].split("\n\n")[:2] == ["![](page_1_figure_1.png)", "![](page_1_figure_2.png)"]
+
+    groups = _page_groups([(p, (0, 0, 1, 1), "") for p in (1, 1, 2, 3, 3, 4)], 3)
+    assert [[t[0] for t in g] for g in groups] == [[1, 1], [2, 3, 3], [4]]
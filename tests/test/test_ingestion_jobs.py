@@ -0,0 +1,197 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+
+@pytest.fixture(autouse=True)
+def _database_url(tmp_path, monkeypatch):
+    # app.db.session 을 import 하려면 필요(테스트는 get_db 를 바꿔 끼워 자체 SQLite 를 쓴다)
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+
+
+def _client(tmp_path):
+    from fastapi import FastAPI
+    from app.api.v1.ingestion import router as ingestion_router
+    from app.db.session import get_db
+
+    app = FastAPI()
+    app.include_router(ingestion_router, prefix="/api/v1")
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'jobs.db'}", connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE ingestion_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                status VARCHAR DEFAULT 'queued' NOT NULL,
+                payload JSON NOT NULL,
+                stages JSON,
+                result JSON,
+                error TEXT,
+                worker_id VARCHAR,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                heartbeat_at TIMESTAMP,
+                attempts INTEGER DEFAULT 0 NOT NULL
+            )
+            """
+        )
+    Session = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    return TestClient(app), Session
+
+
+def _pdf(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4 test")
+    return pdf
+
+
+def test_run_enqueues_and_worker_reports_stages(tmp_path, monkeypatch):
+    from app.db import crud
+    from app.schemas.ingestion import RunResponse
+    from app.services import pipeline
+    from app.services.ingestion import worker
+
+    client, Session = _client(tmp_path)
+    # 요청별 키는 워커에 전달되지 않으므로 받지 않는다
+    res = client.post(
+        "/api/v1/ingestion/run",
+        json={"pdf_path": str(_pdf(tmp_path)), "upstage_api_key": "secret", "batch_size": 5},
+    )
+    assert res.status_code == 400 and "UPSTAGE_API_KEY" in res.json()["detail"]
+    res = client.post("/api/v1/ingestion/run", json={"pdf_path": str(_pdf(tmp_path)), "batch_size": 5})
+    assert res.status_code == 202
+    job_id = res.json()["job_id"]
+    assert res.json()["status"] == "queued"
+
+    with Session() as db:
+        job = crud.get_job(db, job_id)
+        assert job.payload["batch_size"] == 5
+        assert "upstage_api_key" not in job.payload  # 키는 DB 에 남기지 않음
+
+    def fake_run(db, req, api_key, on_stage=None):
+        assert api_key == "env-key" and req.batch_size == 5
+        for stage in ("analyze", "embed"):
+            on_stage(stage, "running", None)
+            on_stage(stage, "done", 0.25)
+        return RunResponse(
+            parts=["doc_0000_0004.pdf"], json_paths={}, output_folder="out",
+            html_path="out/doc.html", md_path="out/doc.md", images=[],
+            chunks=["a"], embeddings=[[0.1, 0.2]], embedding_model="dummy", embedding_dim=2,
+        )
+
+    monkeypatch.setenv("UPSTAGE_API_KEY", "env-key")
+    monkeypatch.setattr(pipeline, "run_ingestion", fake_run)
+
+    with Session() as db, Session() as other:
+        claimed = crud.claim_job(db, "w1")
+        assert claimed.id == job_id and claimed.status == "running"
+        assert crud.claim_job(other, "w2") is None  # 이미 가져간 작업은 다시 가져가지 않음
+        worker.process_job(db, claimed)
+        assert worker.process_next(db, "w1") is False
+
+    body = client.get(f"/api/v1/ingestion/jobs/{job_id}").json()
+    assert body["status"] == "succeeded" and body["worker_id"] == "w1"
+    assert body["stages"]["analyze"]["status"] == "done"
+    assert body["stages"]["embed"]["seconds"] == 0.25
+    assert body["result"]["embedding_dim"] == 2 and "embeddings" not in body["result"]
+    assert client.get("/api/v1/ingestion/jobs/999").status_code == 404
+
+
+def test_failed_job_records_error_and_stage(tmp_path, monkeypatch):
+    from app.db import crud
+    from app.services import pipeline
+    from app.services.ingestion import worker
+
+    client, Session = _client(tmp_path)
+    job_id = client.post(
+        "/api/v1/ingestion/run", json={"pdf_path": str(_pdf(tmp_path))}
+    ).json()["job_id"]
+
+    def failing_run(db, req, api_key, on_stage=None):
+        on_stage("analyze", "running", None)
+        raise ValueError("예상치 못한 상태 코드: 500")
+
+    monkeypatch.setenv("UPSTAGE_API_KEY", "env-key")
+    monkeypatch.setattr(pipeline, "run_ingestion", failing_run)
+    with Session() as db:
+        assert worker.process_next(db, "w1") is True
+
+    body = client.get(f"/api/v1/ingestion/jobs/{job_id}").json()
+    assert body["status"] == "failed"
+    assert "500" in body["error"]
+    assert body["stages"]["analyze"]["status"] == "failed"
+
+
+def test_expired_lease_is_reclaimed_until_attempts_run_out(tmp_path):
+    from datetime import datetime, timedelta, timezone
+
+    from app.db import crud
+
+    client, Session = _client(tmp_path)
+    job_id = client.post("/api/v1/ingestion/run", json={"pdf_path": str(_pdf(tmp_path))}).json()["job_id"]
+
+    def stall(db, job):  # 워커가 죽어 heartbeat 가 멈춘 상태
+        job.heartbeat_at = datetime.now(timezone.utc) - timedelta(seconds=600)
+        db.commit()
+
+    with Session() as db:
+        job = crud.claim_job(db, "w1", lease_seconds=300, max_attempts=2)
+        assert job.attempts == 1
+        assert crud.claim_job(db, "w2", lease_seconds=300, max_attempts=2) is None  # 임대 중
+        assert crud.heartbeat_job(db, job_id, "w1") is True
+
+        stall(db, job)
+        again = crud.claim_job(db, "w2", lease_seconds=300, max_attempts=2)
+        assert again.id == job_id and again.worker_id == "w2" and again.attempts == 2
+        assert crud.heartbeat_job(db, job_id, "w1") is False  # 옛 워커는 임대를 잃었다
+
+        stall(db, again)
+        assert crud.claim_job(db, "w3", lease_seconds=300, max_attempts=2) is None
+
+    body = client.get(f"/api/v1/ingestion/jobs/{job_id}").json()
+    assert body["status"] == "failed" and "임대 만료" in body["error"] and body["attempts"] == 2
+
+
+def test_worker_that_lost_its_lease_cannot_overwrite_new_owner(tmp_path, monkeypatch):
+    from datetime import datetime, timedelta, timezone
+
+    from app.db import crud
+    from app.services import pipeline
+    from app.services.ingestion import worker
+
+    client, Session = _client(tmp_path)
+    job_id = client.post("/api/v1/ingestion/run", json={"pdf_path": str(_pdf(tmp_path))}).json()["job_id"]
+
+    def reclaimed_run(db, req, api_key, on_stage=None):
+        on_stage("analyze", "running", None)
+        with Session() as other:  # w1 이 멈춘 사이 w2 가 임대 만료된 작업을 가져감
+            job = other.get(type(claimed), job_id)
+            job.heartbeat_at = datetime.now(timezone.utc) - timedelta(seconds=600)
+            other.commit()
+            assert crud.claim_job(other, "w2", lease_seconds=300).worker_id == "w2"
+        on_stage("analyze", "done", 1.0)
+        raise AssertionError("임대를 잃은 뒤에는 다음 단계로 넘어가면 안 된다")
+
+    monkeypatch.setenv("UPSTAGE_API_KEY", "env-key")
+    monkeypatch.setattr(pipeline, "run_ingestion", reclaimed_run)
+    with Session() as db:
+        claimed = crud.claim_job(db, "w1", lease_seconds=300)
+        worker.process_job(db, claimed)
+        assert crud.finish_job(db, claimed, "w1", {"chunk_count": 1}) is False
+        assert crud.fail_job(db, claimed, "w1", "late") is False
+
+    body = client.get(f"/api/v1/ingestion/jobs/{job_id}").json()
+    assert body["status"] == "running" and body["worker_id"] == "w2" and body["error"] is None
+    assert body["stages"]["analyze"]["status"] == "running"  # w1 의 done 은 기록되지 않음
@@ -4,7 +4,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-def test_upload_file_returns_file_id(tmp_path):
+def test_upload_file_returns_file_id(tmp_path, monkeypatch):
     # 임시 스토리지 및 데이터베이스 설정
     storage_root = tmp_path / "ingestion_storage"
     os.environ["INGESTION_STORAGE"] = str(storage_root)
@@ -16,6 +16,12 @@ def test_upload_file_returns_file_id(tmp_path):
     from app.api.v1.ingestion import router as ingestion_router
     from app.db.session import get_db
 
+    from app.api.v1 import ingestion
+
+    # 모듈이 먼저 import 됐으면 INGESTION_STORAGE 가 반영되지 않으므로 직접 바꾼다
+    (storage_root / "uploads").mkdir(parents=True, exist_ok=True)
+    monkeypatch.setattr(ingestion, "UPLOAD_DIR", storage_root / "uploads")
+
     app = FastAPI()
     app.include_router(ingestion_router, prefix="/api/v1")
 
@@ -29,6 +35,7 @@ def test_upload_file_returns_file_id(tmp_path):
                 original_name VARCHAR NOT NULL,
                 mime_type VARCHAR NOT NULL,
                 storage_path VARCHAR NOT NULL,
+                sha256 VARCHAR(64) UNIQUE,
                 uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
             )
             """
@@ -54,3 +61,69 @@ def test_upload_file_returns_file_id(tmp_path):
     # 파일이 지정된 디렉토리에 저장되었는지도 확인
     saved_file = Path(data["path"])
     assert saved_file.exists()
+
+
+def test_reupload_returns_existing_file_and_documents(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+
+    from fastapi import FastAPI
+    from app.api.v1 import ingestion
+    from app.db.session import get_db
+
+    # 저장소의 file/ingestion/uploads 에 업로드가 쌓이지 않게
+    (tmp_path / "uploads").mkdir()
+    monkeypatch.setattr(ingestion, "UPLOAD_DIR", tmp_path / "uploads")
+
+    app = FastAPI()
+    app.include_router(ingestion.router, prefix="/api/v1")
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'dedup.db'}", connect_args={"check_same_thread": False})
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                original_name VARCHAR NOT NULL,
+                mime_type VARCHAR NOT NULL,
+                storage_path VARCHAR NOT NULL,
+                sha256 VARCHAR(64) UNIQUE,
+                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+            )
+            """
+        )
+        conn.exec_driver_sql(
+            """
+            CREATE TABLE documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                file_id INTEGER NOT NULL,
+                title VARCHAR NOT NULL,
+                doc_meta JSON,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL
+            )
+            """
+        )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+
+    body = b"%PDF-1.4 dedup " + os.urandom(16)
+    first = client.post("/api/v1/ingestion/upload", files={"file": ("manual.pdf", body, "application/pdf")}).json()
+    assert first["duplicate"] is False and first["size"] == len(body)
+    assert Path(first["path"]).read_bytes() == body
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"INSERT INTO documents (file_id, title) VALUES ({first['file_id']}, 'part')")
+
+    files_before = sorted(ingestion.UPLOAD_DIR.iterdir())
+    again = client.post("/api/v1/ingestion/upload", files={"file": ("copy.pdf", body, "application/pdf")}).json()
+    assert again["duplicate"] is True
+    assert again["file_id"] == first["file_id"] and again["sha256"] == first["sha256"]
+    assert len(again["document_ids"]) == 1
+    assert sorted(ingestion.UPLOAD_DIR.iterdir()) == files_before  # 새 파일을 남기지 않음
@@ -0,0 +1,110 @@
+import math
+from collections import Counter
+
+import numpy as np
+
+from app.services.retrieval import keyword_index, tokenizer
+from app.services.retrieval.keyword_index import build_index, get_keyword_index
+
+DOCS = [
+    (10, "퇴직금은 평균임금의 30일분을 계속근로기간 1년마다 지급한다."),
+    (11, "연차휴가는 1년간 80% 이상 출근한 근로자에게 15일을 준다."),
+    (12, "퇴직금 중간정산은 주택 구입 등 사유가 있을 때만 가능하다. 퇴직금 퇴직금"),
+    (13, "The API returns embeddings for each chunk."),
+]
+
+
+def test_regex_tokenizer_strips_particles():
+    assert tokenizer._regex_tokenize("퇴직금은 평균임금의 기준으로 API를") == ["퇴직금", "평균임금", "기준", "api"]
+    assert tokenizer._regex_tokenize("나이가 학교에서") == ["나이", "학교"]
+
+
+def _bm25(query, docs, k1=1.5, b=0.75):
+    tokenized = {cid: Counter(tokenizer.tokenize(text)) for cid, text in docs}
+    avg = sum(sum(c.values()) for c in tokenized.values()) / len(docs)
+    scores = {}
+    for cid, counts in tokenized.items():
+        dl = sum(counts.values())
+        s = 0.0
+        for term in set(tokenizer.tokenize(query)):
+            df = sum(1 for c in tokenized.values() if term in c)
+            tf = counts.get(term, 0)
+            if tf:
+                idf = math.log(1 + (len(docs) - df + 0.5) / (df + 0.5))
+                s += idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * dl / avg))
+        if s:
+            scores[cid] = s
+    return sorted(scores.items(), key=lambda kv: -kv[1])
+
+
+def test_search_matches_reference_bm25(tmp_path):
+    assert build_index(iter(DOCS), tmp_path / "bm25") == 4
+    index = get_keyword_index(tmp_path / "bm25")
+    for query in ("퇴직금 지급 기준", "근로자 연차", "embeddings API", "없는단어"):
+        got = index.search(query, k=3)
+        want = _bm25(query, DOCS)[:3]
+        assert [cid for cid, _ in got] == [cid for cid, _ in want]
+        assert all(math.isclose(g, w, rel_tol=1e-5) for (_, g), (_, w) in zip(got, want))
+    assert index.search("퇴직금", k=1)[0][0] == 12
+
+
+def test_rebuild_replaces_index_and_reloads(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_DIR", tmp_path / "bm25")
+    assert get_keyword_index() is None
+    build_index(iter(DOCS[:2]))
+    first = get_keyword_index()
+    assert get_keyword_index() is first
+    assert first.search("주택") == []
+
+    build_index(iter(DOCS))
+    second = get_keyword_index()
+    assert second is not first and len(second) == 4
+    assert [cid for cid, _ in second.search("주택")] == [12]
+    assert [p.name for p in tmp_path.iterdir()] == ["bm25"]
+
+
+def _results(index, queries=("퇴직금 지급 기준", "근로자 연차", "embeddings API", "주택")):
+    return {q: [(cid, round(score, 5)) for cid, score in index.search(q, k=5)] for q in queries}
+
+
+def test_delta_segments_tombstones_and_merge(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_index, "MERGE_FACTOR", 2)
+    monkeypatch.setattr(keyword_index, "MERGE_DELETED_RATIO", 0.9)
+    monkeypatch.setattr(keyword_index, "SEGMENT_GRACE_SECONDS", 0)
+    path = tmp_path / "bm25"
+    extra = (14, "퇴직금 지급 기한은 퇴직일로부터 14일 이내이다.")
+    build_index(iter(DOCS[:2]), path)
+    assert keyword_index.add_chunks(iter(DOCS[2:] + [extra]), path) == 3
+    keyword_index.delete_chunks([11, 14], path)
+
+    index = get_keyword_index(path)
+    assert len(index.segments) == 2 and len(index) == 3
+    assert isinstance(index.segments[0].docs, np.memmap)
+    hits = index.search("퇴직금 지급 근로자", k=5)
+    assert {cid for cid, _ in hits} == {10, 12}
+
+    # 크기 단계가 같은 두 세그먼트가 병합되면서 툼스톤 문서가 실제로 빠진다
+    assert keyword_index.merge_segments(path) == 1
+    merged = get_keyword_index(path)
+    assert len(merged.segments) == 1 and len(merged) == 3 and not len(merged.tombstones)
+    assert sorted(merged.segments[0].chunk_ids.tolist()) == [10, 12, 13]
+    assert _results(merged) == _results(get_keyword_index(_rebuilt(tmp_path, [DOCS[0], DOCS[2], DOCS[3]])))
+    # 예전 세그먼트는 유예 시간(0초)이 지나 지워진다
+    assert sorted(p.name for p in path.iterdir() if p.name.startswith("seg-")) == [merged.segments[0].name]
+
+
+def _rebuilt(tmp_path, docs):
+    build_index(iter(docs), tmp_path / "reference")
+    return tmp_path / "reference"
+
+
+def test_merge_policy_leaves_small_tier_alone(tmp_path, monkeypatch):
+    monkeypatch.setattr(keyword_index, "MERGE_FACTOR", 3)
+    path = tmp_path / "bm25"
+    for doc in DOCS[:2]:
+        keyword_index.add_chunks([doc], path)
+    assert keyword_index.merge_segments(path) == 0
+    keyword_index.add_chunks([DOCS[2]], path)
+    assert keyword_index.merge_segments(path) == 1
+    assert len(get_keyword_index(path).segments) == 1
+    assert keyword_index.merge_segments(path, force=True) == 0
@@ -0,0 +1,46 @@
+import json
+import tracemalloc
+
+from app.services.ingestion.preprocess import layout_json
+from app.services.ingestion.preprocess.layout_json import read_layout
+
+
+def _layout(n, html_size=200):
+    return {
+        "api": "2.0",
+        "elements": [
+            {"id": i, "category": "paragraph", "page": 1 + i % 3, "html": f"<p>{'가' * html_size}{i}</p>",
+             "bounding_box": [{"x": 1.5, "y": 12345678901234567890}]}
+            for i in range(n)
+        ],
+        "metadata": {"pages": [{"page": p, "width": 612, "height": 792} for p in (1, 2, 3)]},
+        "usage": {"pages": 3, "note": "}]\"{["},
+    }
+
+
+def test_read_layout_matches_json_load(tmp_path, monkeypatch):
+    monkeypatch.setattr(layout_json, "READ_SIZE", 13)  # 요소/숫자가 버퍼 경계에 걸리도록
+    data = _layout(50)
+    for name, payload, kwargs in (
+        ("upstage.json", data, {"indent": 2}),  # 원본 응답: elements 가 metadata 보다 앞
+        ("compact.json", {"metadata": data["metadata"], **data}, {"separators": (",", ":")}),
+    ):
+        path = tmp_path / name
+        path.write_text(json.dumps(payload, ensure_ascii=False, **kwargs), encoding="utf-8")
+        sizes, elements = read_layout(path)
+        assert sizes == {1: [612, 792], 2: [612, 792], 3: [612, 792]}
+        assert list(elements) == data["elements"]
+
+
+def test_read_layout_memory_is_flat(tmp_path):
+    path = tmp_path / "big.json"
+    path.write_text(json.dumps(_layout(3000, html_size=2000), ensure_ascii=False), encoding="utf-8")
+    size = path.stat().st_size
+
+    tracemalloc.start()
+    sizes, elements = read_layout(path)
+    count = sum(1 for _ in elements)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert count == 3000 and sizes
+    assert peak < size / 10
@@ -1,24 +1,52 @@
 import json
 from pathlib import Path
+from app.services import pipeline
 from app.services.ingestion import parser
 
 def test_parser_pipeline(tmp_path, monkeypatch):
     pdf = Path(__file__).resolve().parents[2] / "test.pdf"
 
     # split 목킹
-    monkeypatch.setattr(parser, "split_pdf", lambda *a, **k: [str(tmp_path / "part_0000_0009.pdf")])
+    monkeypatch.setattr(pipeline, "iter_pdf_parts", lambda *a, **k: [str(tmp_path / "part_0000_0009.pdf")])
     # analyzer 목킹
     class DummyAnalyzer:
-        def __init__(self, api_key=None): pass
+        def __init__(self, api_key=None, ocr=False): pass
         def analyze(self, p):
             j = Path(str(p).replace(".pdf",".json"))
             j.write_text(json.dumps({"elements":[],"metadata":{"pages":[]}}), encoding="utf-8")
             return str(j)
-    monkeypatch.setattr(parser, "LayoutAnalyzer", DummyAnalyzer)
+        def analyze_many(self, ps, concurrency=None, use_cache=True, out_dir=None):
+            return [self.analyze(p) for p in ps]
+    monkeypatch.setattr(pipeline, "LayoutAnalyzer", DummyAnalyzer)
     # extract 목킹
-    monkeypatch.setattr(parser, "extract_blocks_and_images", lambda **k: ([{"text":"t","block_type":"text","page_num":1}], []))
+    monkeypatch.setattr(pipeline, "extract_blocks_and_images", lambda **k: ([{"text":"t","block_type":"text","page_num":1}], []))
 
     out = parser.parse_to_md_html(pdf, work_dir=tmp_path, upstage_key="x", batch_size=10)
     assert Path(out["html_path"]).exists()
     assert Path(out["md_path"]).exists()
     assert out["blocks"]
+
+
+def test_parser_skips_remote_for_text_pages(tmp_path, monkeypatch):
+    pdf = Path(__file__).resolve().parents[2] / "test.pdf"
+    sent = []
+
+    def fake_split(*a, **k):
+        sent.extend(k["pages"])
+        return [str(tmp_path / "part_0000_0000.pdf")]
+    monkeypatch.setattr(pipeline, "iter_pdf_parts", fake_split)
+
+    class DummyAnalyzer:
+        def __init__(self, api_key=None, ocr=False): pass
+        def analyze_many(self, ps, concurrency=None, use_cache=True, out_dir=None):
+            return [str(p).replace(".pdf", ".json") for p in ps]
+    monkeypatch.setattr(pipeline, "LayoutAnalyzer", DummyAnalyzer)
+    monkeypatch.setattr(pipeline, "extract_blocks_and_images",
+                        lambda **k: ([{"text": "fig", "block_type": "figure", "page_num": 1}], []))
+
+    out = parser.parse_to_md_html(pdf, work_dir=tmp_path, upstage_key="x")
+    assert out["skipped_pages"] > 0
+    assert out["layout_pages"] + out["skipped_pages"] == 23
+    assert len(sent) == out["layout_pages"]
+    assert out["blocks"][0]["page_num"] == 1
+    assert [b["page_num"] for b in out["blocks"]] == sorted(b["page_num"] for b in out["blocks"])
@@ -0,0 +1,221 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from app.services.pipeline import Pipeline, PipelineContext, Stage
+
+
+def _toy_pipeline(calls, fail):
+    def analyze(ctx, inputs):
+        calls.append("analyze")
+        out = ctx.work_dir / "doc.json"
+        out.write_text("{}", encoding="utf-8")
+        return {"json_paths": [str(out)]}
+
+    def embed(ctx, inputs):
+        calls.append("embed")
+        if fail:
+            fail.pop()
+            raise RuntimeError("embedding failed")
+        return {"vectors": len(inputs["json_paths"])}
+
+    return Pipeline([
+        Stage("analyze", analyze, outputs=("json_paths",), artifacts=("json_paths",), params=("batch_size",)),
+        Stage("embed", embed, inputs=("json_paths",), outputs=("vectors",)),
+    ])
+
+
+def test_rerun_resumes_from_first_incomplete_stage(tmp_path):
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4 v1")
+    calls, events = [], []
+    pipeline = _toy_pipeline(calls, fail=[True])
+
+    def ctx(**options):
+        return PipelineContext(pdf_path=pdf, work_dir=tmp_path / "work", options={"batch_size": 10, **options})
+
+    with pytest.raises(RuntimeError):
+        pipeline.run(ctx())
+    values = pipeline.run(ctx(), on_stage=lambda name, status, sec: events.append((name, status)))
+    assert calls == ["analyze", "embed", "embed"]  # analyze 는 다시 호출하지 않음
+    assert events == [("analyze", "skipped"), ("embed", "running"), ("embed", "done")]
+    assert values["vectors"] == 1
+
+    # 완료된 실행은 전부 건너뜀
+    pipeline.run(ctx())
+    assert calls == ["analyze", "embed", "embed"]
+
+    # 옵션 변경 / 산출물 삭제 / 원본 변경 / resume=False 는 처음부터 다시 실행
+    pipeline.run(ctx(batch_size=5))
+    Path(tmp_path / "work" / "doc.json").unlink()
+    pipeline.run(ctx(batch_size=5))
+    pdf.write_bytes(b"%PDF-1.4 v2")
+    pipeline.run(ctx(batch_size=5))
+    pipeline.run(ctx(batch_size=5), resume=False)
+    assert calls.count("analyze") == 5
+
+
+def test_undeclared_input_is_rejected():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("embed", lambda ctx, inputs: {}, inputs=("chunks_path",))])
+
+
+def _words(seed, n):
+    return " ".join(chr(0xAC00 + (seed * 7919 + j * 104729) % 11172) * 2 for j in range(n))
+
+
+def test_chunk_embed_persist_stream_in_windows(tmp_path, monkeypatch):
+    from sqlalchemy import text
+    from app.services import pipeline
+    from app.services.ingestion.preprocess import artifact_store
+    from test_reingest import _session
+
+    db = _session(tmp_path)
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    work = tmp_path / "work"
+    blocks_path = artifact_store.save_blocks(work / "doc.blocks.art", [
+        {"block_type": "text", "page_num": 1 + i // 10, "html": f"<p>{_words(i, 30)}</p>"}
+        for i in range(40)
+    ])
+    json_paths = [str(work / "doc_0000_0001.json"), str(work / "doc_0002_0003.json")]
+    windows = []
+
+    def fake_embeddings(texts, dim=4):
+        windows.append(len(texts))
+        return [[float(len(t)), 1.0, 2.0, 3.0] for t in texts], "dummy"
+
+    monkeypatch.setattr(pipeline, "CHUNK_WINDOW", 3)
+    monkeypatch.setattr(pipeline, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(pipeline, "page_hashes", lambda path, pages: ["h"] * len(pages))
+    ctx = PipelineContext(pdf_path=pdf, work_dir=work, options={"chunk_max_tokens": 150}, db=db)
+    values = {"json_paths": json_paths, "native_pages": [], "blocks_path": blocks_path, "source_sha256": "s" * 64}
+    values.update(pipeline._chunk(ctx, values))
+    values.update(pipeline._dedup(ctx, values))
+    values.update(pipeline._embed(ctx, values))
+    out = pipeline._persist(ctx, values)
+    assert values["dedup_stats"]["embeddings_saved"] == 0
+
+    records = list(artifact_store.iter_records(values["dedup_path"]))
+    texts = [r["text"] for r in records if r["type"] == "chunk"]
+    assert [r["type"] for r in records].count("document") == 2
+    assert max(windows) == 3 and sum(windows) == len(texts) > 3
+    assert artifact_store.load_matrix(values["embeddings_path"]).shape == (len(texts), 4)
+
+    rows = db.execute(text(
+        "SELECT c.document_id, c.content, c.chunk_order, e.vector FROM chunks c JOIN embeddings e ON e.chunk_id = c.id"
+        " ORDER BY c.id"
+    )).all()
+    assert [r.content for r in rows] == texts
+    assert {r.document_id for r in rows} == set(out["document_ids"])
+    assert all(r.vector.startswith(f"[{float(len(r.content))}") for r in rows)
+
+
+def test_native_pages_become_documents_without_layout_json(tmp_path, monkeypatch):
+    from sqlalchemy import text
+    from app.services import pipeline
+    from app.services.ingestion.preprocess import artifact_store
+    from test_reingest import _session
+
+    db = _session(tmp_path)
+    pdf = tmp_path / "doc.pdf"
+    pdf.write_bytes(b"%PDF-1.4")
+    work = tmp_path / "work"
+    # 1~2쪽은 Upstage 분석 파트, 3~5쪽은 텍스트 레이어에서 로컬로 추출한 블록
+    blocks_path = artifact_store.save_blocks(work / "doc.blocks.art", [
+        {"block_type": "text", "page_num": page, "html": f"<p>{_words(page, 20)}</p>"} for page in range(1, 6)
+    ])
+    monkeypatch.setattr(pipeline, "get_embeddings", lambda texts: ([[1.0, 2.0]] * len(texts), "dummy"))
+    monkeypatch.setattr(pipeline, "page_hashes", lambda path, pages: ["h"] * len(pages))
+    ctx = PipelineContext(pdf_path=pdf, work_dir=work, options={"batch_size": 2}, db=db)
+    values = {"json_paths": [str(work / "doc_0000_0001.json")], "native_pages": [3, 4, 5],
+              "blocks_path": blocks_path, "source_sha256": "s" * 64}
+    for stage in (pipeline._chunk, pipeline._dedup, pipeline._embed, pipeline._persist):
+        values.update(stage(ctx, values))
+
+    docs = db.execute(text("SELECT id, title, doc_meta FROM documents ORDER BY id")).all()
+    assert [d.title for d in docs] == ["doc_0000_0001.pdf", "doc_0002_0003.pdf", "doc_0004_0004.pdf"]
+    metas = [json.loads(d.doc_meta) for d in docs]
+    assert [m["pages"] for m in metas] == [[1, 2], [3, 4], [5, 5]]
+    assert [("json_path" in m) for m in metas] == [True, False, False]
+    pages = db.execute(text("SELECT document_id, chunk_meta FROM chunks ORDER BY id")).all()
+    assert [(r.document_id, json.loads(r.chunk_meta)["pages"]) for r in pages] == [
+        (docs[0].id, [1, 2]), (docs[1].id, [3, 4]), (docs[2].id, [5]),
+    ]
+
+
+def test_dedup_collapses_repeated_chunks_in_file_and_corpus(tmp_path, monkeypatch):
+    from sqlalchemy import text
+    from app.services import pipeline
+    from app.services.ingestion.preprocess import artifact_store
+    from app.db import crud
+    from test_reingest import _session
+
+    db = _session(tmp_path)
+    embedded = []
+
+    def fake_embeddings(texts, dim=4):
+        embedded.extend(texts)
+        return [[float(len(t)), 1.0, 2.0, 3.0] for t in texts], "dummy"
+    monkeypatch.setattr(pipeline, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(pipeline, "page_hashes", lambda path, pages: ["h"] * len(pages))
+    disclaimer = "본 자료는 대외비이며 무단 배포를 금지합니다. 문의: 재무팀 내선 {} (페이지 {})"
+
+    def ingest(name, bodies, threshold=0.8):
+        pdf = tmp_path / f"{name}.pdf"
+        pdf.write_bytes(name.encode())
+        work = tmp_path / name
+        blocks = []
+        for page, body in enumerate(bodies, start=1):
+            blocks.append({"block_type": "text", "page_num": page, "html": f"<p>{body}</p>"})
+            blocks.append({"block_type": "text", "page_num": page, "html": f"<p>{disclaimer.format(1234, page)}</p>"})
+        values = {
+            "json_paths": [str(work / f"{name}_0000_{len(bodies) - 1:04d}.json")],
+            "native_pages": [],
+            "blocks_path": artifact_store.save_blocks(work / "b.art", blocks),
+            "source_sha256": name * 64,
+        }
+        ctx = PipelineContext(pdf_path=pdf, work_dir=work, db=db,
+                              options={"chunk_max_tokens": 60, "dedup_threshold": threshold})
+        values.update(pipeline._chunk(ctx, values))
+        values.update(pipeline._dedup(ctx, values))
+        values.update(pipeline._embed(ctx, values))
+        pipeline._persist(ctx, values)
+        return values["dedup_stats"]
+
+    first = ingest("a", [_words(p, 25) for p in range(5)])
+    assert first["chunks"] == 10 and first["file_duplicates"] == 4 and first["embeddings_saved"] == 4
+    rows = db.execute(text("SELECT content, chunk_meta FROM chunks ORDER BY id")).all()
+    assert len(rows) == 6
+    kept = [json.loads(r.chunk_meta) for r in rows if "대외비" in r.content]
+    assert len(kept) == 1 and kept[0]["pages"] == [1, 2, 3, 4, 5] and kept[0]["duplicates"] == 4
+    assert db.execute(text("SELECT count(*) FROM chunk_lsh_bands")).scalar() == 6 * 16
+
+    # 다른 파일의 같은 면책 문구는 이 파일에도 청크로 저장하되 임베딩은 기존 청크 것을 복사
+    embedded.clear()
+    second = ingest("b", [_words(p, 25) for p in range(10, 13)])
+    assert second["corpus_duplicates"] == 1 and second["embeddings_saved"] == 3
+    assert not any("대외비" in t for t in embedded)
+    rows = db.execute(text(
+        "SELECT c.id, d.file_id, c.chunk_meta, e.vector FROM chunks c JOIN documents d ON d.id = c.document_id"
+        " JOIN embeddings e ON e.chunk_id = c.id WHERE c.content LIKE '%대외비%' ORDER BY c.id")).all()
+    assert [r.file_id for r in rows] == [1, 2]
+    meta = json.loads(rows[1].chunk_meta)
+    assert meta["pages"] == [1, 2, 3] and meta["duplicate_of"] == rows[0].id and meta["minhash"]
+    assert rows[1].vector == rows[0].vector
+    # 원본 파일의 청크가 지워져도 이 파일의 청크는 남는다
+    crud.delete_chunks(db, [rows[0].id])
+    assert db.execute(text("SELECT count(*) FROM chunks WHERE content LIKE '%대외비%'")).scalar() == 1
+
+    # threshold 를 1 로 올리면 정확히 같은 정규화 텍스트만 합친다(숫자는 정규화되므로 여전히 중복)
+    strict = ingest("c", [_words(p, 25) for p in range(20, 22)], threshold=1.0)
+    assert strict["file_duplicates"] == 1 and strict["corpus_duplicates"] == 1 and strict["kept"] == 2
+
+    # 원본 임베딩을 재사용할 수 없으면(그 사이 삭제 등) 그 청크만 새로 임베딩해 저장
+    embedded.clear()
+    monkeypatch.setattr(crud, "get_embedding_vectors", lambda db, ids, model: {})
+    ingest("d", [_words(p, 25) for p in range(30, 32)])
+    assert sum("대외비" in t for t in embedded) == 1
+    assert db.execute(text("SELECT count(*) FROM chunks c JOIN embeddings e ON e.chunk_id = c.id"
+                           " WHERE c.content LIKE '%대외비%'")).scalar() == 3
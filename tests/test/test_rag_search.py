@@ -0,0 +1,89 @@
+import os
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.db import crud
+from app.schemas.db import ChunkCreate, DocumentCreate
+from app.services import search
+from app.services.retrieval import keyword_index, vector_index
+from test_reingest import _session
+
+
+def _client(db, tmp_path):
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+
+    from app.api.v1.rag import router as rag_router
+    from app.db.session import get_db
+
+    app = FastAPI()
+    app.include_router(rag_router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = lambda: db
+    return TestClient(app)
+
+
+def test_search_endpoint_returns_top_k_by_cosine(tmp_path, monkeypatch):
+    db = _session(tmp_path)
+    doc = crud.create_document(db, DocumentCreate(file_id=1, title="doc"))
+    vectors = [[1.0, 0.0, 0.0], [0.6, 0.8, 0.0], [0.0, 1.0, 0.0], [-1.0, 0.0, 0.0]]
+    crud.bulk_create_chunks_with_embeddings(
+        db,
+        [ChunkCreate(document_id=doc.id, content=f"청크 {i}", chunk_order=i) for i in range(len(vectors))],
+        vectors, model="dummy",
+    )
+    # 다른 모델 벡터는 질의 모델과 섞이지 않는다
+    crud.bulk_create_chunks_with_embeddings(
+        db, [ChunkCreate(document_id=doc.id, content="다른 모델", chunk_order=9)], [[1.0, 0.0, 0.0]], model="openai",
+    )
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_DIR", tmp_path / "vectors")
+    monkeypatch.setattr(search, "get_embedding", lambda text: ([2.0, 0.0, 0.0], "dummy"))
+
+    res = _client(db, tmp_path).post("/api/v1/rag/search", json={"query": "질문", "k": 3, "mode": "vector"})
+    assert res.status_code == 200
+    body = res.json()
+    assert body["model"] == "dummy"
+    assert [h["content"] for h in body["results"]] == ["청크 0", "청크 1", "청크 2"]
+    assert [round(h["score"], 6) for h in body["results"]] == [1.0, 0.6, 0.0]
+
+    assert _client(db, tmp_path).post("/api/v1/rag/search", json={"query": "", "k": 3}).status_code == 422
+
+
+
+def test_hybrid_search_fuses_keyword_and_vector_ranks(tmp_path, monkeypatch):
+    db = _session(tmp_path)
+    doc = crud.create_document(db, DocumentCreate(file_id=1, title="doc"))
+    texts = ["퇴직금 산정 기준과 평균임금", "연차휴가 일수", "퇴직금 중간정산 사유", "회사 복지 제도 안내"]
+    vectors = [[0.0, 1.0], [1.0, 0.0], [0.6, 0.8], [0.9, 0.1]]
+    crud.bulk_create_chunks_with_embeddings(
+        db, [ChunkCreate(document_id=doc.id, content=t, chunk_order=i) for i, t in enumerate(texts)],
+        vectors, model="dummy",
+    )
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_DIR", tmp_path / "bm25")
+    keyword_index.build_index(crud.iter_chunk_contents(db, batch_size=3))
+    monkeypatch.setattr(vector_index, "VECTOR_INDEX_DIR", tmp_path / "vectors")
+    monkeypatch.setattr(search, "get_embedding", lambda text: ([1.0, 0.0], "dummy"))
+    client = _client(db, tmp_path)
+
+    body = client.post("/api/v1/rag/search", json={"query": "퇴직금 중간정산", "k": 4}).json()
+    assert set(body["latency_ms"]) == {"keyword", "vector", "fusion", "total"}
+    hits = {h["content"]: h for h in body["results"]}
+    # 키워드 1위·벡터 3위인 청크가 벡터 1위(키워드 없음)보다 위
+    assert body["results"][0]["content"] == "퇴직금 중간정산 사유"
+    assert hits["퇴직금 중간정산 사유"]["ranks"] == {"keyword": 1, "vector": 3}
+    assert hits["연차휴가 일수"]["ranks"] == {"vector": 1}
+    top = body["results"][0]
+    assert abs(top["score"] - (1 / 61 + 1 / 63)) < 1e-9
+
+    # 가중치 0 인 검색기는 돌지 않는다
+    body = client.post(
+        "/api/v1/rag/search", json={"query": "퇴직금 중간정산", "k": 4, "weights": {"keyword": 0}},
+    ).json()
+    assert "keyword" not in body["latency_ms"]
+    assert body["results"][0]["content"] == "연차휴가 일수"
+
+    # postgres 키워드 백엔드는 SQLite 에서 BM25 색인으로 대신한다
+    body = client.post(
+        "/api/v1/rag/search", json={"query": "퇴직금", "mode": "keyword", "keyword_backend": "postgres"},
+    ).json()
+    assert body["model"] is None and body["keyword_backend"] == "bm25"
+    assert {h["content"] for h in body["results"]} == {"퇴직금 산정 기준과 평균임금", "퇴직금 중간정산 사유"}
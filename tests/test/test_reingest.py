@@ -0,0 +1,215 @@
+import json
+
+import pymupdf as fitz
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+
+from app.db import crud
+from app.schemas.db import FileCreate
+from app.services.ingestion import reingest
+from app.services.retrieval import keyword_index
+
+
+def _session(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'reingest.db'}")
+    with engine.begin() as conn:
+        for ddl in (
+            """CREATE TABLE files (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, original_name VARCHAR NOT NULL,
+                mime_type VARCHAR NOT NULL, storage_path VARCHAR NOT NULL, sha256 VARCHAR(64) UNIQUE,
+                uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL)""",
+            """CREATE TABLE documents (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, file_id INTEGER NOT NULL, title VARCHAR NOT NULL,
+                doc_meta JSON, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL)""",
+            """CREATE TABLE chunks (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, document_id INTEGER NOT NULL, content TEXT NOT NULL,
+                chunk_order INTEGER NOT NULL, chunk_meta JSON)""",
+            """CREATE TABLE embeddings (
+                chunk_id INTEGER PRIMARY KEY, vector TEXT NOT NULL, model VARCHAR NOT NULL, dim INTEGER NOT NULL)""",
+            """CREATE TABLE chunk_lsh_bands (
+                chunk_id INTEGER NOT NULL, band SMALLINT NOT NULL, bucket BIGINT NOT NULL,
+                PRIMARY KEY (chunk_id, band))""",
+            """CREATE TABLE corpus_versions (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, file_id INTEGER, stats JSON,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP NOT NULL)""",
+        ):
+            conn.exec_driver_sql(ddl)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def _pdf(path, pages):
+    doc = fitz.open()
+    for body in pages:
+        doc.new_page().insert_text((72, 72), body)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+class FakeAnalyzer:
+    """텍스트 레이어를 Upstage 형식 요소로 돌려주고, 텍스트가 없는(스캔) 페이지는 OCR 표로 본다."""
+    analyzed = []
+
+    def __init__(self, api_key, ocr=False):
+        pass
+
+    def analyze_many(self, parts, concurrency=None, use_cache=True, out_dir=None):
+        paths = []
+        for part in parts:
+            self.analyzed.append(part.name)
+            elements = []
+            with fitz.open(stream=part.data, filetype="pdf") as doc:
+                sizes = [{"page": i, "width": 612, "height": 792} for i in range(1, doc.page_count + 1)]
+                for i, page in enumerate(doc, start=1):
+                    lines = page.get_text().strip().splitlines()
+                    for line in lines:  # 줄마다 문단 하나
+                        elements.append({"category": "paragraph", "page": i, "html": f"<p>{line}</p>", "text": line})
+                    if not lines:
+                        elements.append({"category": "table", "page": i,
+                                         "html": "<table><tr><th>항목</th></tr><tr><td>스캔 표</td></tr></table>"})
+            path = out_dir / f"{part.name}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps({
+                "metadata": {"pages": sizes},
+                "elements": elements,
+            }), encoding="utf-8")
+            paths.append(str(path))
+        return paths
+
+
+def test_reingest_only_touches_changed_pages(tmp_path, monkeypatch):
+    db = _session(tmp_path)
+    embedded = []
+
+    def fake_embeddings(texts, dim=4):
+        embedded.extend(texts)
+        return [[0.1] * dim for _ in texts], "dummy"
+    monkeypatch.setattr(reingest, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(reingest, "LayoutAnalyzer", FakeAnalyzer)
+    monkeypatch.setattr(reingest, "ARTIFACT_DIR", tmp_path / "artifacts")
+    monkeypatch.setattr(FakeAnalyzer, "analyzed", [])
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_DIR", tmp_path / "bm25")
+
+    v1 = _pdf(tmp_path / "v1.pdf", ["alpha page", "beta page", "gamma page"])
+    db_file = crud.create_file(db, FileCreate(original_name="m.pdf", mime_type="application/pdf", storage_path=str(v1)))
+
+    first = reingest.reingest_file(db, db_file, v1, batch_size=1)
+    assert first["documents_added"] == 3 and first["chunks_inserted"] == 3
+    assert first["corpus_version"] == 1
+    # 청크는 /ingestion/run 과 같은 경로(블록 순번, MinHash 서명, LSH 밴드)로 만든다
+    metas = [json.loads(m) for m in db.execute(text("SELECT chunk_meta FROM chunks ORDER BY id")).scalars()]
+    assert [m["block_ids"] for m in metas] == [[0], [1], [2]]
+    assert all(m["minhash"] for m in metas)
+    assert db.execute(text("SELECT count(*) FROM chunk_lsh_bands")).scalar() == 3 * 16
+
+    # 2쪽 수정, 4쪽 추가
+    embedded.clear()
+    v2 = _pdf(tmp_path / "v2.pdf", ["alpha page", "beta page revised", "gamma page", "delta page"])
+    second = reingest.reingest_file(db, db_file, v2, batch_size=1)
+    assert second["documents_unchanged"] == 2
+    assert second["documents_changed"] == 1 and second["documents_added"] == 1
+    assert second["chunks_inserted"] == 2 and second["chunks_deleted"] == 1
+    assert sorted(embedded) == ["beta page revised", "delta page"]
+    assert FakeAnalyzer.analyzed[-2:] == ["v2_0001_0001", "v2_0003_0003"]  # 바뀐 구간만 분석
+    assert second["corpus_version"] == 2 and crud.get_corpus_version(db) == 2
+    assert db_file.sha256 is not None and db_file.storage_path == str(v2.resolve())
+
+    # 페이지 삭제 + 내용이 다른 구간으로 이동: 기존 청크/임베딩 재사용
+    embedded.clear()
+    v3 = _pdf(tmp_path / "v3.pdf", ["alpha page", "gamma page"])
+    third = reingest.reingest_file(db, db_file, v3, batch_size=1)
+    assert embedded == []
+    assert third["chunks_kept"] == 1 and third["documents_removed"] == 2
+    rows = db.execute(text(
+        "SELECT d.doc_meta, c.content FROM chunks c JOIN documents d ON d.id = c.document_id ORDER BY c.id"
+    )).all()
+    assert [r.content.strip() for r in rows] == ["alpha page", "gamma page"]
+    # 키워드 색인: 새 청크는 델타 세그먼트로, 지운 청크는 툼스톤으로
+    index = keyword_index.get_keyword_index()
+    assert len(index.segments) == 2 and len(index) == 2
+    assert index.search("beta delta") == []
+    assert len(index.search("alpha gamma")) == 2
+
+    # 변경 없음: 버전 유지
+    unchanged = reingest.reingest_file(db, db_file, v3, batch_size=1)
+    assert unchanged["documents_unchanged"] == 2 and unchanged["corpus_version"] is None
+    assert crud.get_corpus_version(db) == 3
+    assert len(FakeAnalyzer.analyzed) == 6
+
+
+def test_reingest_keeps_chunks_of_pages_without_text_layer(tmp_path, monkeypatch):
+    db = _session(tmp_path)
+    monkeypatch.setattr(reingest, "get_embeddings", lambda texts, dim=4: ([[0.1] * dim for _ in texts], "dummy"))
+    monkeypatch.setattr(reingest, "LayoutAnalyzer", FakeAnalyzer)
+    monkeypatch.setattr(reingest, "ARTIFACT_DIR", tmp_path / "artifacts")
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_DIR", tmp_path / "bm25")
+
+    v1 = _pdf(tmp_path / "v1.pdf", ["alpha page", ""])
+    db_file = crud.create_file(db, FileCreate(original_name="m.pdf", mime_type="application/pdf", storage_path=str(v1)))
+    assert reingest.reingest_file(db, db_file, v1, batch_size=2)["chunks_inserted"] == 1
+    v2 = _pdf(tmp_path / "v2.pdf", ["alpha page revised", ""])
+    stats = reingest.reingest_file(db, db_file, v2, batch_size=2)
+    assert stats["chunks_inserted"] == 1 and stats["chunks_deleted"] == 1
+    (content,) = db.execute(text("SELECT content FROM chunks")).scalars()
+    assert "alpha page revised" in content and "스캔 표" in content
+
+
+def test_reingest_dedups_like_the_pipeline(tmp_path, monkeypatch):
+    from app.services.ingestion import chunking
+
+    db = _session(tmp_path)
+    embedded = []
+
+    def fake_embeddings(texts, dim=4):
+        embedded.extend(texts)
+        return [[float(len(t)), 1.0, 2.0, 3.0] for t in texts], "dummy"
+    monkeypatch.setattr(reingest, "get_embeddings", fake_embeddings)
+    monkeypatch.setattr(reingest, "LayoutAnalyzer", FakeAnalyzer)
+    monkeypatch.setattr(reingest, "ARTIFACT_DIR", tmp_path / "artifacts")
+    monkeypatch.setattr(keyword_index, "KEYWORD_INDEX_DIR", tmp_path / "bm25")
+    disclaimer = "Confidential do not distribute contact finance desk 1234 page {}"
+    # 본문과 면책 문구가 각자 청크가 되도록 토큰 예산을 둘 중 긴 쪽에 맞춘다
+    monkeypatch.setattr(chunking, "CHUNK_MAX_TOKENS", chunking.count_tokens(disclaimer.format(1)))
+
+    def disclaimers():
+        sql = ("SELECT c.id, c.document_id, c.chunk_meta, d.file_id FROM chunks c"
+               " JOIN documents d ON d.id = c.document_id WHERE c.content LIKE 'Confidential%' ORDER BY c.id")
+        return [(r.id, r.document_id, json.loads(r.chunk_meta), r.file_id) for r in db.execute(text(sql))]
+
+    v1 = _pdf(tmp_path / "v1.pdf", [f"{body} page\n{disclaimer.format(p)}"
+                                    for p, body in enumerate(["alpha", "beta", "gamma"], start=1)])
+    db_file = crud.create_file(db, FileCreate(original_name="m.pdf", mime_type="application/pdf", storage_path=str(v1)))
+    first = reingest.reingest_file(db, db_file, v1, batch_size=1)
+    assert first["chunks_inserted"] == 4 and first["chunks_merged"] == 2
+    [(disc_id, doc1, meta, _)] = disclaimers()
+    assert meta["pages"] == [1, 2, 3] and meta["duplicates"] == 2
+
+    # 대표 청크가 있는 1쪽만 바뀌어도 2, 3쪽을 계속 대신한다
+    v2 = _pdf(tmp_path / "v2.pdf", [f"alpha page revised\n{disclaimer.format(1)}",
+                                    f"beta page\n{disclaimer.format(2)}", f"gamma page\n{disclaimer.format(3)}"])
+    second = reingest.reingest_file(db, db_file, v2, batch_size=1)
+    assert second["chunks_kept"] == 1 and second["chunks_inserted"] == 1 and second["chunks_deleted"] == 1
+    assert disclaimers()[0][2]["pages"] == [1, 2, 3]
+
+    # 1쪽에서 면책 문구가 빠지면 대표 청크는 지우지 않고 2쪽 문서로 옮긴다
+    embedded.clear()
+    v3 = _pdf(tmp_path / "v3.pdf", ["alpha page revised",
+                                    f"beta page\n{disclaimer.format(2)}", f"gamma page\n{disclaimer.format(3)}"])
+    third = reingest.reingest_file(db, db_file, v3, batch_size=1)
+    assert embedded == [] and third["chunks_deleted"] == 0
+    [(moved_id, doc2, meta, _)] = disclaimers()
+    assert moved_id == disc_id and doc2 != doc1
+    assert meta["pages"] == [2, 3] and meta["duplicates"] == 1
+
+    # 다른 파일의 같은 문구는 그 파일에도 저장하되 임베딩은 복사한다
+    embedded.clear()
+    other = _pdf(tmp_path / "other.pdf", [f"delta page\n{disclaimer.format(7)}"])
+    other_file = crud.create_file(
+        db, FileCreate(original_name="o.pdf", mime_type="application/pdf", storage_path=str(other)))
+    stats = reingest.reingest_file(db, other_file, other, batch_size=1)
+    assert stats["chunks_inserted"] == 2 and stats["embeddings_reused"] == 1
+    assert embedded == ["delta page"]
+    copy = disclaimers()[-1]
+    assert copy[3] == other_file.id and copy[2]["duplicate_of"] == disc_id
+    vectors = db.execute(text(f"SELECT vector FROM embeddings WHERE chunk_id IN ({disc_id}, {copy[0]})")).scalars()
+    assert len(set(vectors)) == 1
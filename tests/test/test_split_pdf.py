@@ -9,3 +9,16 @@ def test_split_pdf(tmp_path: Path):
     assert len(parts) >= 1
     for p in parts:
         assert Path(p).exists()
+
+
+def test_iter_pdf_parts_in_memory(tmp_path: Path):
+    import pymupdf
+    from app.services.ingestion.preprocess.split_pdf import iter_pdf_parts
+    src = Path(__file__).resolve().parents[2] / "test.pdf"
+    for backend in ("pymupdf", "pypdf"):
+        parts = list(iter_pdf_parts(src, batch_size=10, backend=backend))
+        assert [(p.start, p.end) for p in parts] == [(0, 9), (10, 19), (20, 22)]
+        assert parts[0].name == "test_0000_0009"
+        with pymupdf.open(stream=parts[-1].data, filetype="pdf") as doc:
+            assert doc.page_count == 3
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,110 @@
+import numpy as np
+import pytest
+
+from app.db import crud
+from app.schemas.db import ChunkCreate, DocumentCreate
+from app.services.retrieval import quantization, vector_index
+from app.services.retrieval.vector_index import get_vector_index, index_path
+from test_reingest import _session
+
+
+def _store(db, vectors, model="dummy"):
+    doc = crud.create_document(db, DocumentCreate(file_id=1, title="doc"))
+    return crud.bulk_create_chunks_with_embeddings(
+        db, [ChunkCreate(document_id=doc.id, content=f"청크 {i}", chunk_order=i) for i in range(len(vectors))],
+        np.asarray(vectors).tolist(), model=model,
+    )
+
+
+def _exact(vectors, ids, q, k):
+    m = vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+    sims = m @ (q / np.linalg.norm(q))
+    return [ids[i] for i in np.argsort(-sims, kind="stable")[:k]]
+
+
+def test_search_matches_exact_scan_across_blocks(tmp_path, monkeypatch):
+    monkeypatch.setattr(vector_index, "SCAN_ROWS", 7)  # 블록 경계를 여러 번 넘게
+    db = _session(tmp_path)
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((50, 8)).astype(np.float32)
+    ids = _store(db, vectors)
+    _store(db, rng.standard_normal((5, 8)), model="openai")  # 다른 모델은 섞이지 않는다
+
+    index = get_vector_index(db, "dummy", 8, tmp_path / "vec")
+    assert len(index) == 50
+    queries = rng.standard_normal((3, 8)).astype(np.float32)
+    batched = index.search(queries, 5)
+    for q, hits in zip(queries, batched):
+        assert [cid for cid, _ in hits] == _exact(vectors, ids, q, 5)
+        single = index.search(q, 5)
+        assert [cid for cid, _ in hits] == [cid for cid, _ in single]
+        assert np.allclose([s for _, s in hits], [s for _, s in single], atol=1e-5)
+    assert index.search(queries[0], 100)[-1][0] in ids and len(index.search(queries[0], 100)) == 50
+
+
+
+def test_quantized_tiers_rescore_to_exact_order(tmp_path, monkeypatch):
+    db = _session(tmp_path)
+    rng = np.random.default_rng(1)
+    vectors = rng.standard_normal((200, 64)).astype(np.float32)
+    ids = _store(db, vectors)
+    queries = vectors[:5] + 0.3 * rng.standard_normal((5, 64)).astype(np.float32)
+    sizes = {}
+    for precision in ("float16", "int8", "binary"):
+        root = tmp_path / precision
+        monkeypatch.setattr(quantization, "VECTOR_PRECISION", f"float32,dummy={precision}")
+        index = get_vector_index(db, "dummy", 64, root)
+        assert index.precision == precision
+        sizes[precision] = (index.path / "vectors.bin").stat().st_size
+        for q in queries:
+            hits = vector_index.search(db, "dummy", q, 5, rescore_factor=8, root=root)
+            if precision == "binary":  # 64 비트 부호로는 잡음 수준 이웃까지 맞추진 못한다
+                assert hits[0][0] == _exact(vectors, ids, q, 1)[0]
+                hits = vector_index.search(db, "dummy", q, 5, rescore_factor=40, root=root)
+            assert [cid for cid, _ in hits] == _exact(vectors, ids, q, 5)
+            # 재채점한 점수는 float32 코사인 유사도
+            top = vectors[ids.index(hits[0][0])]
+            assert abs(hits[0][1] - top @ q / np.linalg.norm(top) / np.linalg.norm(q)) < 1e-5
+    assert sizes == {"float16": 200 * 64 * 2, "int8": 200 * 64, "binary": 200 * 8}
+    assert (tmp_path / "int8" / "dummy-64" / "scales.bin").stat().st_size == 200 * 4
+
+    # 설정이 바뀌면 다음 검색 때 새 정밀도로 다시 만든다
+    monkeypatch.setattr(quantization, "VECTOR_PRECISION", "float32")
+    assert get_vector_index(db, "dummy", 64, tmp_path / "binary").precision == "float32"
+
+
+def test_parse_precisions():
+    assert quantization.parse_precisions("float16, openai=binary,bge-m3=int8") == (
+        "float16", {"openai": "binary", "bge-m3": "int8"},
+    )
+    assert quantization.precision_for("dummy", "openai=binary") == "float32"
+    with pytest.raises(ValueError):
+        quantization.parse_precisions("openai=int4")
+
+
+def test_appends_and_deletes_are_seen_by_next_open(tmp_path):
+    db = _session(tmp_path)
+    root = tmp_path / "vec"
+    ids = _store(db, [[1.0, 0.0], [0.0, 1.0]])
+    # 색인이 아직 없으면 갱신은 건너뛰고 첫 검색 때 DB 에서 만든다
+    vector_index.update_index(db, "dummy", ids, [[1.0, 0.0], [0.0, 1.0]], root=root)
+    assert not index_path("dummy", 2, root).exists()
+    first = get_vector_index(db, "dummy", 2, root)
+    assert [cid for cid, _ in first.search([1.0, 0.1], 2)] == ids
+
+    new = _store(db, [[1.0, 0.05]])
+    vector_index.update_index(db, "dummy", new, [[1.0, 0.05]], root=root)
+    second = get_vector_index(db, "dummy", 2, root)
+    assert second is not first and len(second) == 3
+    assert second.search([1.0, 0.05], 1)[0][0] == new[0]
+    assert second.search([1.0, 0.05], 1)[0][1] > 0.9999
+    assert get_vector_index(db, "dummy", 2, root) is second  # 바뀐 게 없으면 그대로
+
+    vector_index.update_index(db, deleted=[new[0], ids[1]], root=root)
+    third = get_vector_index(db, "dummy", 2, root)
+    assert len(third) == 1
+    assert third.search([0.0, 1.0], 3) == [(ids[0], 0.0)]
+
+    # 재생성하면 삭제분이 빠진다
+    crud.delete_chunks(db, [new[0], ids[1]])
+    assert vector_index.build_index(db, "dummy", 2, root) == 1